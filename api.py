@@ -0,0 +1,28 @@
+import argparse
+import logging
+
+import uvicorn
+
+from src.utils.config import API_HOST, API_PORT, API_WORKERS, CHROMA_HOST, VECTOR_BACKEND
+
+logger = logging.getLogger(__name__)
+
+def shared_storage() -> bool:
+    return VECTOR_BACKEND == "chroma" and bool(CHROMA_HOST)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the RAG chat HTTP API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    args = parser.parse_args()
+
+    workers = args.workers
+    if workers > 1 and not shared_storage():
+        logging.basicConfig(level=logging.WARNING)
+        logger.warning(
+            "Running a single worker: multiple workers need a shared vector store. "
+            "Set VectorStoreConfig.backend = 'chroma' and chroma_host to a Chroma server."
+        )
+        workers = 1
+    uvicorn.run("src.backend.api.app:app", host=args.host, port=args.port, workers=workers)
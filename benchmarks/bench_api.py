@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+
+def write_document(workdir: Path, paragraphs: int) -> Path:
+    path = workdir / "bench_api.txt"
+    path.write_text("\n\n".join(
+        f"Paragraph {i}: component{i % 7} handles step {i} of the pipeline." for i in range(paragraphs)
+    ))
+    return path
+
+
+async def wait_until_ready(client: httpx.AsyncClient, session_id: str, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        status = (await client.get(f"/sessions/{session_id}/status")).json()
+        if status["status"] == "ready":
+            return time.perf_counter() - start
+        if status["status"] == "failed":
+            raise RuntimeError(f"Ingestion failed: {status['error']}")
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"Session {session_id} was not ready after {timeout:.0f}s")
+
+
+async def stream_query(client: httpx.AsyncClient, session_id: str, question: str) -> Tuple[float, float, str]:
+    start = time.perf_counter()
+    first_delta: Optional[float] = None
+    deltas: List[str] = []
+    async with client.stream("POST", f"/sessions/{session_id}/query", json={"question": question}) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"Query failed with {response.status_code}: {(await response.aread()).decode()}")
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event is None:
+                if first_delta is None:
+                    first_delta = time.perf_counter() - start
+                deltas.append(json.loads(line[len("data: "):])["delta"])
+            elif not line:
+                event = None
+    total = time.perf_counter() - start
+    return first_delta if first_delta is not None else total, total, "".join(deltas)
+
+
+def report(label: str, seconds: List[float]):
+    p50, p95 = np.percentile(np.array(seconds) * 1000, [50, 95])
+    print(f"  {label:<16} p50={p50:7.0f}ms  p95={p95:7.0f}ms")
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(args.file) if args.file else write_document(Path(tmp), args.paragraphs)
+            with path.open("rb") as upload:
+                response = await client.post("/sessions", files={"file": (path.name, upload)})
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+        ingest_seconds = await wait_until_ready(client, session_id, args.timeout)
+        print(f"session {session_id} ingested in {ingest_seconds:.2f}s")
+
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def one(i: int) -> Tuple[float, float, str]:
+            async with gate:
+                return await stream_query(client, session_id, f"request {i}: what does step {i % 40} do?")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        print(f"{args.requests} streamed queries at concurrency {args.concurrency}")
+        report("first delta", [first for first, _, _ in results])
+        report("full answer", [total for _, total, _ in results])
+        print(f"  throughput       {args.requests / elapsed:.1f} req/s  wall={elapsed:.2f}s")
+        empty = sum(1 for _, _, answer in results if not answer)
+        if empty:
+            print(f"  {empty} empty answers")
+
+        if not args.keep_session:
+            await client.delete(f"/sessions/{session_id}")
+        return 1 if empty else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload a document to the HTTP API and stream concurrent queries")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--file", help="Document to upload (a synthetic text file by default)")
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--keep-session", action="store_true")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
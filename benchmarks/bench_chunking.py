@@ -0,0 +1,105 @@
+import argparse
+import hashlib
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llama_index.core import Document
+from llama_index.core.node_parser import SentenceSplitter
+
+from src.backend.core.services.file_processor import FileProcessor
+
+EMBED_DIM = 512
+TOP_K = 3
+
+
+def embed(text: str) -> np.ndarray:
+    vector = np.zeros(EMBED_DIM, dtype=np.float32)
+    for token in re.findall(r"[a-z0-9_]+", text.lower()):
+        vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % EMBED_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def build_code_corpus(functions: int) -> Tuple[str, List[Tuple[str, str]]]:
+    lines = ["import math", ""]
+    queries = []
+    for i in range(functions):
+        name = f"compute_metric_{i}"
+        lines.extend([
+            f"def {name}(values, weight_{i}=0.{i % 9 + 1}):",
+            f"    total_{i} = 0",
+            "    for value in values:",
+            f"        total_{i} += math.sqrt(abs(value)) * weight_{i}",
+            f"    return total_{i} / max(len(values), 1)",
+            "",
+            "",
+        ])
+        queries.append((f"what does {name} return with weight_{i}", f"def {name}("))
+    return "\n".join(lines), queries
+
+
+def build_prose_corpus(sections: int) -> Tuple[str, List[Tuple[str, str]]]:
+    paragraphs = []
+    queries = []
+    for i in range(sections):
+        topic = f"subsystem{i}"
+        paragraphs.append(
+            f"The {topic} component handles request routing for region {i}. "
+            f"Operators configure {topic} through the control plane and monitor its latency budget. "
+            f"When {topic} fails, traffic is drained to the neighbouring region within thirty seconds."
+        )
+        queries.append((f"how is traffic drained when {topic} fails", f"When {topic} fails"))
+    return "\n\n".join(paragraphs), queries
+
+
+def hit_rate(chunks: List[str], queries: List[Tuple[str, str]]) -> float:
+    matrix = np.stack([embed(chunk) for chunk in chunks])
+    hits = 0
+    for question, expected in queries:
+        scores = matrix @ embed(question)
+        top = np.argsort(-scores)[:TOP_K]
+        hits += any(expected in chunks[i] for i in top)
+    return hits / len(queries)
+
+
+def run_case(label: str, path: Path, queries: List[Tuple[str, str]], chunkers: Dict[str, Callable[[Path], List[str]]]):
+    for name, chunk in chunkers.items():
+        chunks = chunk(path)
+        print(f"{label:<6} {name:<10} chunks={len(chunks):5d}  hit@{TOP_K}={hit_rate(chunks, queries):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare chunk count and retrieval hit-rate of chunking strategies")
+    parser.add_argument("--size", type=int, default=200, help="Functions/sections per synthetic file")
+    args = parser.parse_args()
+
+    default_parser = SentenceSplitter()
+    file_processor = FileProcessor()
+    chunkers = {
+        "default": lambda path: [
+            node.get_content() for node in default_parser.get_nodes_from_documents([Document(text=path.read_text())])
+        ],
+        "pipeline": lambda path: [node.get_content() for node in file_processor.read_file(path)],
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        code, code_queries = build_code_corpus(args.size)
+        code_path = Path(workdir) / "corpus.py"
+        code_path.write_text(code)
+        run_case("code", code_path, code_queries, chunkers)
+
+        prose, prose_queries = build_prose_corpus(args.size)
+        prose_path = Path(workdir) / "corpus.txt"
+        prose_path.write_text(prose)
+        run_case("prose", prose_path, prose_queries, chunkers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chromadb
+from llama_index.core.schema import TextNode
+from llama_index.embeddings.ollama import OllamaEmbedding
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from src.backend.core.services.ingestion_service import IngestionService
+from src.utils.config import EMBEDDING_MODEL, MISTRAL_MODEL, OLLAMA_HOST
+
+
+def make_nodes(count: int):
+    return [
+        TextNode(text=(
+            f"Section {i}: the scheduler assigns worker_{i % 31} to queue {i % 7}. "
+            "Retries back off exponentially and give up after five attempts."
+        ))
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ingestion throughput of Ollama embedding models")
+    parser.add_argument("--host", default=OLLAMA_HOST)
+    parser.add_argument("--models", nargs="+", default=[EMBEDDING_MODEL, MISTRAL_MODEL])
+    parser.add_argument("--nodes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        client = chromadb.PersistentClient(path=workdir)
+        for i, model in enumerate(args.models):
+            embed_model = OllamaEmbedding(model_name=model, base_url=args.host)
+            dimension = len(embed_model.get_text_embedding("warm up"))
+            vector_store = ChromaVectorStore(chroma_collection=client.create_collection(f"model_{i}"))
+            stats = IngestionService().ingest(make_nodes(args.nodes), embed_model, vector_store)
+            print(f"{model:<24} dim={dimension:5d}  {stats.nodes_per_second:8.1f} nodes/sec  ({stats.seconds:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chromadb
+from llama_index.core import StorageContext, VectorStoreIndex
+from llama_index.core.schema import TextNode
+from llama_index.embeddings.ollama import OllamaEmbedding
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.services.embedding_cache import EmbeddingCache
+from src.backend.core.services.ingestion_service import IngestionService
+
+
+def make_nodes(count: int):
+    return [
+        TextNode(text=f"Chunk {i} describes component_{i % 97} and its latency budget of {i % 13} ms.")
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding ingestion throughput against a stub Ollama server")
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--request-latency", type=float, default=0.02)
+    parser.add_argument("--per-input-latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    with StubOllamaServer(
+        request_latency=args.request_latency,
+        per_input_latency=args.per_input_latency
+    ) as server, tempfile.TemporaryDirectory() as workdir:
+        client = chromadb.PersistentClient(path=workdir)
+
+        baseline_model = OllamaEmbedding(model_name="stub", base_url=server.url)
+        vector_store = ChromaVectorStore(chroma_collection=client.create_collection("baseline"))
+        start = time.perf_counter()
+        VectorStoreIndex(
+            make_nodes(args.nodes),
+            storage_context=StorageContext.from_defaults(vector_store=vector_store),
+            embed_model=baseline_model
+        )
+        elapsed = time.perf_counter() - start
+        print(f"baseline   nodes={args.nodes}  {args.nodes / elapsed:8.1f} nodes/sec  ({elapsed:.2f}s)")
+
+        embed_model = OllamaEmbedding(model_name="stub", base_url=server.url)
+        vector_store = ChromaVectorStore(chroma_collection=client.create_collection("pipeline"))
+        stats = IngestionService(
+            batch_size=args.batch_size,
+            max_concurrency=args.concurrency
+        ).ingest(make_nodes(args.nodes), embed_model, vector_store)
+        print(f"pipeline   nodes={stats.nodes}  {stats.nodes_per_second:8.1f} nodes/sec  ({stats.seconds:.2f}s, {stats.batches} batches)")
+
+        cache = EmbeddingCache(Path(workdir) / "embedding_cache.sqlite3")
+        service = IngestionService(
+            batch_size=args.batch_size,
+            max_concurrency=args.concurrency,
+            embedding_cache=cache
+        )
+        for label in ("cold-cache", "re-upload"):
+            vector_store = ChromaVectorStore(chroma_collection=client.create_collection(label))
+            stats = service.ingest(make_nodes(args.nodes), embed_model, vector_store)
+            print(f"{label:<10} nodes={stats.nodes}  {stats.nodes_per_second:8.1f} nodes/sec  ({stats.seconds:.2f}s, {stats.cache_hits} cache hits)")
+        print(f"cache      {cache.stats()}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
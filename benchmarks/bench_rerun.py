@@ -0,0 +1,58 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.backend.core.services.chat_manager import ChatManager
+from src.backend.core.services.service_container import get_container, shutdown_container
+
+
+def build_uncached() -> ChatManager:
+    return ChatManager()
+
+
+def build_cached() -> ChatManager:
+    container = get_container()
+    return ChatManager(
+        mongo_client=container.get("mongo_client"),
+        rag_service=container.get("rag_service"),
+        async_mongo_client=container.get("async_mongo_client"),
+        history_writer=container.get("chat_history_writer"),
+        session_cache=container.get("session_cache")
+    )
+
+
+def measure(build, reruns: int) -> list:
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        build()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<10} mean={statistics.mean(timings):8.2f}ms  p50={statistics.median(timings):8.2f}ms  p95={p95:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-rerun ChatManager construction latency")
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        report("before", measure(build_uncached, args.reruns))
+        report("after", measure(build_cached, args.reruns))
+        shutdown_container()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.services.llm_service import LLMService
+from src.backend.core.services.ollama_scheduler import OllamaScheduler
+
+
+def make_questions(count: int) -> List[str]:
+    return [
+        f"request {i}: explain this code path" if i % 2 else f"request {i}: summarise the document"
+        for i in range(count)
+    ]
+
+
+def run(args, scheduled: bool) -> None:
+    with StubOllamaServer(
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.tokens_per_second,
+        model_load_latency=args.model_load_latency,
+        max_loaded_models=1
+    ) as server:
+        scheduler = OllamaScheduler(
+            host=server.url,
+            default_concurrency=args.per_model_limit if scheduled else args.concurrency,
+            max_loaded_models=1 if scheduled else 2,
+            max_affinity_wait=args.max_affinity_wait
+        )
+        llm_service = LLMService(host=server.url, embedding_model="stub-embed", scheduler=scheduler)
+
+        def one(question: str) -> Tuple[float, bool]:
+            llm = llm_service.get_llm_for_query(question)
+            start = time.perf_counter()
+            answer = llm.complete(f"Context: none\nQuery: {question}\nAnswer: ").text
+            return time.perf_counter() - start, answer.startswith(f"[{llm.model}] {question}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(one, make_questions(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies = np.array([latency for latency, _ in results]) * 1000
+        p50, p95 = np.percentile(latencies, [50, 95])
+        label = "scheduled" if scheduled else "direct"
+        print(
+            f"  {label:<10} p50={p50:7.0f}ms  p95={p95:7.0f}ms  throughput={len(results) / elapsed:5.1f} req/s  "
+            f"model loads={sum(server.model_loads.values())}  wrong answers={sum(1 for _, ok in results if not ok)}"
+        )
+        if scheduled:
+            for model, stats in sorted(scheduler.stats().items()):
+                print(
+                    f"    {model:<10} requests={stats['requests']}  wait p50={stats['wait_seconds_p50'] * 1000:.0f}ms  "
+                    f"p95={stats['wait_seconds_p95'] * 1000:.0f}ms  max={stats['wait_seconds_max'] * 1000:.0f}ms"
+                )
+        llm_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare direct Ollama calls with the model-affinity scheduler on interleaved chat/code traffic"
+    )
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--per-model-limit", type=int, default=4)
+    parser.add_argument("--max-affinity-wait", type=float, default=2.0)
+    parser.add_argument("--model-load-latency", type=float, default=0.5)
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} interleaved chat/code requests, concurrency {args.concurrency}, "
+        f"{args.model_load_latency * 1000:.0f}ms per model swap"
+    )
+    run(args, scheduled=False)
+    run(args, scheduled=True)
+
+
+if __name__ == "__main__":
+    main()
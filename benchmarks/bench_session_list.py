@@ -0,0 +1,68 @@
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.backend.core.repositories.session_repository import SessionRepository, build_session_document
+from src.utils.cache import LRUCache
+from src.utils.config import MONGO_URI, SESSION_CACHE_TTL, SESSION_PAGE_SIZE
+
+
+def measure(fn: Callable[[], object], repeats: int) -> List[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]) -> None:
+    print(f"  {label:<22} mean={statistics.mean(timings):8.2f}ms  p50={statistics.median(timings):8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the full session fetch with the paginated, indexed and cached sidebar listing"
+    )
+    parser.add_argument("--mongo-uri", default=MONGO_URI)
+    parser.add_argument("--db", default="rag_chat_bench_sessions", help="Scratch database, dropped afterwards")
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_uri)
+    client.drop_database(args.db)
+    db = client[args.db]
+    try:
+        names = ["main.py", "utils.py", "notes.md", "report.pdf", "design.docx"]
+        db.sessions.insert_many([
+            build_session_document({"filename": f"{i}_{names[i % len(names)]}", "file_path": f"/tmp/{i}"})
+            for i in range(args.sessions)
+        ])
+        uncached = SessionRepository(db)
+        uncached.ensure_indexes()
+        cached = SessionRepository(db, LRUCache(256, SESSION_CACHE_TTL, sliding=False))
+
+        print(f"{args.sessions} sessions, page size {SESSION_PAGE_SIZE}")
+        report("get_all", measure(uncached.get_all, max(1, args.repeats // 5)))
+        report("first page", measure(lambda: uncached.list_page(SESSION_PAGE_SIZE), args.repeats))
+        deep = uncached.list_page(SESSION_PAGE_SIZE)
+        for _ in range(10):
+            deep = uncached.list_page(SESSION_PAGE_SIZE, deep["after"])
+        report("11th page", measure(lambda: uncached.list_page(SESSION_PAGE_SIZE, deep["after"]), args.repeats))
+        report("search 'report'", measure(lambda: uncached.list_page(SESSION_PAGE_SIZE, search="report"), args.repeats))
+        report("first page (cached)", measure(lambda: cached.list_page(SESSION_PAGE_SIZE), args.repeats))
+    finally:
+        client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
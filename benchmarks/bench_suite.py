@@ -0,0 +1,327 @@
+import argparse
+import json
+import logging
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import mongomock
+import numpy as np
+from docx import Document as DocxDocument
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.repositories.session_repository import SessionRepository
+from src.backend.core.services.bm25_index import BM25IndexService
+from src.backend.core.services.embedding_cache import EmbeddingCache
+from src.backend.core.services.llm_service import LLMService
+from src.backend.core.services.rag_service import RAGService
+from src.backend.core.services.tracing import PIPELINE_QUERY, STAGE_SESSION_LOOKUP, Trace
+from src.backend.core.services.vector_store_service import VectorStoreService
+from src.backend.core.vector_stores.chroma_vector_backend import ChromaVectorBackend
+from src.backend.core.vector_stores.local_vector_backend import LocalVectorBackend
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+FORMATS = ("txt", "pdf", "docx", "code")
+WORDS = (
+    "request latency cache index vector chunk embedding query session token model stream buffer "
+    "worker queue batch retrieval ranking summary answer context prompt budget parser reader store "
+    "config schema field record history bucket cursor page filter score node graph metric trace span"
+).split()
+COMPARED_METRICS = (
+    ("ingest", "nodes_per_second"),
+    ("query", "p50_ms"),
+    ("query", "p95_ms"),
+    ("query", "first_token_p50_ms"),
+    ("query", "context_tokens_mean")
+)
+
+
+def sentence(rng: random.Random, topic: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 16))
+    return f"Component{topic} {' '.join(words)}."
+
+
+def paragraphs(rng: random.Random, target_bytes: int) -> List[str]:
+    result, size = [], 0
+    while size < target_bytes:
+        paragraph = " ".join(sentence(rng, len(result) % 50) for _ in range(rng.randint(3, 6)))
+        result.append(paragraph)
+        size += len(paragraph) + 2
+    return result
+
+
+def write_txt(path: Path, rng: random.Random, target_bytes: int) -> None:
+    path.write_text("\n\n".join(paragraphs(rng, target_bytes)), encoding="utf-8")
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + [line] if line else lines
+
+
+def write_pdf(path: Path, rng: random.Random, target_bytes: int, lines_per_page: int = 55) -> None:
+    lines = [line for paragraph in paragraphs(rng, target_bytes) for line in _wrap(paragraph, 90) + [""]]
+    objects: List[str] = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for start in range(0, len(lines), lines_per_page):
+        text = "BT /F1 10 Tf 50 780 Td 13 TL " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in lines[start:start + lines_per_page]
+        ) + " ET"
+        objects.append(f"<< /Length {len(text)} >>\nstream\n{text}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(output))
+
+
+def write_docx(path: Path, rng: random.Random, target_bytes: int) -> None:
+    document = DocxDocument()
+    for i, paragraph in enumerate(paragraphs(rng, target_bytes)):
+        if i % 8 == 0:
+            document.add_heading(f"Section {i // 8 + 1}", level=2)
+        document.add_paragraph(paragraph)
+    document.save(str(path))
+
+
+def write_code(path: Path, rng: random.Random, target_bytes: int) -> None:
+    functions, size = [], 0
+    while size < target_bytes:
+        i = len(functions)
+        names = rng.sample(WORDS, 3)
+        body = "\n".join(
+            f"    {name}_{j} = {names[(j + 1) % 3]}_value({name}, {j})" for j, name in enumerate(names * 2)
+        )
+        function = (
+            f"def {names[0]}_{names[1]}_{i}({names[2]}, limit={i % 17}):\n"
+            f"    \"\"\"{sentence(rng, i % 50)}\"\"\"\n"
+            f"{body}\n"
+            f"    return [{names[0]}_0, {names[1]}_1][:limit]\n"
+        )
+        functions.append(function)
+        size += len(function) + 2
+    path.write_text("\n\n".join(functions), encoding="utf-8")
+
+
+WRITERS: Dict[str, Callable[[Path, random.Random, int], None]] = {
+    "txt": write_txt,
+    "pdf": write_pdf,
+    "docx": write_docx,
+    "code": write_code
+}
+SUFFIXES = {"txt": ".txt", "pdf": ".pdf", "docx": ".docx", "code": ".py"}
+
+
+def make_questions(rng: random.Random, count: int) -> List[str]:
+    return [f"question {i}: how does component{rng.randrange(50)} use the {rng.choice(WORDS)}?" for i in range(count)]
+
+
+def percentiles(values: List[float]) -> List[float]:
+    return [float(value) for value in np.percentile(np.array(values) * 1000, [50, 95])]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_ingest(rag_service: RAGService, path: Path, session_id: str) -> Dict:
+    progress = {"nodes": 0}
+
+    def on_progress(done: int, total: Optional[int]) -> None:
+        progress["nodes"] = done
+
+    start = time.perf_counter()
+    rag_service.process_file(path, session_id, on_progress=on_progress)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "nodes": progress["nodes"],
+        "nodes_per_second": round(progress["nodes"] / seconds, 1) if seconds else 0.0
+    }
+
+
+def run_queries(
+    rag_service: RAGService,
+    session_repo: SessionRepository,
+    session_id: str,
+    questions: List[str]
+) -> Dict:
+    latencies, first_tokens, context_tokens, tokens_saved = [], [], [], []
+    stages: Dict[str, List[float]] = {}
+    for question in questions:
+        trace = Trace(PIPELINE_QUERY)
+        start = time.perf_counter()
+        with trace.span(STAGE_SESSION_LOOKUP):
+            session = session_repo.get_by_id(session_id)
+        first_token = None
+        for _ in rag_service.stream_query(session_id, question, session["retrieval_mode"], trace=trace):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        latencies.append(time.perf_counter() - start)
+        first_tokens.append(first_token or latencies[-1])
+        timing = trace.finish()
+        for stage, ms in timing["stages_ms"].items():
+            stages.setdefault(stage, []).append(ms)
+        context_tokens.append(timing.get("context_tokens", 0))
+        tokens_saved.append(timing.get("context_tokens_saved", 0))
+    p50, p95 = percentiles(latencies)
+    first_p50, first_p95 = percentiles(first_tokens)
+    return {
+        "count": len(questions),
+        "p50_ms": round(p50, 1),
+        "p95_ms": round(p95, 1),
+        "first_token_p50_ms": round(first_p50, 1),
+        "first_token_p95_ms": round(first_p95, 1),
+        "context_tokens_mean": round(float(np.mean(context_tokens)), 1),
+        "context_tokens_saved_mean": round(float(np.mean(tokens_saved)), 1),
+        "stages_mean_ms": {stage: round(float(np.mean(values)), 1) for stage, values in stages.items()}
+    }
+
+
+def percent_change(current: float, before: float) -> str:
+    return f"{(current - before) / before * 100:+.1f}%"
+
+
+def compare(run: Dict, baseline_path: Path) -> None:
+    baseline_run = json.loads(baseline_path.read_text())
+    baseline = {(row["format"], row["size_kb"]): row for row in baseline_run["results"]}
+    print(f"\nchange vs {baseline_path.name}")
+    if baseline_run.get("peak_rss_mb"):
+        print(f"  peak_rss_mb {percent_change(run['peak_rss_mb'], baseline_run['peak_rss_mb'])}")
+    results = run["results"]
+    for row in results:
+        previous = baseline.get((row["format"], row["size_kb"]))
+        if previous is None or "error" in row or "error" in previous:
+            continue
+        changes = []
+        for section, metric in COMPARED_METRICS:
+            before = previous[section].get(metric)
+            if before:
+                changes.append(f"{metric} {percent_change(row[section][metric], before)}")
+        print(f"  {row['format']:<5} {row['size_kb']:>5}KB  " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline end-to-end benchmark of RAGService ingestion and queries on synthetic corpora"
+    )
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256], help="Document sizes in KB of text")
+    parser.add_argument("--queries", type=int, default=20, help="Streamed queries per document")
+    parser.add_argument("--vector-backend", choices=["chroma", "local"], default="chroma")
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--answer-tokens", type=int, default=40)
+    parser.add_argument("--request-latency", type=float, default=0.01, help="Stub embedding latency per request")
+    parser.add_argument("--per-input-latency", type=float, default=0.001, help="Stub embedding latency per input")
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the semantic answer cache enabled")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="JSON results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    started_at = datetime.now()
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, StubOllamaServer(
+        request_latency=args.request_latency,
+        per_input_latency=args.per_input_latency,
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens
+    ) as server:
+        workdir = Path(tmp)
+        if args.vector_backend == "chroma":
+            backend = ChromaVectorBackend(db_path=str(workdir / "chroma"), host=None)
+        else:
+            backend = LocalVectorBackend(root_path=str(workdir / "vectors"))
+        rag_service = RAGService(
+            llm_service=LLMService(host=server.url, embedding_model="stub-embed"),
+            vector_store_service=VectorStoreService(backend),
+            lexical_index_service=BM25IndexService(root_path=str(workdir / "bm25")),
+            embedding_cache=EmbeddingCache(workdir / "embedding_cache.sqlite3")
+        )
+        if not args.answer_cache:
+            rag_service.answer_cache = None
+        session_repo = SessionRepository(mongomock.MongoClient().rag_bench)
+
+        print(f"{'format':<6} {'size':>6} {'nodes':>6} {'nodes/s':>9} {'p50':>8} {'p95':>8} {'ttft p50':>9} {'ctx tok':>8} {'saved':>7}")
+        try:
+            for size_kb in args.sizes:
+                for file_format in args.formats:
+                    path = workdir / f"{file_format}_{size_kb}kb{SUFFIXES[file_format]}"
+                    WRITERS[file_format](path, rng, size_kb * 1024)
+                    session_id = session_repo.create({"filename": path.name, "file_path": str(path)})
+                    try:
+                        ingest = run_ingest(rag_service, path, session_id)
+                    except Exception as e:
+                        results.append({"format": file_format, "size_kb": size_kb, "error": str(e)})
+                        print(f"{file_format:<6} {size_kb:>4}KB skipped: {e}")
+                        continue
+                    query = run_queries(rag_service, session_repo, session_id, make_questions(rng, args.queries))
+                    row = {
+                        "format": file_format,
+                        "size_kb": size_kb,
+                        "file_bytes": path.stat().st_size,
+                        "ingest": ingest,
+                        "query": query
+                    }
+                    results.append(row)
+                    print(
+                        f"{file_format:<6} {size_kb:>4}KB {ingest['nodes']:>6} {ingest['nodes_per_second']:>9.1f} "
+                        f"{query['p50_ms']:>6.0f}ms {query['p95_ms']:>6.0f}ms {query['first_token_p50_ms']:>7.0f}ms "
+                        f"{query['context_tokens_mean']:>8.0f} {query['context_tokens_saved_mean']:>7.0f}"
+                    )
+        finally:
+            rag_service.close()
+
+    output = args.output or RESULTS_DIR / f"bench_suite_{started_at.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    run = {
+        "started_at": started_at.isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": results
+    }
+    output.write_text(json.dumps(run, indent=2))
+    print(f"peak RSS {run['peak_rss_mb']:.0f}MB")
+    print(f"results written to {output}")
+    if args.compare:
+        compare(run, args.compare)
+
+
+if __name__ == "__main__":
+    main()
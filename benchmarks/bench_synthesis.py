@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llama_index.core.llms import CompletionResponse, CompletionResponseGen, CustomLLM, LLMMetadata
+from llama_index.core.llms.callbacks import llm_completion_callback
+from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.utilities.token_counting import TokenCounter
+
+from src.backend.core.services.llm_usage import LLMUsage, track_llm_usage
+from src.backend.core.services.query_engine_service import SYNTHESIS_MODES, QueryEngineService
+
+
+class SimulatedLLM(CustomLLM):
+    context_window: int = 8192
+    num_output: int = 256
+    seconds_per_call: float = 0.05
+    seconds_per_prompt_token: float = 0.0002
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(context_window=self.context_window, num_output=self.num_output, model_name="simulated")
+
+    def _delay(self, prompt: str) -> float:
+        return self.seconds_per_call + self.seconds_per_prompt_token * TokenCounter().get_string_tokens(prompt)
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        time.sleep(self._delay(prompt))
+        return CompletionResponse(text="simulated answer")
+
+    @llm_completion_callback()
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        await asyncio.sleep(self._delay(prompt))
+        return CompletionResponse(text="simulated answer")
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        yield self.complete(prompt, formatted, **kwargs)
+
+
+def build_nodes(count: int, words: int):
+    return [
+        NodeWithScore(
+            node=TextNode(text=f"Chunk {i}. " + " ".join(f"detail{i}_{j}" for j in range(words))),
+            score=1.0 - i / count
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare LLM calls, prompt tokens and latency of synthesis modes")
+    parser.add_argument("--chunks", type=int, default=5, help="Retrieved chunks per question")
+    parser.add_argument("--words", type=int, nargs="+", default=[150, 600, 1500], help="Words per chunk (one run each)")
+    parser.add_argument("--context-window", type=int, default=8192)
+    parser.add_argument("--questions", type=int, default=3)
+    args = parser.parse_args()
+
+    service = QueryEngineService()
+    llm = SimulatedLLM(context_window=args.context_window)
+    for words in args.words:
+        nodes = build_nodes(args.chunks, words)
+        print(f"{args.chunks} chunks x {words} words, context window {args.context_window}")
+        for mode in SYNTHESIS_MODES:
+            synthesizer = service.create_synthesizer(llm, synthesis_mode=mode)
+            usage = LLMUsage()
+            start = time.perf_counter()
+            with track_llm_usage(usage):
+                for _ in range(args.questions):
+                    synthesizer.synthesize("What details does the document list?", nodes)
+            seconds = (time.perf_counter() - start) / args.questions
+            print(
+                f"  {mode:<15} calls={usage.llm_calls / args.questions:5.1f}  "
+                f"prompt_tokens={usage.prompt_tokens // args.questions:6d}  latency={seconds * 1000:7.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters, VectorStoreQuery
+
+from src.backend.core.vector_stores.base_vector_backend import BaseVectorBackend
+from src.backend.core.vector_stores.chroma_vector_backend import ChromaVectorBackend
+from src.backend.core.vector_stores.local_vector_backend import LocalVectorBackend
+
+MODEL = "bench-embed"
+
+
+def build_corpus(sessions: int, chunks: int, large_chunks: int, dim: int, seed: int) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    corpus = {}
+    for i in range(sessions):
+        size = large_chunks if i == 0 else chunks
+        centers = rng.normal(size=(16, dim))
+        vectors = centers[rng.integers(0, 16, size)] + 0.35 * rng.normal(size=(size, dim))
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        corpus[f"session-{i}"] = vectors.astype(np.float32)
+    return corpus
+
+
+def load(backend: BaseVectorBackend, corpus: Dict[str, np.ndarray], batch_size: int = 1000) -> float:
+    dim = next(iter(corpus.values())).shape[1]
+    store = backend.get_store(MODEL, dim)
+    start = time.perf_counter()
+    for session_id, vectors in corpus.items():
+        nodes = [
+            TextNode(
+                id_=f"{session_id}:{i}",
+                text=f"chunk {i}",
+                metadata={"session_id": session_id, "document_key": "doc"},
+                embedding=vector.tolist()
+            )
+            for i, vector in enumerate(vectors)
+        ]
+        for offset in range(0, len(nodes), batch_size):
+            store.add(nodes[offset:offset + batch_size])
+    backend.flush()
+    return time.perf_counter() - start
+
+
+def run_queries(
+    backend: BaseVectorBackend,
+    corpus: Dict[str, np.ndarray],
+    queries: List[Tuple[str, np.ndarray]],
+    top_k: int
+) -> Tuple[List[float], float]:
+    store = backend.get_store(MODEL)
+    latencies = []
+    recalls = []
+    for session_id, query in queries:
+        exact = np.argsort(-(corpus[session_id] @ query))[:top_k]
+        expected = {f"{session_id}:{i}" for i in exact}
+        filters = MetadataFilters(filters=[MetadataFilter(key="session_id", value=session_id)])
+        start = time.perf_counter()
+        result = store.query(VectorStoreQuery(query_embedding=query.tolist(), similarity_top_k=top_k, filters=filters))
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len(expected & set(result.ids)) / top_k)
+    return latencies, float(np.mean(recalls))
+
+
+def report(label: str, latencies: List[float], recall: float, top_k: int):
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+    print(f"  {label:<14} p50={p50:7.2f}ms  p95={p95:7.2f}ms  recall@{top_k}={recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieval latency and recall of the vector backends")
+    parser.add_argument("--sessions", type=int, default=8, help="Number of sessions in the shared collection")
+    parser.add_argument("--chunks", type=int, default=1000, help="Chunks per regular session")
+    parser.add_argument("--large-chunks", type=int, default=20000, help="Chunks in the first (large) session")
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per session size class")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--hnsw-threshold", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.sessions, args.chunks, args.large_chunks, args.dim, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+
+    def sample_queries(session_ids: List[str]) -> List[Tuple[str, np.ndarray]]:
+        queries = []
+        for _ in range(args.queries):
+            session_id = session_ids[rng.integers(0, len(session_ids))]
+            vectors = corpus[session_id]
+            query = vectors[rng.integers(0, len(vectors))] + 0.2 * rng.normal(size=args.dim)
+            queries.append((session_id, (query / np.linalg.norm(query)).astype(np.float32)))
+        return queries
+
+    small_queries = sample_queries(list(corpus)[1:] or list(corpus))
+    large_queries = sample_queries(list(corpus)[:1])
+    total = sum(len(vectors) for vectors in corpus.values())
+    print(f"{total} vectors, {args.sessions} sessions (largest {args.large_chunks}), dim={args.dim}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "chroma": ChromaVectorBackend(db_path=str(Path(tmp) / "chroma")),
+            "local": LocalVectorBackend(root_path=str(Path(tmp) / "local"), hnsw_threshold=args.hnsw_threshold),
+        }
+        for name, backend in backends.items():
+            print(f"{name}: loaded in {load(backend, corpus):.1f}s")
+            run_queries(backend, corpus, large_queries[:5], args.top_k)
+            report("small session", *run_queries(backend, corpus, small_queries, args.top_k), args.top_k)
+            report("large session", *run_queries(backend, corpus, large_queries, args.top_k), args.top_k)
+            backend.close()
+
+        reopened = LocalVectorBackend(root_path=str(Path(tmp) / "local"), hnsw_threshold=args.hnsw_threshold)
+        start = time.perf_counter()
+        reopened.get_store(MODEL)
+        print(f"local: reopened from disk in {(time.perf_counter() - start) * 1000:.0f}ms")
+        report("cold large", *run_queries(reopened, corpus, large_queries, args.top_k), args.top_k)
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.services.bm25_index import BM25IndexService
+from src.backend.core.services.llm_service import LLMService
+from src.backend.core.services.ollama_scheduler import OllamaScheduler
+from src.backend.core.services.rag_service import RAGService
+from src.backend.core.services.vector_store_service import VectorStoreService
+from src.backend.core.vector_stores.local_vector_backend import LocalVectorBackend
+
+
+def write_documents(workdir: Path, sessions: int) -> List[Path]:
+    paths = []
+    for i in range(sessions):
+        path = workdir / f"session_{i}.txt"
+        path.write_text("\n\n".join(
+            f"Session {i} paragraph {j}: component{i} handles step {j} of the pipeline." for j in range(40)
+        ))
+        paths.append(path)
+    return paths
+
+
+def make_questions(count: int, sessions: List[str]) -> List[Tuple[str, str]]:
+    questions = []
+    for i in range(count):
+        topic = "code" if i % 2 else "document"
+        questions.append((sessions[i % len(sessions)], f"request {i}: what does this {topic} say about step {i % 40}?"))
+    return questions
+
+
+def timed(fn: Callable[[], str]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_threads(rag_service: RAGService, questions: List[Tuple[str, str]], concurrency: int) -> List[float]:
+    def run(item: Tuple[int, Tuple[str, str]]) -> float:
+        index, (session_id, question) = item
+        if index % 2:
+            return timed(lambda: "".join(rag_service.stream_query(session_id, question)))
+        return timed(lambda: rag_service.query(session_id, question))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, enumerate(questions)))
+
+
+async def run_async(rag_service: RAGService, questions: List[Tuple[str, str]], concurrency: int) -> List[float]:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def stream(session_id: str, question: str) -> str:
+        return "".join([delta async for delta in rag_service.astream_query(session_id, question)])
+
+    async def run(index: int, session_id: str, question: str) -> float:
+        async with gate:
+            start = time.perf_counter()
+            if index % 2:
+                await stream(session_id, question)
+            else:
+                await rag_service.aquery(session_id, question)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(run(i, session_id, question) for i, (session_id, question) in enumerate(questions)))
+
+
+def report(label: str, latencies: List[float], elapsed: float):
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+    print(
+        f"  {label:<8} p50={p50:7.0f}ms  p95={p95:7.0f}ms  "
+        f"throughput={len(latencies) / elapsed:6.1f} req/s  wall={elapsed:.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load-test the RAG core against a stub Ollama: thread pool vs async path at increasing concurrency"
+    )
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--per-model-limit", type=int, default=4, help="Concurrent generations per model")
+    parser.add_argument("--first-token-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--modes", nargs="+", choices=["threads", "async"], default=["threads", "async"])
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp, StubOllamaServer(
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.tokens_per_second
+    ) as server:
+        workdir = Path(tmp)
+        rag_service = RAGService(
+            llm_service=LLMService(
+                host=server.url,
+                embedding_model="stub-embed",
+                scheduler=OllamaScheduler(
+                    host=server.url,
+                    default_concurrency=args.per_model_limit,
+                    max_loaded_models=2
+                )
+            ),
+            vector_store_service=VectorStoreService(LocalVectorBackend(root_path=str(workdir / "vectors"))),
+            lexical_index_service=BM25IndexService(root_path=str(workdir / "bm25"))
+        )
+        rag_service.answer_cache = None
+
+        session_ids = []
+        for i, path in enumerate(write_documents(workdir, args.sessions)):
+            session_id = f"session-{i}"
+            asyncio.run(rag_service.aprocess_file(path, session_id))
+            session_ids.append(session_id)
+
+        questions = make_questions(args.requests, session_ids)
+        print(
+            f"{args.requests} mixed query/stream requests, first token {args.first_token_latency * 1000:.0f}ms, "
+            f"{args.tokens_per_second:.0f} tok/s, {args.per_model_limit} generations per model"
+        )
+        for concurrency in args.concurrency:
+            print(f"concurrency {concurrency}")
+            for mode in args.modes:
+                start = time.perf_counter()
+                if mode == "threads":
+                    latencies = run_threads(rag_service, questions, concurrency)
+                else:
+                    latencies = asyncio.run(run_async(rag_service, questions, concurrency))
+                report(mode, latencies, time.perf_counter() - start)
+        rag_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional
+
+QUERY_PATTERN = re.compile(r"Query: (.*)")
+
+
+def deterministic_embedding(text: str, dim: int) -> List[float]:
+    vector = [0.0] * dim
+    for token in re.findall(r"[a-z0-9_]+", text.lower()):
+        vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % dim] += 1.0
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return [value / norm for value in vector]
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    server: "StubOllamaServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, payloads: Iterator[dict]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for payload in payloads:
+            line = json.dumps(payload).encode() + b"\n"
+            self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _generate(self, payload: dict, chat: bool) -> None:
+        model = payload.get("model", "")
+        self.server.load_model(model)
+        if chat:
+            prompt = "\n".join(message.get("content", "") for message in payload.get("messages", []))
+        else:
+            prompt = payload.get("prompt", "")
+            if not prompt:
+                self._send_json({"model": model, "response": "", "done": True, "done_reason": "load"})
+                return
+        tokens = self.server.start_generation(model, prompt)
+        prompt_tokens = len(prompt.split())
+        created_at = datetime.now(timezone.utc).isoformat()
+
+        def chunk(text: str, done: bool) -> dict:
+            body = {"message": {"role": "assistant", "content": text}} if chat else {"response": text}
+            body.update({"model": model, "created_at": created_at, "done": done})
+            if done:
+                body.update({"done_reason": "stop", "prompt_eval_count": prompt_tokens, "eval_count": len(tokens)})
+            return body
+
+        if not payload.get("stream", True):
+            for _ in tokens:
+                self.server.simulate_token()
+            self._send_json(chunk("".join(tokens), True))
+            return
+
+        def stream() -> Iterator[dict]:
+            for token in tokens:
+                self.server.simulate_token()
+                yield chunk(token, False)
+            yield chunk("", True)
+
+        self._send_stream(stream())
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self.path == "/api/embed":
+            inputs = payload.get("input", [])
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            self.server.simulate_embedding(len(inputs))
+            self._send_json({
+                "model": payload.get("model"),
+                "embeddings": [self.server.embed(text) for text in inputs]
+            })
+        elif self.path == "/api/embeddings":
+            self.server.simulate_embedding(1)
+            self._send_json({"embedding": self.server.embed(payload.get("prompt", ""))})
+        elif self.path == "/api/chat":
+            self._generate(payload, chat=True)
+        elif self.path == "/api/generate":
+            self._generate(payload, chat=False)
+        else:
+            self._send_json({"error": f"unsupported endpoint {self.path}"}, status=404)
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        embed_dim: int = 256,
+        request_latency: float = 0.02,
+        per_input_latency: float = 0.005,
+        first_token_latency: float = 0.05,
+        tokens_per_second: float = 200.0,
+        answer_tokens: int = 20,
+        model_load_latency: float = 0.0,
+        max_loaded_models: int = 1
+    ):
+        super().__init__((host, port), StubOllamaHandler)
+        self.embed_dim = embed_dim
+        self.request_latency = request_latency
+        self.per_input_latency = per_input_latency
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.model_load_latency = model_load_latency
+        self.max_loaded_models = max_loaded_models
+        self.loaded_models: "OrderedDict[str, None]" = OrderedDict()
+        self.model_loads: Counter = Counter()
+        self._model_lock = threading.Lock()
+        self.embed_requests = 0
+        self.generate_requests: Counter = Counter()
+        self._counter_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def embed(self, text: str) -> List[float]:
+        return deterministic_embedding(text, self.embed_dim)
+
+    def simulate_embedding(self, inputs: int) -> None:
+        with self._counter_lock:
+            self.embed_requests += 1
+        time.sleep(self.request_latency + self.per_input_latency * inputs)
+
+    def load_model(self, model: str) -> None:
+        with self._model_lock:
+            if model in self.loaded_models:
+                self.loaded_models.move_to_end(model)
+                return
+            self.model_loads[model] += 1
+            time.sleep(self.model_load_latency)
+            self.loaded_models[model] = None
+            while len(self.loaded_models) > self.max_loaded_models:
+                self.loaded_models.popitem(last=False)
+
+    def start_generation(self, model: str, prompt: str) -> List[str]:
+        with self._counter_lock:
+            self.generate_requests[model] += 1
+        queries = QUERY_PATTERN.findall(prompt)
+        question = queries[-1].strip() if queries else prompt[-80:]
+        time.sleep(self.first_token_latency)
+        return [f"[{model}] ", f"{question}"] + [" token"] * max(self.answer_tokens - 2, 0)
+
+    def simulate_token(self) -> None:
+        if self.tokens_per_second > 0:
+            time.sleep(1.0 / self.tokens_per_second)
+
+    def start(self) -> "StubOllamaServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StubOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a deterministic stand-in for the Ollama HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--embed-dim", type=int, default=256)
+    parser.add_argument("--request-latency", type=float, default=0.02)
+    parser.add_argument("--per-input-latency", type=float, default=0.005)
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--answer-tokens", type=int, default=20)
+    parser.add_argument("--model-load-latency", type=float, default=0.0, help="Seconds to swap a model into memory")
+    parser.add_argument("--max-loaded-models", type=int, default=1)
+    args = parser.parse_args()
+
+    server = StubOllamaServer(
+        args.host,
+        args.port,
+        embed_dim=args.embed_dim,
+        request_latency=args.request_latency,
+        per_input_latency=args.per_input_latency,
+        first_token_latency=args.first_token_latency,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        model_load_latency=args.model_load_latency,
+        max_loaded_models=args.max_loaded_models
+    )
+    print(f"Stub Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
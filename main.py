@@ -8,6 +8,7 @@ if __name__ == "__main__":
         "run",
         str(Path(__file__).parent / "src" / "frontend" / "streamlit_app.py"),
         "--server.port=8501",
-        "--server.address=0.0.0.0"
+        "--server.address=0.0.0.0",
+        "--server.maxUploadSize=500"
     ]
     sys.exit(stcli.main())
@@ -0,0 +1,280 @@
+import json
+import shutil
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.backend.core.services.chat_manager import ChatManager
+from src.backend.core.services.llm_usage import LLMUsage
+from src.backend.core.services.metrics import registry
+from src.backend.core.services.ollama_scheduler import OllamaScheduler
+from src.backend.core.services.tracing import PIPELINE_QUERY, STAGE_SESSION_LOOKUP, Trace
+from src.backend.core.services.service_container import get_container, shutdown_container
+from src.utils.config import (
+    CHAT_HISTORY_WINDOW,
+    COPY_BUFFER_BYTES,
+    MAX_UPLOAD_BYTES,
+    SESSION_PAGE_SIZE,
+    UPLOAD_FILE_TYPES,
+    UPLOADS_DIR
+)
+
+STATUS_FIELDS = ("status", "progress", "processed_chunks", "error", "ingest_stats")
+MAX_HISTORY_PAGE = 500
+MAX_SESSION_PAGE = 200
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+scheduler_queue_depth = registry.gauge("rag_scheduler_queue_depth", "Requests waiting for an Ollama slot", ("model",))
+scheduler_in_flight = registry.gauge("rag_scheduler_in_flight", "Ollama requests currently running", ("model",))
+scheduler_model_loaded = registry.gauge("rag_scheduler_model_loaded", "Whether the model is believed to be warm", ("model",))
+scheduler_requests = registry.counter("rag_scheduler_requests_total", "Ollama requests admitted by the scheduler", ("model",))
+scheduler_wait_seconds = registry.counter(
+    "rag_scheduler_wait_seconds_total", "Time requests spent queued for an Ollama slot", ("model",)
+)
+scheduler_model_loads = registry.counter("rag_scheduler_model_loads_total", "Cold model loads seen by the scheduler")
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _dumps(content: Any) -> str:
+    return json.dumps(content, default=_json_default, ensure_ascii=False)
+
+class APIResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return _dumps(content).encode("utf-8")
+
+def _chat_manager(request: Request) -> ChatManager:
+    return request.app.state.chat_manager
+
+async def _get_session_or_404(request: Request) -> Dict:
+    session = await _chat_manager(request).aget_session(request.path_params["session_id"])
+    if not session:
+        raise HTTPException(404, "Session not found")
+    return session
+
+async def _read_json(request: Request) -> Dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Request body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPException(400, "Request body must be a JSON object")
+    return body
+
+def _copy_upload(upload: UploadFile, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    upload.file.seek(0)
+    with destination.open("wb") as target:
+        shutil.copyfileobj(upload.file, target, COPY_BUFFER_BYTES)
+
+async def _save_upload(request: Request) -> Path:
+    async with request.form(max_files=1) as form:
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile) or not upload.filename:
+            raise HTTPException(400, "Expected a multipart 'file' field")
+        filename = Path(upload.filename).name
+        if Path(filename).suffix.lower().lstrip(".") not in UPLOAD_FILE_TYPES:
+            raise HTTPException(415, f"Unsupported file type. Allowed: {', '.join(UPLOAD_FILE_TYPES)}")
+        if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(413, f"File size exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit")
+        destination = UPLOADS_DIR / uuid.uuid4().hex / filename
+        await run_in_threadpool(_copy_upload, upload, destination)
+        return destination
+
+def _remove_upload(file_path: Optional[str]) -> None:
+    if not file_path:
+        return
+    upload_dir = Path(file_path).parent
+    if upload_dir.parent == UPLOADS_DIR:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+async def health(request: Request) -> Response:
+    return APIResponse({"status": "ok"})
+
+async def scheduler_stats(request: Request) -> Response:
+    scheduler = _chat_manager(request).rag_service.llm_service.scheduler
+    return APIResponse({"models": scheduler.stats(), "model_loads": scheduler.model_loads})
+
+def _export_scheduler_metrics(scheduler: OllamaScheduler) -> None:
+    for model, stats in scheduler.stats().items():
+        scheduler_queue_depth.set(stats["queue_depth"], model=model)
+        scheduler_in_flight.set(stats["in_flight"], model=model)
+        scheduler_model_loaded.set(int(stats["loaded"]), model=model)
+        scheduler_requests.set(stats["requests"], model=model)
+        scheduler_wait_seconds.set(stats["wait_seconds_total"], model=model)
+    scheduler_model_loads.set(scheduler.model_loads)
+
+async def metrics(request: Request) -> Response:
+    _export_scheduler_metrics(_chat_manager(request).rag_service.llm_service.scheduler)
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+def _page_limit(request: Request, default: int, maximum: int) -> int:
+    limit = int(request.query_params.get("limit", default))
+    if not 0 < limit <= maximum:
+        raise HTTPException(400, f"'limit' must be between 1 and {maximum}")
+    return limit
+
+async def list_sessions(request: Request) -> Response:
+    return APIResponse(await _chat_manager(request).alist_sessions(
+        search=request.query_params.get("search"),
+        after=request.query_params.get("after"),
+        limit=_page_limit(request, SESSION_PAGE_SIZE, MAX_SESSION_PAGE)
+    ))
+
+async def create_session(request: Request) -> Response:
+    file_path = await _save_upload(request)
+    session_id = await run_in_threadpool(_chat_manager(request).start_session, file_path.name, str(file_path))
+    return APIResponse({"session_id": session_id, "status": "processing"}, status_code=202)
+
+async def get_session(request: Request) -> Response:
+    return APIResponse(await _get_session_or_404(request))
+
+async def update_session(request: Request) -> Response:
+    await _get_session_or_404(request)
+    body = await _read_json(request)
+    if "retrieval_mode" in body:
+        await run_in_threadpool(
+            _chat_manager(request).set_retrieval_mode,
+            request.path_params["session_id"],
+            body["retrieval_mode"]
+        )
+    return APIResponse(await _get_session_or_404(request))
+
+async def delete_session(request: Request) -> Response:
+    await _get_session_or_404(request)
+    documents = await _chat_manager(request).adelete_session(request.path_params["session_id"])
+    for document in documents:
+        await run_in_threadpool(_remove_upload, document.get("file_path"))
+    return Response(status_code=204)
+
+async def get_status(request: Request) -> Response:
+    session = await _get_session_or_404(request)
+    return APIResponse({field: session.get(field) for field in STATUS_FIELDS})
+
+async def add_document(request: Request) -> Response:
+    await _get_session_or_404(request)
+    file_path = await _save_upload(request)
+    await run_in_threadpool(
+        _chat_manager(request).add_session_file,
+        request.path_params["session_id"],
+        file_path.name,
+        str(file_path)
+    )
+    return APIResponse({"filename": file_path.name, "status": "processing"}, status_code=202)
+
+async def remove_document(request: Request) -> Response:
+    session = await _get_session_or_404(request)
+    filename = request.path_params["filename"]
+    documents = {document["filename"]: document for document in ChatManager.get_session_documents(session)}
+    if filename not in documents:
+        raise HTTPException(404, "Document not found")
+    await run_in_threadpool(_chat_manager(request).remove_session_file, request.path_params["session_id"], filename)
+    await run_in_threadpool(_remove_upload, documents[filename].get("file_path"))
+    return Response(status_code=204)
+
+async def get_messages(request: Request) -> Response:
+    await _get_session_or_404(request)
+    return APIResponse(await _chat_manager(request).aget_chat_history(
+        request.path_params["session_id"],
+        _page_limit(request, CHAT_HISTORY_WINDOW, MAX_HISTORY_PAGE),
+        request.query_params.get("before")
+    ))
+
+def _sse(data: Dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {_dumps(data)}\n\n"
+
+async def query(request: Request) -> Response:
+    body = await _read_json(request)
+    question = body.get("question")
+    if not isinstance(question, str) or not question.strip():
+        raise HTTPException(400, "Expected a non-empty 'question'")
+    session_id = request.path_params["session_id"]
+    chat_manager = _chat_manager(request)
+    usage = LLMUsage()
+    trace = Trace(PIPELINE_QUERY)
+
+    if not body.get("stream", True):
+        answer = await chat_manager.aquery(session_id, question, usage, trace)
+        return APIResponse({"answer": answer, "usage": usage.to_dict(), "timing": trace.to_dict()})
+
+    with trace.span(STAGE_SESSION_LOOKUP):
+        session = await chat_manager.aget_queryable_session(session_id)
+
+    async def events() -> AsyncIterator[str]:
+        deltas = chat_manager.astream_query(session_id, question, usage, trace, session=session)
+        try:
+            async for delta in deltas:
+                yield _sse({"delta": delta})
+            yield _sse({"usage": usage.to_dict(), "timing": trace.to_dict()}, event="done")
+        finally:
+            await deltas.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def http_error(request: Request, exc: HTTPException) -> Response:
+    return APIResponse({"detail": exc.detail}, status_code=exc.status_code)
+
+async def value_error(request: Request, exc: ValueError) -> Response:
+    return APIResponse({"detail": str(exc)}, status_code=400)
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    if getattr(app.state, "chat_manager", None) is not None:
+        yield
+        return
+    container = get_container()
+    app.state.chat_manager = ChatManager(
+        mongo_client=container.get("mongo_client"),
+        rag_service=container.get("rag_service"),
+        ingestion_worker=container.get("ingestion_worker"),
+        async_mongo_client=container.get("async_mongo_client"),
+        history_writer=container.get("chat_history_writer"),
+        session_cache=container.get("session_cache")
+    )
+    try:
+        yield
+    finally:
+        await container.get("llm_service").aclose()
+        await run_in_threadpool(shutdown_container)
+
+def create_app(chat_manager: Optional[ChatManager] = None) -> Starlette:
+    app = Starlette(
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/metrics/scheduler", scheduler_stats, methods=["GET"]),
+            Route("/sessions", list_sessions, methods=["GET"]),
+            Route("/sessions", create_session, methods=["POST"]),
+            Route("/sessions/{session_id}", get_session, methods=["GET"]),
+            Route("/sessions/{session_id}", update_session, methods=["PATCH"]),
+            Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+            Route("/sessions/{session_id}/status", get_status, methods=["GET"]),
+            Route("/sessions/{session_id}/documents", add_document, methods=["POST"]),
+            Route("/sessions/{session_id}/documents/{filename}", remove_document, methods=["DELETE"]),
+            Route("/sessions/{session_id}/messages", get_messages, methods=["GET"]),
+            Route("/sessions/{session_id}/query", query, methods=["POST"])
+        ],
+        exception_handlers={HTTPException: http_error, ValueError: value_error},
+        lifespan=lifespan
+    )
+    app.state.chat_manager = chat_manager
+    return app
+
+app = create_app()
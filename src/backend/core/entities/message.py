@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -7,14 +7,16 @@ class Message:
     role: str
     content: str
     avatar: Optional[str] = None
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "role": self.role,
             "content": self.content,
             "avatar": self.avatar,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "metadata": self.metadata
         }
 
     @classmethod
@@ -23,5 +25,6 @@ class Message:
             role=data["role"],
             content=data["content"],
             avatar=data.get("avatar"),
-            timestamp=data.get("timestamp", datetime.utcnow())
+            timestamp=data.get("timestamp", datetime.utcnow()),
+            metadata=data.get("metadata", {})
         )
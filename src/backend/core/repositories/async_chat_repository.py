@@ -0,0 +1,97 @@
+from typing import List, Dict, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import BulkWriteError
+from src.backend.core.repositories.base_repository import AsyncBaseRepository
+from src.backend.core.repositories.chat_repository import (
+    BUCKET_FILTER,
+    MAX_APPEND_ATTEMPTS,
+    build_chat_messages,
+    build_history_page,
+    build_history_query,
+    build_tail,
+    failed_append_index,
+    flatten_messages,
+    history_bucket_limit,
+    plan_bucket_appends,
+    remaining_appends
+)
+from src.utils.config import CHAT_BUCKET_SIZE
+
+class AsyncChatRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncDatabase, bucket_size: int = CHAT_BUCKET_SIZE):
+        self.chats = db.chats
+        self.bucket_size = bucket_size
+        self._tails: Dict[str, Tuple[int, int]] = {}
+
+    async def create(self, data: Dict) -> str:
+        await self.append_messages({data["session_id"]: build_chat_messages(data)})
+        return data["session_id"]
+
+    async def get_all(self) -> List[Dict]:
+        return await self.chats.find({}, {"_id": 0}).to_list()
+
+    async def get_by_id(self, id: str) -> Optional[Dict]:
+        return await self.chats.find_one({"_id": id}, {"_id": 0})
+
+    async def update(self, id: str, data: Dict) -> None:
+        await self.chats.update_one(
+            {"_id": id},
+            {"$set": data}
+        )
+
+    async def _tail(self, session_id: str) -> Tuple[int, int]:
+        tail = self._tails.get(session_id)
+        if tail is None:
+            tail = build_tail(await self.chats.find_one(
+                {"session_id": session_id, **BUCKET_FILTER},
+                {"_id": 0, "bucket": 1, "count": 1},
+                sort=[("bucket", DESCENDING)]
+            ))
+        return tail
+
+    async def append_messages(self, messages_by_session: Dict[str, List[Dict]]) -> None:
+        for _ in range(MAX_APPEND_ATTEMPTS):
+            operations: List[UpdateOne] = []
+            sessions: List[str] = []
+            chunks: List[List[Dict]] = []
+            tails: Dict[str, Tuple[int, int]] = {}
+            for session_id, messages in messages_by_session.items():
+                session_operations, session_chunks, tails[session_id] = plan_bucket_appends(
+                    session_id, await self._tail(session_id), messages, self.bucket_size
+                )
+                operations.extend(session_operations)
+                chunks.extend(session_chunks)
+                sessions.extend([session_id] * len(session_chunks))
+            if not operations:
+                return
+            try:
+                await self.chats.bulk_write(operations, ordered=True)
+                self._tails.update(tails)
+                return
+            except BulkWriteError as error:
+                messages_by_session = remaining_appends(sessions, chunks, failed_append_index(error))
+            for session_id, tail in tails.items():
+                if session_id in messages_by_session:
+                    self._tails.pop(session_id, None)
+                else:
+                    self._tails[session_id] = tail
+        raise RuntimeError("Could not append chat messages: buckets kept changing under concurrent writers")
+
+    async def get_history(self, session_id: str) -> List[Dict]:
+        bucket_docs = await self.chats.find(
+            {"session_id": session_id, **BUCKET_FILTER},
+            {"_id": 0, "messages": 1}
+        ).sort("bucket", ASCENDING).to_list()
+        return flatten_messages(bucket_docs)
+
+    async def get_recent(self, session_id: str, limit: int, before: Optional[str] = None) -> Dict:
+        bucket_docs = await self.chats.find(
+            build_history_query(session_id, before),
+            {"_id": 0, "bucket": 1, "messages": 1}
+        ).sort("bucket", DESCENDING).limit(history_bucket_limit(limit, self.bucket_size)).to_list()
+        return build_history_page(bucket_docs, limit, before)
+
+    async def delete_history(self, session_id: str) -> None:
+        await self.chats.delete_many({"session_id": session_id})
+        self._tails.pop(session_id, None)
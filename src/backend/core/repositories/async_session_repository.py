@@ -0,0 +1,125 @@
+from typing import Any, List, Dict, Optional
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from src.backend.core.repositories.base_repository import AsyncBaseRepository
+from src.backend.core.repositories.session_repository import (
+    INTERRUPTED_ERROR,
+    LIST_ORDER,
+    LIST_PROJECTION,
+    STATUS_FAILED,
+    build_access_update,
+    build_document_push,
+    build_interrupted_filter,
+    build_list_page,
+    build_list_query,
+    build_primary_document_update,
+    build_search_query,
+    build_session_document,
+    build_status_update,
+    invalidate_session_cache,
+    is_progress_only
+)
+from src.utils.cache import LRUCache
+
+class AsyncSessionRepository(AsyncBaseRepository):
+    def __init__(self, db: AsyncDatabase, cache: Optional[LRUCache[Any]] = None):
+        self.sessions = db.sessions
+        self.cache = cache
+
+    def _changed(self, session_id: Optional[str] = None, listing: bool = True, counts: bool = False) -> None:
+        invalidate_session_cache(self.cache, session_id, listing, counts)
+
+    async def create(self, data: Dict) -> str:
+        session_doc = build_session_document(data)
+        await self.sessions.insert_one(session_doc)
+        self._changed(session_doc["session_id"], counts=True)
+        return session_doc["session_id"]
+
+    async def get_all(self) -> List[Dict]:
+        return await self.sessions.find({}, {"_id": 0}).sort(LIST_ORDER).to_list()
+
+    async def count(self, search: Optional[str] = None) -> int:
+        query = build_search_query(search)
+        if query:
+            return await self.sessions.count_documents(query)
+        return await self.sessions.estimated_document_count()
+
+    async def list_page(self, limit: int, after: Optional[str] = None, search: Optional[str] = None) -> Dict:
+        key = ("page", search, after, limit)
+        page = self.cache.get(key) if self.cache is not None else None
+        if page is None:
+            sessions = await self.sessions.find(
+                build_list_query(search, after), LIST_PROJECTION
+            ).sort(LIST_ORDER).limit(limit + 1).to_list()
+            total = self.cache.get(("count", search)) if self.cache is not None else None
+            if total is None:
+                total = await self.count(search)
+            page = build_list_page(sessions, limit, total)
+            if self.cache is not None:
+                self.cache.put(("count", search), total)
+                self.cache.put(key, page)
+        return page
+
+    async def get_by_id(self, id: str) -> Optional[Dict]:
+        return await self.sessions.find_one({"session_id": id}, {"_id": 0})
+
+    async def update(self, id: str, data: Dict) -> None:
+        await self.sessions.update_one(
+            {"session_id": id},
+            {"$set": data}
+        )
+        self._changed(id)
+
+    async def update_access(self, session_id: str) -> None:
+        await self.sessions.update_one({"session_id": session_id}, build_access_update())
+        self._changed(session_id)
+
+    async def update_status(
+        self,
+        session_id: str,
+        status: Optional[str] = None,
+        progress: Optional[float] = None,
+        error: Optional[str] = None,
+        processed_chunks: Optional[int] = None
+    ) -> None:
+        update = build_status_update(status, progress, error, processed_chunks)
+        if update:
+            await self.sessions.update_one({"session_id": session_id}, {"$set": update})
+            self._changed(session_id, listing=not is_progress_only(update))
+
+    async def mark_interrupted(self, session: Dict) -> bool:
+        result = await self.sessions.update_one(
+            build_interrupted_filter(session),
+            {"$set": build_status_update(status=STATUS_FAILED, error=INTERRUPTED_ERROR)}
+        )
+        self._changed(session["session_id"])
+        return result.modified_count > 0
+
+    async def upsert_document(self, session_id: str, filename: str, file_path: str) -> None:
+        await self.sessions.update_one(
+            {"session_id": session_id},
+            {"$pull": {"documents": {"filename": filename}}}
+        )
+        await self.sessions.update_one(
+            {"session_id": session_id},
+            build_document_push(filename, file_path)
+        )
+        self._changed(session_id, counts=True)
+
+    async def remove_document(self, session_id: str, filename: str) -> None:
+        session = await self.sessions.find_one_and_update(
+            {"session_id": session_id},
+            {"$pull": {"documents": {"filename": filename}}},
+            projection={"_id": 0, "filename": 1, "file_path": 1, "documents": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if session:
+            await self.sessions.update_one(
+                {"session_id": session_id},
+                {"$set": build_primary_document_update(session)}
+            )
+        self._changed(session_id, counts=True)
+
+    async def delete(self, session_id: str) -> None:
+        await self.sessions.delete_one({"session_id": session_id})
+        self._changed(session_id, counts=True)
@@ -17,3 +17,20 @@ class BaseRepository(ABC):
     @abstractmethod
     def update(self, id: str, data: Dict) -> None:
         pass
+
+class AsyncBaseRepository(ABC):
+    @abstractmethod
+    async def create(self, data: Dict) -> str:
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, id: str) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    async def update(self, id: str, data: Dict) -> None:
+        pass
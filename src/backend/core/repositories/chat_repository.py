@@ -1,22 +1,137 @@
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError
 from src.backend.core.entities.message import Message
 from src.backend.core.repositories.base_repository import BaseRepository
+from src.utils.config import CHAT_BUCKET_SIZE
+
+BUCKET_INDEX = [("session_id", ASCENDING), ("bucket", DESCENDING)]
+BUCKET_FILTER = {"bucket": {"$exists": True}}
+DUPLICATE_KEY = 11000
+MAX_APPEND_ATTEMPTS = 3
+
+def build_chat_messages(data: Dict) -> List[Dict]:
+    return [
+        Message("user", data["question"]).to_dict(),
+        Message("assistant", data["answer"], metadata=data.get("metadata", {})).to_dict()
+    ]
+
+def flatten_messages(chat_docs: Iterable[Dict]) -> List[Dict]:
+    messages = []
+    for doc in chat_docs:
+        messages.extend(doc["messages"])
+    return messages
+
+def build_tail(doc: Optional[Dict]) -> Tuple[int, int]:
+    return (doc["bucket"], doc["count"]) if doc else (0, 0)
+
+def plan_bucket_appends(
+    session_id: str,
+    tail: Tuple[int, int],
+    messages: List[Dict],
+    bucket_size: int
+) -> Tuple[List[UpdateOne], List[List[Dict]], Tuple[int, int]]:
+    bucket, count = tail
+    operations: List[UpdateOne] = []
+    chunks: List[List[Dict]] = []
+    position = 0
+    while position < len(messages):
+        if count >= bucket_size:
+            bucket, count = bucket + 1, 0
+        chunk = messages[position:position + bucket_size - count]
+        operations.append(UpdateOne(
+            {"session_id": session_id, "bucket": bucket, "count": {"$lte": bucket_size - len(chunk)}},
+            {
+                "$push": {"messages": {"$each": chunk}},
+                "$inc": {"count": len(chunk)},
+                "$min": {"first_at": chunk[0]["timestamp"]},
+                "$max": {"last_at": chunk[-1]["timestamp"]}
+            },
+            upsert=True
+        ))
+        chunks.append(chunk)
+        count += len(chunk)
+        position += len(chunk)
+    return operations, chunks, (bucket, count)
+
+def failed_append_index(error: BulkWriteError) -> int:
+    write_errors = error.details.get("writeErrors", [])
+    if not write_errors or write_errors[0].get("code") != DUPLICATE_KEY:
+        raise error
+    return write_errors[0]["index"]
+
+def remaining_appends(sessions: List[str], chunks: List[List[Dict]], failed_index: int) -> Dict[str, List[Dict]]:
+    remaining: Dict[str, List[Dict]] = {}
+    for session_id, chunk in zip(sessions[failed_index:], chunks[failed_index:]):
+        remaining.setdefault(session_id, []).extend(chunk)
+    return remaining
+
+def group_legacy_messages(legacy_docs: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    grouped: Dict[str, List[Dict]] = {}
+    for doc in legacy_docs:
+        grouped.setdefault(doc["session_id"], []).extend(doc.get("messages", []))
+    return grouped
+
+def parse_cursor(before: str) -> Tuple[int, int]:
+    try:
+        bucket, offset = (int(part) for part in before.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid history cursor: {before}")
+    return bucket, offset
+
+def build_history_query(session_id: str, before: Optional[str]) -> Dict:
+    query: Dict = {"session_id": session_id, **BUCKET_FILTER}
+    if before:
+        query["bucket"] = {"$exists": True, "$lte": parse_cursor(before)[0]}
+    return query
+
+def history_bucket_limit(limit: int, bucket_size: int) -> int:
+    return limit // bucket_size + 2
+
+def build_history_page(bucket_docs: Iterable[Dict], limit: int, before: Optional[str]) -> Dict:
+    cursor = parse_cursor(before) if before else None
+    chunks: List[List[Dict]] = []
+    oldest: Optional[Tuple[int, int]] = None
+    remaining = limit
+    for doc in bucket_docs:
+        if remaining <= 0:
+            break
+        messages = doc["messages"]
+        end = min(cursor[1], len(messages)) if cursor and doc["bucket"] == cursor[0] else len(messages)
+        start = max(0, end - remaining)
+        chunks.append(messages[start:end])
+        remaining -= end - start
+        oldest = (doc["bucket"], start)
+    has_more = oldest is not None and (oldest[0] > 0 or oldest[1] > 0)
+    return {
+        "messages": [message for chunk in reversed(chunks) for message in chunk],
+        "before": f"{oldest[0]}:{oldest[1]}" if has_more else None
+    }
 
 class ChatRepository(BaseRepository):
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, bucket_size: int = CHAT_BUCKET_SIZE):
         self.chats = db.chats
+        self.bucket_size = bucket_size
+        self._tails: Dict[str, Tuple[int, int]] = {}
+
+    def ensure_indexes(self) -> None:
+        self.migrate_legacy_history()
+        self.chats.create_index(BUCKET_INDEX, unique=True, partialFilterExpression=BUCKET_FILTER)
+
+    def migrate_legacy_history(self) -> None:
+        legacy_docs = list(self.chats.find(
+            {"bucket": {"$exists": False}},
+            {"session_id": 1, "messages": 1}
+        ).sort("_id", ASCENDING))
+        if not legacy_docs:
+            return
+        self.append_messages(group_legacy_messages(legacy_docs))
+        self.chats.delete_many({"_id": {"$in": [doc["_id"] for doc in legacy_docs]}})
 
     def create(self, data: Dict) -> str:
-        chat_doc = {
-            "session_id": data["session_id"],
-            "messages": [
-                Message("user", data["question"]).to_dict(),
-                Message("assistant", data["answer"]).to_dict()
-            ]
-        }
-        result = self.chats.insert_one(chat_doc)
-        return str(result.inserted_id)
+        self.append_messages({data["session_id"]: build_chat_messages(data)})
+        return data["session_id"]
 
     def get_all(self) -> List[Dict]:
         return list(self.chats.find({}, {"_id": 0}))
@@ -30,13 +145,58 @@ class ChatRepository(BaseRepository):
             {"$set": data}
         )
 
+    def _tail(self, session_id: str) -> Tuple[int, int]:
+        tail = self._tails.get(session_id)
+        if tail is None:
+            tail = build_tail(self.chats.find_one(
+                {"session_id": session_id, **BUCKET_FILTER},
+                {"_id": 0, "bucket": 1, "count": 1},
+                sort=[("bucket", DESCENDING)]
+            ))
+        return tail
+
+    def append_messages(self, messages_by_session: Dict[str, List[Dict]]) -> None:
+        for _ in range(MAX_APPEND_ATTEMPTS):
+            operations: List[UpdateOne] = []
+            sessions: List[str] = []
+            chunks: List[List[Dict]] = []
+            tails: Dict[str, Tuple[int, int]] = {}
+            for session_id, messages in messages_by_session.items():
+                session_operations, session_chunks, tails[session_id] = plan_bucket_appends(
+                    session_id, self._tail(session_id), messages, self.bucket_size
+                )
+                operations.extend(session_operations)
+                chunks.extend(session_chunks)
+                sessions.extend([session_id] * len(session_chunks))
+            if not operations:
+                return
+            try:
+                self.chats.bulk_write(operations, ordered=True)
+                self._tails.update(tails)
+                return
+            except BulkWriteError as error:
+                messages_by_session = remaining_appends(sessions, chunks, failed_append_index(error))
+            for session_id, tail in tails.items():
+                if session_id in messages_by_session:
+                    self._tails.pop(session_id, None)
+                else:
+                    self._tails[session_id] = tail
+        raise RuntimeError("Could not append chat messages: buckets kept changing under concurrent writers")
+
     def get_history(self, session_id: str) -> List[Dict]:
-        chat_docs = self.chats.find(
-            {"session_id": session_id},
-            {"_id": 0}
-        ).sort("messages.timestamp", 1)
-        
-        messages = []
-        for doc in chat_docs:
-            messages.extend(doc["messages"])
-        return messages
+        bucket_docs = self.chats.find(
+            {"session_id": session_id, **BUCKET_FILTER},
+            {"_id": 0, "messages": 1}
+        ).sort("bucket", ASCENDING)
+        return flatten_messages(bucket_docs)
+
+    def get_recent(self, session_id: str, limit: int, before: Optional[str] = None) -> Dict:
+        bucket_docs = self.chats.find(
+            build_history_query(session_id, before),
+            {"_id": 0, "bucket": 1, "messages": 1}
+        ).sort("bucket", DESCENDING).limit(history_bucket_limit(limit, self.bucket_size))
+        return build_history_page(bucket_docs, limit, before)
+
+    def delete_history(self, session_id: str) -> None:
+        self.chats.delete_many({"session_id": session_id})
+        self._tails.pop(session_id, None)
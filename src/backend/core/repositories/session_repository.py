@@ -1,43 +1,335 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import re
 import uuid
-from typing import List, Dict, Optional
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 from pymongo.database import Database
 from src.backend.core.repositories.base_repository import BaseRepository
+from src.utils.cache import LRUCache
+from src.utils.config import DEFAULT_RETRIEVAL_MODE
+
+STATUS_PROCESSING = "processing"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+INTERRUPTED_ERROR = "Processing was interrupted. Please upload the file again."
+
+LIST_ORDER = [("last_accessed", DESCENDING), ("session_id", DESCENDING)]
+LIST_PROJECTION = {
+    "_id": 0,
+    "session_id": 1,
+    "filename": 1,
+    "created_at": 1,
+    "last_accessed": 1,
+    "message_count": 1,
+    "status": 1,
+    "processed_chunks": 1
+}
+
+def build_filename_terms(filenames: Iterable[str]) -> List[str]:
+    terms = set()
+    for filename in filenames:
+        name = filename.lower()
+        terms.update(name[match.start():] for match in re.finditer(r"[a-z0-9]+", name))
+        terms.add(name)
+    return sorted(terms)
+
+def session_filenames(session: Dict) -> List[str]:
+    if session.get("documents"):
+        return [document["filename"] for document in session["documents"]]
+    return [session["filename"]]
+
+def build_session_document(data: Dict) -> Dict:
+    return {
+        "session_id": str(uuid.uuid4()),
+        "filename": data["filename"],
+        "file_path": data["file_path"],
+        "documents": [build_document_entry(data["filename"], data["file_path"])],
+        "filename_terms": build_filename_terms([data["filename"]]),
+        "created_at": datetime.utcnow(),
+        "last_accessed": datetime.utcnow(),
+        "message_count": 0,
+        "status": data.get("status", STATUS_READY),
+        "status_updated_at": datetime.utcnow(),
+        "progress": 0.0,
+        "processed_chunks": 0,
+        "error": None,
+        "retrieval_mode": data.get("retrieval_mode", DEFAULT_RETRIEVAL_MODE)
+    }
+
+def is_progress_only(update: Dict) -> bool:
+    return "status" not in update and "error" not in update
+
+def build_primary_document_update(session: Dict) -> Dict:
+    primary = session["documents"][0] if session.get("documents") else session
+    return {
+        "filename": primary["filename"],
+        "file_path": primary["file_path"],
+        "filename_terms": build_filename_terms(session_filenames(session))
+    }
+
+def build_status_update(
+    status: Optional[str] = None,
+    progress: Optional[float] = None,
+    error: Optional[str] = None,
+    processed_chunks: Optional[int] = None
+) -> Dict:
+    update: Dict = {}
+    if status is not None:
+        update["status"] = status
+    if progress is not None:
+        update["progress"] = progress
+    if processed_chunks is not None:
+        update["processed_chunks"] = processed_chunks
+    if error is not None:
+        update["error"] = error
+    if update:
+        update["status_updated_at"] = datetime.utcnow()
+    return update
+
+def build_ingest_stats(timing: Dict) -> Dict:
+    return {
+        "chunks": timing.get("chunks", 0),
+        "embedded": timing.get("embedded", 0),
+        "total_ms": timing["total_ms"],
+        "chunks_per_second": timing.get("chunks_per_second", 0.0)
+    }
+
+def build_processing_update(owner: Optional[str] = None) -> Dict:
+    return {
+        "status": STATUS_PROCESSING,
+        "status_updated_at": datetime.utcnow(),
+        "ingest_owner": owner,
+        "progress": 0.0,
+        "processed_chunks": 0,
+        "error": None
+    }
+
+def build_interrupted_filter(session: Dict) -> Dict:
+    return {
+        "session_id": session["session_id"],
+        "status": STATUS_PROCESSING,
+        "status_updated_at": session.get("status_updated_at")
+    }
+
+def stale_cutoff(stale_after: float) -> datetime:
+    return datetime.utcnow() - timedelta(seconds=stale_after)
+
+def is_stale_processing(session: Dict, stale_after: float) -> bool:
+    if session.get("status") != STATUS_PROCESSING:
+        return False
+    updated_at = session.get("status_updated_at")
+    return updated_at is None or updated_at < stale_cutoff(stale_after)
+
+def build_document_entry(filename: str, file_path: str) -> Dict:
+    return {
+        "filename": filename,
+        "file_path": file_path,
+        "added_at": datetime.utcnow()
+    }
+
+def build_document_push(filename: str, file_path: str) -> Dict:
+    return {
+        "$push": {"documents": build_document_entry(filename, file_path)},
+        "$addToSet": {"filename_terms": {"$each": build_filename_terms([filename])}}
+    }
+
+def build_access_update(message_count: int = 1) -> Dict:
+    return {
+        "$set": {"last_accessed": datetime.utcnow()},
+        "$inc": {"message_count": message_count}
+    }
+
+def format_list_cursor(session: Dict) -> str:
+    return f"{session['last_accessed'].isoformat()}|{session['session_id']}"
+
+def parse_list_cursor(after: str) -> Tuple[datetime, str]:
+    try:
+        last_accessed, session_id = after.split("|", 1)
+        return datetime.fromisoformat(last_accessed), session_id
+    except ValueError:
+        raise ValueError(f"Invalid session cursor: {after}")
+
+def build_search_query(search: Optional[str]) -> Dict:
+    search = (search or "").strip().lower()
+    return {"filename_terms": {"$regex": f"^{re.escape(search)}"}} if search else {}
+
+def build_list_query(search: Optional[str], after: Optional[str]) -> Dict:
+    query = build_search_query(search)
+    if after:
+        last_accessed, session_id = parse_list_cursor(after)
+        query["$or"] = [
+            {"last_accessed": {"$lt": last_accessed}},
+            {"last_accessed": last_accessed, "session_id": {"$lt": session_id}}
+        ]
+    return query
+
+def invalidate_session_cache(
+    cache: Optional[LRUCache[Any]],
+    session_id: Optional[str] = None,
+    listing: bool = True,
+    counts: bool = False
+) -> None:
+    if cache is None:
+        return
+    kinds = {"page"} if listing else set()
+    if counts:
+        kinds.add("count")
+    if session_id is None:
+        kinds.add("session")
+    else:
+        cache.invalidate(("session", session_id))
+    if kinds:
+        cache.invalidate_where(lambda key: key[0] in kinds)
+
+def build_list_page(sessions: List[Dict], limit: int, total: int) -> Dict:
+    has_more = len(sessions) > limit
+    sessions = sessions[:limit]
+    return {
+        "sessions": sessions,
+        "after": format_list_cursor(sessions[-1]) if has_more else None,
+        "total": total
+    }
 
 class SessionRepository(BaseRepository):
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, cache: Optional[LRUCache[Any]] = None):
         self.sessions = db.sessions
-        
+        self.cache = cache
+
+    def ensure_indexes(self) -> None:
+        self.sessions.create_index([("session_id", ASCENDING)], unique=True)
+        self.sessions.create_index(LIST_ORDER)
+        self.sessions.create_index([("filename_terms", ASCENDING), *LIST_ORDER])
+        self._backfill_filename_terms()
+
+    def _backfill_filename_terms(self) -> None:
+        updates = [
+            UpdateOne(
+                {"session_id": session["session_id"]},
+                {"$set": {"filename_terms": build_filename_terms(session_filenames(session))}}
+            )
+            for session in self.sessions.find(
+                {"filename_terms": {"$exists": False}},
+                {"_id": 0, "session_id": 1, "filename": 1, "documents.filename": 1}
+            )
+        ]
+        if updates:
+            self.sessions.bulk_write(updates, ordered=False)
+
+    def _changed(self, session_id: Optional[str] = None, listing: bool = True, counts: bool = False) -> None:
+        invalidate_session_cache(self.cache, session_id, listing, counts)
+
+    def _cached(self, key: Tuple, load: Callable[[], Any]) -> Any:
+        if self.cache is None:
+            return load()
+        value = self.cache.get(key)
+        if value is None:
+            value = load()
+            if value is not None:
+                self.cache.put(key, value)
+        return value
+
     def create(self, data: Dict) -> str:
-        session_id = str(uuid.uuid4())
-        session_doc = {
-            "session_id": session_id,
-            "filename": data["filename"],
-            "file_path": data["file_path"],
-            "created_at": datetime.utcnow(),
-            "last_accessed": datetime.utcnow(),
-            "message_count": 0
-        }
+        session_doc = build_session_document(data)
         self.sessions.insert_one(session_doc)
-        return session_id
+        self._changed(session_doc["session_id"], counts=True)
+        return session_doc["session_id"]
 
     def get_all(self) -> List[Dict]:
-        return list(self.sessions.find({}, {"_id": 0}).sort("last_accessed", -1))
+        return list(self.sessions.find({}, {"_id": 0}).sort(LIST_ORDER))
+
+    def count(self, search: Optional[str] = None) -> int:
+        query = build_search_query(search)
+        return self.sessions.count_documents(query) if query else self.sessions.estimated_document_count()
+
+    def list_page(self, limit: int, after: Optional[str] = None, search: Optional[str] = None) -> Dict:
+        def load() -> Dict:
+            sessions = list(
+                self.sessions.find(build_list_query(search, after), LIST_PROJECTION).sort(LIST_ORDER).limit(limit + 1)
+            )
+            total = self._cached(("count", search), lambda: self.count(search))
+            return build_list_page(sessions, limit, total)
+
+        return self._cached(("page", search, after, limit), load)
 
     def get_by_id(self, id: str) -> Optional[Dict]:
         return self.sessions.find_one({"session_id": id}, {"_id": 0})
 
+    def get_cached(self, session_id: str) -> Optional[Dict]:
+        return self._cached(("session", session_id), lambda: self.get_by_id(session_id))
+
     def update(self, id: str, data: Dict) -> None:
         self.sessions.update_one(
             {"session_id": id},
             {"$set": data}
         )
+        self._changed(id)
 
     def update_access(self, session_id: str) -> None:
+        self.sessions.update_one({"session_id": session_id}, build_access_update())
+        self._changed(session_id)
+
+    def record_messages(self, message_counts: Dict[str, int]) -> None:
+        if message_counts:
+            self.sessions.bulk_write([
+                UpdateOne({"session_id": session_id}, build_access_update(count))
+                for session_id, count in message_counts.items()
+            ], ordered=False)
+            self._changed()
+
+    def update_status(
+        self,
+        session_id: str,
+        status: Optional[str] = None,
+        progress: Optional[float] = None,
+        error: Optional[str] = None,
+        processed_chunks: Optional[int] = None
+    ) -> None:
+        update = build_status_update(status, progress, error, processed_chunks)
+        if update:
+            self.sessions.update_one({"session_id": session_id}, {"$set": update})
+            self._changed(session_id, listing=not is_progress_only(update))
+
+    def upsert_document(self, session_id: str, filename: str, file_path: str) -> None:
         self.sessions.update_one(
             {"session_id": session_id},
-            {
-                "$set": {"last_accessed": datetime.utcnow()},
-                "$inc": {"message_count": 1}
-            }
+            {"$pull": {"documents": {"filename": filename}}}
         )
+        self.sessions.update_one(
+            {"session_id": session_id},
+            build_document_push(filename, file_path)
+        )
+        self._changed(session_id, counts=True)
+
+    def heartbeat(self, session_ids: List[str]) -> None:
+        self.sessions.update_many(
+            {"session_id": {"$in": session_ids}, "status": STATUS_PROCESSING},
+            {"$set": {"status_updated_at": datetime.utcnow()}}
+        )
+        for session_id in session_ids:
+            self._changed(session_id, listing=False)
+
+    def mark_interrupted(self, session: Dict) -> bool:
+        result = self.sessions.update_one(
+            build_interrupted_filter(session),
+            {"$set": build_status_update(status=STATUS_FAILED, error=INTERRUPTED_ERROR)}
+        )
+        self._changed(session["session_id"])
+        return result.modified_count > 0
+
+    def remove_document(self, session_id: str, filename: str) -> None:
+        session = self.sessions.find_one_and_update(
+            {"session_id": session_id},
+            {"$pull": {"documents": {"filename": filename}}},
+            projection={"_id": 0, "filename": 1, "file_path": 1, "documents": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if session:
+            self.sessions.update_one(
+                {"session_id": session_id},
+                {"$set": build_primary_document_update(session)}
+            )
+        self._changed(session_id, counts=True)
+
+    def delete(self, session_id: str) -> None:
+        self.sessions.delete_one({"session_id": session_id})
+        self._changed(session_id, counts=True)
@@ -0,0 +1,65 @@
+from typing import Any, Optional, Sequence
+
+from llama_index.core.callbacks import CallbackManager
+from llama_index.core.indices.prompt_helper import PromptHelper
+from llama_index.core.llms import LLM
+from llama_index.core.prompts.default_prompt_selectors import DEFAULT_TEXT_QA_PROMPT_SEL
+from llama_index.core.prompts.mixin import PromptDictType
+from llama_index.core.response_synthesizers import BaseSynthesizer, ResponseMode, get_response_synthesizer
+from llama_index.core.types import RESPONSE_TEXT_TYPE
+
+class AdaptiveSynthesizer(BaseSynthesizer):
+    def __init__(
+        self,
+        llm: LLM,
+        callback_manager: Optional[CallbackManager] = None,
+        streaming: bool = False,
+        context_budget: Optional[int] = None
+    ):
+        super().__init__(llm=llm, callback_manager=callback_manager, streaming=streaming)
+        context_window = llm.metadata.context_window
+        if context_budget:
+            context_window = min(context_window, context_budget)
+        self._budget_helper = PromptHelper(context_window=context_window, num_output=llm.metadata.num_output)
+        self._single_call = get_response_synthesizer(
+            llm=llm,
+            response_mode=ResponseMode.COMPACT,
+            prompt_helper=self._budget_helper,
+            callback_manager=callback_manager,
+            streaming=streaming
+        )
+        self._multi_call = get_response_synthesizer(
+            llm=llm,
+            response_mode=ResponseMode.TREE_SUMMARIZE,
+            prompt_helper=self._budget_helper,
+            callback_manager=callback_manager,
+            streaming=streaming,
+            use_async=True
+        )
+
+    def _get_prompts(self) -> PromptDictType:
+        return {}
+
+    def _update_prompts(self, prompts: PromptDictType) -> None:
+        pass
+
+    def _select(self, query_str: str, text_chunks: Sequence[str]) -> BaseSynthesizer:
+        prompt = DEFAULT_TEXT_QA_PROMPT_SEL.select(llm=self._llm).partial_format(query_str=query_str)
+        packed = self._budget_helper.repack(prompt, list(text_chunks), llm=self._llm)
+        return self._single_call if len(packed) <= 1 else self._multi_call
+
+    def get_response(
+        self,
+        query_str: str,
+        text_chunks: Sequence[str],
+        **response_kwargs: Any
+    ) -> RESPONSE_TEXT_TYPE:
+        return self._select(query_str, text_chunks).get_response(query_str, text_chunks, **response_kwargs)
+
+    async def aget_response(
+        self,
+        query_str: str,
+        text_chunks: Sequence[str],
+        **response_kwargs: Any
+    ) -> RESPONSE_TEXT_TYPE:
+        return await self._select(query_str, text_chunks).aget_response(query_str, text_chunks, **response_kwargs)
@@ -0,0 +1,107 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+from src.utils.config import ANSWER_CACHE_SIZE, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL
+
+@dataclass
+class CachedAnswer:
+    key: Hashable
+    question: str
+    embedding: np.ndarray
+    answer: str
+    context_hash: str
+    created_at: float
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_SIZE,
+        similarity_threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl_seconds: Optional[float] = ANSWER_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._buckets: Dict[Hashable, List[int]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _is_expired(self, entry: CachedAnswer, now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry.created_at > self.ttl_seconds
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry.key, [])
+        if entry_id in bucket:
+            bucket.remove(entry_id)
+        if not bucket:
+            self._buckets.pop(entry.key, None)
+
+    def lookup(self, key: Hashable, embedding) -> Optional[CachedAnswer]:
+        query = self._normalize(embedding)
+        now = self._clock()
+        with self._lock:
+            best_id, best_score = None, self.similarity_threshold
+            for entry_id in list(self._buckets.get(key, [])):
+                entry = self._entries[entry_id]
+                if self._is_expired(entry, now):
+                    self._remove(entry_id)
+                    continue
+                score = float(entry.embedding @ query)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id]
+
+    def put(self, key: Hashable, question: str, embedding, answer: str, context_hash: str) -> None:
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = CachedAnswer(
+                key=key,
+                question=question,
+                embedding=self._normalize(embedding),
+                answer=answer,
+                context_hash=context_hash,
+                created_at=self._clock()
+            )
+            self._buckets.setdefault(key, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def discard_where(self, match: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._buckets if match(key)]:
+                for entry_id in list(self._buckets.get(key, [])):
+                    self._remove(entry_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
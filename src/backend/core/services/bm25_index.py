@@ -0,0 +1,193 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from llama_index.core.schema import BaseNode, MetadataMode, TextNode
+
+from src.utils.cache import LRUCache
+from src.utils.config import BM25_B, BM25_INDEX_PATH, BM25_K1, INDEX_CACHE_SIZE
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_CASE_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        lowered = word.lower()
+        tokens.append(lowered)
+        parts = [part.lower() for piece in word.split("_") for part in CAMEL_CASE_PATTERN.findall(piece)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+class BM25Index:
+    def __init__(self, path: Path, k1: float = BM25_K1, b: float = BM25_B):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.chunks: Dict[str, Dict] = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.total_length = 0
+        self.dirty = False
+        self.version = self._file_version()
+        if self.version is not None:
+            self._load()
+
+    def _file_version(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        with self.path.open() as index_file:
+            for line in index_file:
+                chunk = json.loads(line)
+                self._index(chunk)
+
+    def _index(self, chunk: Dict) -> None:
+        self.chunks[chunk["id"]] = chunk
+        self.total_length += chunk["length"]
+        for term, frequency in chunk["terms"].items():
+            self.postings[term][chunk["id"]] = frequency
+
+    def refresh(self) -> None:
+        version = self._file_version()
+        if version == self.version:
+            return
+        with self.lock:
+            if self.dirty or version == self.version:
+                return
+            self.chunks = {}
+            self.postings = defaultdict(dict)
+            self.total_length = 0
+            self.version = version
+            if version is not None:
+                self._load()
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.chunks
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def add(self, node: BaseNode) -> None:
+        with self.lock:
+            if node.node_id in self.chunks:
+                return
+            tokens = tokenize(node.get_content(metadata_mode=MetadataMode.NONE))
+            self._index({
+                "id": node.node_id,
+                "text": node.get_content(metadata_mode=MetadataMode.NONE),
+                "metadata": node.metadata,
+                "excluded_llm_metadata_keys": node.excluded_llm_metadata_keys,
+                "length": len(tokens),
+                "terms": Counter(tokens)
+            })
+            self.dirty = True
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        with self.lock:
+            for chunk_id in chunk_ids:
+                chunk = self.chunks.pop(chunk_id, None)
+                if chunk is None:
+                    continue
+                self.total_length -= chunk["length"]
+                for term in chunk["terms"]:
+                    postings = self.postings[term]
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self.postings[term]
+                self.dirty = True
+
+    def chunk_ids_for(self, key: str, value: str) -> List[str]:
+        with self.lock:
+            return [chunk_id for chunk_id, chunk in self.chunks.items() if chunk["metadata"].get(key) == value]
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        with self.lock:
+            if not self.chunks:
+                return []
+            count = len(self.chunks)
+            average_length = self.total_length / count or 1.0
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    length_norm = 1 - self.b + self.b * self.chunks[chunk_id]["length"] / average_length
+                    scores[chunk_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+            return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def get_node(self, chunk_id: str) -> TextNode:
+        chunk = self.chunks[chunk_id]
+        return TextNode(
+            id_=chunk_id,
+            text=chunk["text"],
+            metadata=chunk["metadata"],
+            excluded_embed_metadata_keys=list(chunk["metadata"]),
+            excluded_llm_metadata_keys=chunk["excluded_llm_metadata_keys"]
+        )
+
+    def persist(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            if not self.chunks:
+                self.path.unlink(missing_ok=True)
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+                with tmp_path.open("w") as index_file:
+                    for chunk in self.chunks.values():
+                        index_file.write(json.dumps(chunk) + "\n")
+                os.replace(tmp_path, self.path)
+            self.dirty = False
+            self.version = self._file_version()
+
+class BM25IndexService:
+    def __init__(self, root_path: str = BM25_INDEX_PATH, cache_size: int = INDEX_CACHE_SIZE):
+        self.root_path = Path(root_path)
+        self._indexes: LRUCache[BM25Index] = LRUCache(cache_size)
+
+    def _path(self, session_id: str) -> Path:
+        return self.root_path / f"{session_id}.jsonl"
+
+    def get(self, session_id: str) -> BM25Index:
+        index = self._indexes.get_or_create(session_id, lambda: BM25Index(self._path(session_id)))
+        index.refresh()
+        return index
+
+    def exists(self, session_id: str) -> bool:
+        return session_id in self._indexes or self._path(session_id).exists()
+
+    def index_nodes(self, session_id: str, nodes: Iterable[BaseNode]) -> Iterator[BaseNode]:
+        index = self.get(session_id)
+        try:
+            for node in nodes:
+                index.add(node)
+                yield node
+        finally:
+            index.persist()
+
+    def remove_chunks(self, session_id: str, chunk_ids: Iterable[str]) -> None:
+        index = self.get(session_id)
+        index.remove(chunk_ids)
+        index.persist()
+
+    def remove_document(self, session_id: str, document_key: str) -> None:
+        index = self.get(session_id)
+        index.remove(index.chunk_ids_for("document_key", document_key))
+        index.persist()
+
+    def close(self) -> None:
+        self._indexes.clear()
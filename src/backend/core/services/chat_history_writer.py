@@ -0,0 +1,139 @@
+import logging
+import threading
+from typing import Dict, List
+
+from src.backend.core.repositories.chat_repository import ChatRepository
+from src.backend.core.repositories.session_repository import SessionRepository
+from src.utils.config import CHAT_FLUSH_INTERVAL, CHAT_MAX_BUFFERED, CHAT_MAX_PENDING, CHAT_MAX_RETRY_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+class ChatHistoryWriter:
+    def __init__(
+        self,
+        chat_repo: ChatRepository,
+        session_repo: SessionRepository,
+        flush_interval: float = CHAT_FLUSH_INTERVAL,
+        max_pending: int = CHAT_MAX_PENDING,
+        max_buffered: int = CHAT_MAX_BUFFERED,
+        max_retry_interval: float = CHAT_MAX_RETRY_INTERVAL
+    ):
+        self.chat_repo = chat_repo
+        self.session_repo = session_repo
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self.max_retry_interval = max_retry_interval
+        self.failures = 0
+        self.dropped = 0
+        self._dropping = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, List[Dict]] = {}
+        self._pending_count = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chat-history-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, session_id: str, messages: List[Dict]) -> None:
+        with self._lock:
+            self._pending.setdefault(session_id, []).extend(messages)
+            self._pending_count += len(messages)
+            self._enforce_limit()
+            full = self._pending_count >= self.max_pending
+        if self._closed:
+            self.flush()
+        elif full and not self.failures:
+            self._wake.set()
+
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    def _take(self) -> Dict[str, List[Dict]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_count = 0
+            return pending
+
+    def _requeue(self, pending: Dict[str, List[Dict]]) -> None:
+        with self._lock:
+            for session_id, messages in pending.items():
+                self._pending[session_id] = messages + self._pending.get(session_id, [])
+                self._pending_count += len(messages)
+            self._enforce_limit()
+
+    def _enforce_limit(self) -> None:
+        excess = self._pending_count - self.max_buffered
+        if excess <= 0:
+            return
+        for session_id in list(self._pending):
+            messages = self._pending[session_id]
+            dropped = min(excess, len(messages))
+            del messages[:dropped]
+            if not messages:
+                del self._pending[session_id]
+            excess -= dropped
+            self._pending_count -= dropped
+            self.dropped += dropped
+            if excess <= 0:
+                break
+        if not self._dropping:
+            self._dropping = True
+            logger.error(
+                "Chat history buffer is full (%d messages), dropping the oldest messages until writes recover",
+                self.max_buffered
+            )
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            pending = self._take()
+            if not pending:
+                return
+            try:
+                self.chat_repo.append_messages(pending)
+            except Exception:
+                self._requeue(pending)
+                raise
+            self.session_repo.record_messages({
+                session_id: len(messages) for session_id, messages in pending.items()
+            })
+
+    def discard(self, session_id: str) -> None:
+        with self._flush_lock:
+            with self._lock:
+                self._pending_count -= len(self._pending.pop(session_id, []))
+
+    def _retry_interval(self) -> float:
+        if not self.failures:
+            return self.flush_interval
+        return min(self.flush_interval * 2 ** self.failures, self.max_retry_interval)
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._retry_interval())
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                self.failures += 1
+                logger.exception(
+                    "Failed to write chat history, %d message(s) pending; retrying in %.1fs",
+                    self._pending_count,
+                    self._retry_interval()
+                )
+            else:
+                if self.failures:
+                    logger.info(
+                        "Chat history writes recovered after %d failed attempt(s), %d message(s) dropped",
+                        self.failures,
+                        self.dropped
+                    )
+                self.failures = 0
+                self._dropping = False
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
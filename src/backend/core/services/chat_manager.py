@@ -1,54 +1,345 @@
-from typing import List, Dict, Optional, Any
-from pymongo import MongoClient
+import asyncio
+from typing import List, Dict, AsyncIterator, Iterator, Optional, Any
+from pymongo import AsyncMongoClient, MongoClient
 from src.backend.core.services.chat_session import ChatSession
-from src.backend.core.repositories.chat_repository import ChatRepository
-from src.backend.core.repositories.session_repository import SessionRepository
+from src.backend.core.services.chat_history_writer import ChatHistoryWriter
+from src.backend.core.repositories.chat_repository import ChatRepository, build_chat_messages
+from src.backend.core.repositories.async_chat_repository import AsyncChatRepository
+from src.backend.core.repositories.async_session_repository import AsyncSessionRepository
+from src.backend.core.repositories.session_repository import (
+    SessionRepository,
+    INTERRUPTED_ERROR,
+    STATUS_FAILED,
+    STATUS_PROCESSING,
+    STATUS_READY,
+    build_ingest_stats,
+    build_processing_update
+)
 from src.backend.core.services.rag_service import RAGService
+from src.backend.core.services.query_engine_service import RETRIEVAL_MODES
+from src.backend.core.services.ingestion_service import ProgressCallback
+from src.backend.core.services.ingestion_worker import IngestionWorker
+from src.backend.core.services.llm_usage import LLMUsage
+from src.backend.core.services.tracing import PIPELINE_INGEST, PIPELINE_QUERY, STAGE_SESSION_LOOKUP, Trace
+from src.utils.cache import LRUCache
+from src.utils.config import (
+    CHAT_HISTORY_WINDOW,
+    DEFAULT_RETRIEVAL_MODE,
+    MONGO_URI,
+    MONGO_DB_NAME,
+    SESSION_CACHE_SIZE,
+    SESSION_CACHE_TTL,
+    SESSION_PAGE_SIZE
+)
 
 class ChatManager:
-    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
-        db = MongoClient(mongo_uri).rag_chat_db
-        self.session_repo = SessionRepository(db)
+    def __init__(
+        self,
+        mongo_uri: str = MONGO_URI,
+        mongo_client: Optional[MongoClient] = None,
+        rag_service: Optional[RAGService] = None,
+        ingestion_worker: Optional[IngestionWorker] = None,
+        async_mongo_client: Optional[AsyncMongoClient] = None,
+        history_writer: Optional[ChatHistoryWriter] = None,
+        session_cache: Optional[LRUCache[Any]] = None
+    ):
+        client = mongo_client or MongoClient(mongo_uri)
+        db = client[MONGO_DB_NAME]
+        self.session_cache = session_cache or LRUCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL, sliding=False)
+        self.session_repo = SessionRepository(db, self.session_cache)
         self.chat_repo = ChatRepository(db)
-        self.rag_service = RAGService()
+        self._async_session_repo: Optional[AsyncSessionRepository] = None
+        self._async_chat_repo: Optional[AsyncChatRepository] = None
+        if async_mongo_client is not None:
+            async_db = async_mongo_client[MONGO_DB_NAME]
+            self._async_session_repo = AsyncSessionRepository(async_db, self.session_cache)
+            self._async_chat_repo = AsyncChatRepository(async_db)
+        self.rag_service = rag_service or RAGService()
+        self.ingestion_worker = ingestion_worker or IngestionWorker(self.session_repo, self.rag_service)
+        self.history_writer = history_writer or ChatHistoryWriter(self.chat_repo, self.session_repo)
         self.current_session: Optional[ChatSession] = None
 
-    def create_session(self, filename: str, file_path: str) -> str:
+    @property
+    def async_session_repo(self) -> AsyncSessionRepository:
+        if self._async_session_repo is None:
+            raise RuntimeError("ChatManager was created without an async Mongo client")
+        return self._async_session_repo
+
+    @property
+    def async_chat_repo(self) -> AsyncChatRepository:
+        if self._async_chat_repo is None:
+            raise RuntimeError("ChatManager was created without an async Mongo client")
+        return self._async_chat_repo
+
+    def create_session(
+        self,
+        filename: str,
+        file_path: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> str:
         session_id = self.session_repo.create({
             "filename": filename,
             "file_path": file_path
         })
-        self.rag_service.process_file(file_path, session_id)
-        self.current_session = ChatSession(session_id, self.chat_repo, self.session_repo)
+        self.rag_service.process_file(file_path, session_id, filename=filename, on_progress=on_progress)
+        self.current_session = ChatSession(session_id, self.chat_repo)
+        return session_id
+
+    async def acreate_session(
+        self,
+        filename: str,
+        file_path: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> str:
+        session_id = await self.async_session_repo.create({
+            "filename": filename,
+            "file_path": file_path,
+            "status": STATUS_PROCESSING
+        })
+        await self.aprocess_file(session_id, filename, file_path, on_progress=on_progress)
+        return session_id
+
+    async def aprocess_file(
+        self,
+        session_id: str,
+        filename: str,
+        file_path: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> None:
+        if not await self.async_session_repo.get_by_id(session_id):
+            raise ValueError("Invalid session ID")
+        await self.async_session_repo.upsert_document(session_id, filename, file_path)
+        await self.async_session_repo.update(session_id, build_processing_update())
+        trace = Trace(PIPELINE_INGEST)
+        try:
+            await self.rag_service.aprocess_file(file_path, session_id, filename=filename, on_progress=on_progress, trace=trace)
+        except Exception as e:
+            await self.async_session_repo.update_status(session_id, status=STATUS_FAILED, error=str(e))
+            raise
+        await self.async_session_repo.update(session_id, {"ingest_stats": build_ingest_stats(trace.to_dict())})
+        await self.async_session_repo.update_status(session_id, status=STATUS_READY, progress=1.0)
+
+    def start_session(self, filename: str, file_path: str) -> str:
+        session_id = self.session_repo.create({
+            "filename": filename,
+            "file_path": file_path,
+            "status": STATUS_PROCESSING
+        })
+        self.ingestion_worker.submit(session_id, file_path, filename)
         return session_id
 
+    def add_session_file(self, session_id: str, filename: str, file_path: str) -> None:
+        if not self.session_repo.get_by_id(session_id):
+            raise ValueError("Invalid session ID")
+        self.session_repo.upsert_document(session_id, filename, file_path)
+        self.ingestion_worker.submit(session_id, file_path, filename)
+
+    def remove_session_file(self, session_id: str, filename: str) -> None:
+        session = self.session_repo.get_by_id(session_id)
+        if not session:
+            raise ValueError("Invalid session ID")
+        if len(self.get_session_documents(session)) <= 1:
+            raise ValueError("A session needs at least one file")
+        self.rag_service.remove_document(session_id, filename)
+        self.session_repo.remove_document(session_id, filename)
+
+    async def adelete_session(self, session_id: str) -> List[Dict]:
+        session = await self.async_session_repo.get_by_id(session_id)
+        if not session:
+            raise ValueError("Invalid session ID")
+        if session.get("status") == STATUS_PROCESSING and not self._is_interrupted(session):
+            raise ValueError("The file is still being processed. Please wait until it is ready.")
+        documents = self.get_session_documents(session)
+        await asyncio.to_thread(
+            self.rag_service.remove_session,
+            session_id,
+            [document["filename"] for document in documents]
+        )
+        await asyncio.to_thread(self.history_writer.discard, session_id)
+        await self.async_chat_repo.delete_history(session_id)
+        await self.async_session_repo.delete(session_id)
+        return documents
+
+    def set_retrieval_mode(self, session_id: str, retrieval_mode: str) -> None:
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        if not self.session_repo.get_by_id(session_id):
+            raise ValueError("Invalid session ID")
+        self.session_repo.update(session_id, {"retrieval_mode": retrieval_mode})
+
+    @staticmethod
+    def get_retrieval_mode(session: Dict) -> str:
+        return session.get("retrieval_mode", DEFAULT_RETRIEVAL_MODE)
+
+    @staticmethod
+    def get_session_documents(session: Dict) -> List[Dict]:
+        if session.get("documents"):
+            return session["documents"]
+        return [{"filename": session["filename"], "file_path": session["file_path"]}]
+
     def load_session(self, session_id: str) -> bool:
         if not self.session_repo.get_by_id(session_id):
             return False
-        self.current_session = ChatSession(session_id, self.chat_repo, self.session_repo)
+        self.history_writer.flush()
+        self.current_session = ChatSession(session_id, self.chat_repo)
         return True
 
     def get_all_sessions(self) -> List[Dict]:
         return self.session_repo.get_all()
 
+    def list_sessions(
+        self,
+        search: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = SESSION_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        return self.session_repo.list_page(limit, after, search)
+
+    async def alist_sessions(
+        self,
+        search: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = SESSION_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        return await self.async_session_repo.list_page(limit, after, search)
+
     def get_session(self, session_id: str) -> Optional[Dict]:
-        return self.session_repo.get_by_id(session_id)
+        session = self.session_repo.get_cached(session_id)
+        if session and self._is_interrupted(session):
+            if not self.session_repo.mark_interrupted(session):
+                return self.session_repo.get_by_id(session_id)
+            session = {**session, "status": STATUS_FAILED, "error": INTERRUPTED_ERROR}
+        return session
 
-    def get_chat_history_for_session(self, session_id: str) -> List[Dict[str, Any]]:
-        return self.chat_repo.get_history(session_id)
+    async def aget_session(self, session_id: str) -> Optional[Dict]:
+        session = await self.async_session_repo.get_by_id(session_id)
+        if session and self._is_interrupted(session):
+            if not await self.async_session_repo.mark_interrupted(session):
+                return await self.async_session_repo.get_by_id(session_id)
+            session = {**session, "status": STATUS_FAILED, "error": INTERRUPTED_ERROR}
+        return session
 
-    def query(self, session_id: str, question: str) -> str:
-        if not self.session_repo.get_by_id(session_id):
-            raise ValueError("Invalid session ID")
-        answer = self.rag_service.query(session_id, question)
-        self.chat_repo.create({
+    def get_chat_history_for_session(
+        self,
+        session_id: str,
+        limit: int = CHAT_HISTORY_WINDOW,
+        before: Optional[str] = None
+    ) -> Dict[str, Any]:
+        self.history_writer.flush()
+        return self.chat_repo.get_recent(session_id, limit, before)
+
+    async def aget_chat_history(
+        self,
+        session_id: str,
+        limit: int = CHAT_HISTORY_WINDOW,
+        before: Optional[str] = None
+    ) -> Dict[str, Any]:
+        await asyncio.to_thread(self.history_writer.flush)
+        return await self.async_chat_repo.get_recent(session_id, limit, before)
+
+    def _record_exchange(self, session_id: str, question: str, answer: str, usage: LLMUsage, trace: Trace) -> None:
+        self.history_writer.add(session_id, build_chat_messages({
             "session_id": session_id,
             "question": question,
-            "answer": answer
-        })
-        self.session_repo.update_access(session_id)
+            "answer": answer,
+            "metadata": {"usage": usage.to_dict(), "timing": trace.finish(usage)}
+        }))
+
+    def _is_interrupted(self, session: Dict) -> bool:
+        return self.ingestion_worker.is_interrupted(session)
+
+    def _check_queryable(self, session: Optional[Dict]) -> Dict:
+        if not session:
+            raise ValueError("Invalid session ID")
+        status = session.get("status", STATUS_READY)
+        if self._is_interrupted(session):
+            raise ValueError(INTERRUPTED_ERROR)
+        if status == STATUS_PROCESSING:
+            raise ValueError("The file is still being processed. Please wait until it is ready.")
+        if status == STATUS_FAILED:
+            raise ValueError(f"Processing this file failed: {session.get('error')}")
+        return session
+
+    def _get_queryable_session(self, session_id: str) -> Dict:
+        session = self._check_queryable(self.session_repo.get_by_id(session_id))
+        self.rag_service.ensure_index(session_id, self.get_session_documents(session))
+        return session
+
+    async def aget_queryable_session(self, session_id: str) -> Dict:
+        session = self._check_queryable(await self.async_session_repo.get_by_id(session_id))
+        await asyncio.to_thread(self.rag_service.ensure_index, session_id, self.get_session_documents(session))
+        return session
+
+    def query(
+        self,
+        session_id: str,
+        question: str,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> str:
+        trace = trace or Trace(PIPELINE_QUERY)
+        with trace.span(STAGE_SESSION_LOOKUP):
+            session = self._get_queryable_session(session_id)
+        usage = usage or LLMUsage()
+        answer = self.rag_service.query(session_id, question, self.get_retrieval_mode(session), usage, trace)
+        self._record_exchange(session_id, question, answer, usage, trace)
         return answer
 
+    def stream_query(
+        self,
+        session_id: str,
+        question: str,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> Iterator[str]:
+        trace = trace or Trace(PIPELINE_QUERY)
+        with trace.span(STAGE_SESSION_LOOKUP):
+            session = self._get_queryable_session(session_id)
+        usage = usage or LLMUsage()
+        deltas: List[str] = []
+        for delta in self.rag_service.stream_query(
+            session_id, question, self.get_retrieval_mode(session), usage, trace
+        ):
+            deltas.append(delta)
+            yield delta
+        self._record_exchange(session_id, question, "".join(deltas), usage, trace)
+
+    async def aquery(
+        self,
+        session_id: str,
+        question: str,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> str:
+        trace = trace or Trace(PIPELINE_QUERY)
+        with trace.span(STAGE_SESSION_LOOKUP):
+            session = await self.aget_queryable_session(session_id)
+        usage = usage or LLMUsage()
+        answer = await self.rag_service.aquery(session_id, question, self.get_retrieval_mode(session), usage, trace)
+        self._record_exchange(session_id, question, answer, usage, trace)
+        return answer
+
+    async def astream_query(
+        self,
+        session_id: str,
+        question: str,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None,
+        session: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        trace = trace or Trace(PIPELINE_QUERY)
+        if session is None:
+            with trace.span(STAGE_SESSION_LOOKUP):
+                session = await self.aget_queryable_session(session_id)
+        usage = usage or LLMUsage()
+        deltas: List[str] = []
+        async for delta in self.rag_service.astream_query(
+            session_id, question, self.get_retrieval_mode(session), usage, trace
+        ):
+            deltas.append(delta)
+            yield delta
+        self._record_exchange(session_id, question, "".join(deltas), usage, trace)
+
     def get_response(self, user_message: str) -> str:
         if not self.current_session:
             raise ValueError("No active session")
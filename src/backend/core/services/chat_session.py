@@ -1,26 +1,28 @@
 from typing import List, Optional
 from src.backend.core.entities.message import Message
 from src.backend.core.repositories.chat_repository import ChatRepository
-from src.backend.core.repositories.session_repository import SessionRepository
+from src.utils.config import CHAT_HISTORY_WINDOW
 
 class ChatSession:
-    def __init__(self, session_id: str, chat_repo: ChatRepository, session_repo: SessionRepository):
+    def __init__(self, session_id: str, chat_repo: ChatRepository, history_window: int = CHAT_HISTORY_WINDOW):
         self.session_id = session_id
         self.chat_repo = chat_repo
-        self.session_repo = session_repo
-        self.messages: List[Message] = []
-        self._load_history()
+        self.history_window = history_window
+        self.before: Optional[str] = None
+        self._messages: Optional[List[Message]] = None
+
+    @property
+    def messages(self) -> List[Message]:
+        if self._messages is None:
+            self._load_history()
+        return self._messages
 
     def _load_history(self):
-        messages_data = self.chat_repo.get_history(self.session_id)
-        self.messages = [Message.from_dict(msg) for msg in messages_data]
+        page = self.chat_repo.get_recent(self.session_id, self.history_window)
+        self._messages = [Message.from_dict(msg) for msg in page["messages"]]
+        self.before = page["before"]
 
-    def add_message(self, role: str, content: str, avatar: Optional[str] = None):
+    def add_message(self, role: str, content: str, avatar: Optional[str] = None) -> Message:
         message = Message(role, content, avatar)
         self.messages.append(message)
-        self.chat_repo.create({
-            "session_id": self.session_id,
-            "question": content,
-            "answer": ""
-        })
-        self.session_repo.update_access(self.session_id)
+        return message
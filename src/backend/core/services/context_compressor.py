@@ -0,0 +1,236 @@
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore, QueryBundle
+from llama_index.core.utils import get_tokenizer
+
+from src.backend.core.services.bm25_index import tokenize
+from src.backend.core.services.tracing import STAGE_COMPRESS, current_trace, span
+from src.utils.config import (
+    CHUNKING,
+    CONTEXT_DUPLICATE_THRESHOLD,
+    CONTEXT_MIN_OVERLAP,
+    CONTEXT_TOKEN_BUDGET
+)
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+CODE_BLOCK_PATTERN = re.compile(r"\n\s*\n")
+MAX_ADJACENT_GAP = 2
+SHINGLE_SIZE = 3
+PROSE_GAP = " … "
+CODE_GAP = "\n…\n"
+
+def text_overlap(first: str, second: str, min_overlap: int) -> int:
+    head = second[:min_overlap]
+    if len(head) < min_overlap:
+        return 0
+    start = first.find(head, max(0, len(first) - len(second)))
+    while start != -1:
+        if second.startswith(first[start:]):
+            return len(first) - start
+        start = first.find(head, start + 1)
+    return 0
+
+def _has_offsets(node: BaseNode) -> bool:
+    return node.start_char_idx is not None and node.end_char_idx is not None
+
+def _join_by_offsets(first: BaseNode, second: BaseNode) -> Optional[str]:
+    if first.start_char_idx > second.start_char_idx:
+        first, second = second, first
+    gap = second.start_char_idx - first.end_char_idx
+    if gap > MAX_ADJACENT_GAP:
+        return None
+    if gap > 0:
+        return f"{first.text} {second.text}"
+    overlap = -gap
+    if second.end_char_idx <= first.end_char_idx:
+        return first.text if second.text in first.text else None
+    if first.text.endswith(second.text[:overlap]):
+        return first.text + second.text[overlap:]
+    return None
+
+def join_texts(first: BaseNode, second: BaseNode, min_overlap: int) -> Optional[str]:
+    if first.ref_doc_id == second.ref_doc_id and _has_offsets(first) and _has_offsets(second):
+        joined = _join_by_offsets(first, second)
+        if joined is not None:
+            return joined
+    for head, tail in ((first.text, second.text), (second.text, first.text)):
+        overlap = text_overlap(head, tail, min_overlap)
+        if overlap >= min_overlap:
+            return head + tail[overlap:]
+    if second.text in first.text:
+        return first.text
+    if first.text in second.text:
+        return second.text
+    return None
+
+def _mean_embedding(first: BaseNode, second: BaseNode) -> Optional[List[float]]:
+    if first.embedding is None or second.embedding is None:
+        return first.embedding or second.embedding
+    return ((np.asarray(first.embedding) + np.asarray(second.embedding)) / 2).tolist()
+
+def _merged(first: NodeWithScore, second: NodeWithScore, text: str) -> NodeWithScore:
+    base, other = (first, second) if _position(first) <= _position(second) else (second, first)
+    node = base.node.model_copy()
+    node.text = text
+    node.embedding = _mean_embedding(base.node, other.node)
+    node.metadata = {
+        **base.node.metadata,
+        "merged_chunk_ids": base.node.metadata.get("merged_chunk_ids", [base.node.node_id])
+        + other.node.metadata.get("merged_chunk_ids", [other.node.node_id])
+    }
+    if "merged_chunk_ids" not in node.excluded_llm_metadata_keys:
+        node.excluded_llm_metadata_keys = [*node.excluded_llm_metadata_keys, "merged_chunk_ids"]
+        node.excluded_embed_metadata_keys = [*node.excluded_embed_metadata_keys, "merged_chunk_ids"]
+    if _has_offsets(base.node) and _has_offsets(other.node) and base.node.ref_doc_id == other.node.ref_doc_id:
+        node.start_char_idx = min(base.node.start_char_idx, other.node.start_char_idx)
+        node.end_char_idx = max(base.node.end_char_idx, other.node.end_char_idx)
+    else:
+        node.start_char_idx = node.end_char_idx = None
+    return NodeWithScore(node=node, score=max(first.score or 0.0, second.score or 0.0))
+
+def _document(result: NodeWithScore) -> str:
+    return result.node.metadata.get("document_key") or result.node.ref_doc_id or ""
+
+def _position(result: NodeWithScore) -> Tuple[str, float]:
+    start = result.node.start_char_idx
+    return _document(result), start if start is not None else math.inf
+
+def merge_adjacent(nodes: Sequence[NodeWithScore], min_overlap: int = CONTEXT_MIN_OVERLAP) -> List[NodeWithScore]:
+    merged: List[NodeWithScore] = []
+    for result in sorted(nodes, key=_position):
+        for i, existing in enumerate(merged):
+            if _document(existing) != _document(result):
+                continue
+            text = join_texts(existing.node, result.node, min_overlap)
+            if text is not None:
+                merged[i] = _merged(existing, result, text)
+                break
+        else:
+            merged.append(result)
+    return merged
+
+def _shingles(text: str) -> Counter:
+    terms = tokenize(text)
+    return Counter(zip(*(terms[i:] for i in range(SHINGLE_SIZE)))) or Counter(terms)
+
+def _cosine(first: Sequence[float], second: Sequence[float]) -> float:
+    first, second = np.asarray(first, dtype=float), np.asarray(second, dtype=float)
+    norm = np.linalg.norm(first) * np.linalg.norm(second)
+    return float(first @ second / norm) if norm else 0.0
+
+def _term_cosine(first: Counter, second: Counter) -> float:
+    dot = sum(count * second[term] for term, count in first.items())
+    norm = math.sqrt(sum(v * v for v in first.values())) * math.sqrt(sum(v * v for v in second.values()))
+    return dot / norm if norm else 0.0
+
+def similarity(first: BaseNode, second: BaseNode) -> float:
+    if first.embedding is not None and second.embedding is not None:
+        return _cosine(first.embedding, second.embedding)
+    return _term_cosine(_shingles(first.text), _shingles(second.text))
+
+def drop_near_duplicates(
+    nodes: Sequence[NodeWithScore],
+    threshold: float = CONTEXT_DUPLICATE_THRESHOLD
+) -> List[NodeWithScore]:
+    kept: List[NodeWithScore] = []
+    for result in sorted(nodes, key=lambda result: result.score or 0.0, reverse=True):
+        if all(similarity(result.node, other.node) < threshold for other in kept):
+            kept.append(result)
+    return kept
+
+def _is_code(node: BaseNode) -> bool:
+    return Path(node.metadata.get("file_name", "")).suffix.lower() in CHUNKING.code_languages
+
+def split_units(node: BaseNode) -> List[str]:
+    pattern = CODE_BLOCK_PATTERN if _is_code(node) else SENTENCE_PATTERN
+    return [unit.strip() for unit in pattern.split(node.text) if unit and unit.strip()]
+
+def _score_units(query: str, units: List[List[str]]) -> List[List[float]]:
+    query_terms = set(tokenize(query))
+    unit_terms = [[set(tokenize(unit)) for unit in node_units] for node_units in units]
+    document_count = sum(len(node_units) for node_units in units)
+    frequencies: Counter = Counter(term for node_terms in unit_terms for terms in node_terms for term in terms & query_terms)
+    idf = {term: math.log(1 + document_count / frequencies[term]) for term in frequencies}
+    return [
+        [sum(idf.get(term, 0.0) for term in terms & query_terms) / (1 + math.log(1 + len(terms))) for terms in node_terms]
+        for node_terms in unit_terms
+    ]
+
+def compress_to_budget(
+    nodes: Sequence[NodeWithScore],
+    query: str,
+    token_budget: int,
+    count_tokens: Callable[[str], int]
+) -> List[NodeWithScore]:
+    units = [split_units(result.node) for result in nodes]
+    tokens = [[count_tokens(unit) for unit in node_units] for node_units in units]
+    if sum(map(sum, tokens)) <= token_budget:
+        return list(nodes)
+
+    scores = _score_units(query, units)
+    ranked = sorted(
+        ((score, rank, j) for rank, node_scores in enumerate(scores) for j, score in enumerate(node_scores)),
+        key=lambda candidate: (-candidate[0], candidate[1], candidate[2])
+    )
+    selected: Dict[int, List[int]] = {}
+    used = 0
+    for _, rank, j in ranked:
+        if used + tokens[rank][j] <= token_budget or not selected:
+            selected.setdefault(rank, []).append(j)
+            used += tokens[rank][j]
+
+    compressed = []
+    for rank, result in enumerate(nodes):
+        if rank not in selected:
+            continue
+        separator, gap = ("\n\n", CODE_GAP) if _is_code(result.node) else (" ", PROSE_GAP)
+        kept = sorted(selected[rank])
+        text = units[rank][kept[0]]
+        for previous, j in zip(kept, kept[1:]):
+            text += (separator if j == previous + 1 else gap) + units[rank][j]
+        node = result.node.model_copy()
+        node.text = text
+        compressed.append(NodeWithScore(node=node, score=result.score))
+    return compressed
+
+class ContextCompressor(BaseNodePostprocessor):
+    token_budget: int = Field(default=CONTEXT_TOKEN_BUDGET)
+    min_overlap: int = Field(default=CONTEXT_MIN_OVERLAP)
+    duplicate_threshold: float = Field(default=CONTEXT_DUPLICATE_THRESHOLD)
+    _tokenizer: Callable[[str], List] = PrivateAttr()
+
+    def __init__(self, tokenizer: Optional[Callable[[str], List]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._tokenizer = tokenizer or get_tokenizer()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ContextCompressor"
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._tokenizer(text))
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None
+    ) -> List[NodeWithScore]:
+        if not nodes:
+            return nodes
+        with span(STAGE_COMPRESS):
+            before = sum(self.count_tokens(result.node.get_content(MetadataMode.NONE)) for result in nodes)
+            compressed = drop_near_duplicates(merge_adjacent(nodes, self.min_overlap), self.duplicate_threshold)
+            if query_bundle is not None:
+                compressed = compress_to_budget(compressed, query_bundle.query_str, self.token_budget, self.count_tokens)
+            after = sum(self.count_tokens(result.node.get_content(MetadataMode.NONE)) for result in compressed)
+        trace = current_trace()
+        if trace is not None:
+            trace.set(context_chunks=len(compressed), context_tokens=after, context_tokens_saved=before - after)
+        return compressed
@@ -0,0 +1,121 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from src.utils.config import EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_PATH
+
+class EmbeddingCache:
+    def __init__(self, db_path: str | Path = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[int, List[float]]:
+        hashes = [self.hash_text(text) for text in texts]
+        with self._lock:
+            found: Dict[str, List[float]] = {}
+            unique_hashes = list(set(hashes))
+            for start in range(0, len(unique_hashes), 500):
+                chunk = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, text_hash) for text_hash in found]
+                )
+                self._conn.commit()
+
+            results = {i: found[h] for i, h in enumerate(hashes) if h in found}
+            self.hits += len(results)
+            self.misses += len(texts) - len(results)
+            return results
+
+    def put_many(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        now = time.time()
+        rows = {
+            self.hash_text(text): array("f", embedding).tobytes()
+            for text, embedding in zip(texts, embeddings)
+        }
+        with self._lock:
+            existing = self._existing_sizes(model, list(rows))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, text_hash, blob, now) for text_hash, blob in rows.items()]
+            )
+            self._total_bytes += sum(len(blob) for blob in rows.values()) - sum(existing.values())
+            self._evict()
+            self._conn.commit()
+
+    def _existing_sizes(self, model: str, hashes: List[str]) -> Dict[str, int]:
+        sizes: Dict[str, int] = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT text_hash, LENGTH(vector) FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *chunk]
+            ).fetchall()
+            sizes.update(rows)
+        return sizes
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used ASC LIMIT 256"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            removed = []
+            for rowid, size in rows:
+                removed.append((rowid,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", removed)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self._total_bytes
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,10 +1,33 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 from llama_index.core import Document
+from llama_index.core.schema import BaseNode
 from llama_index.readers.file import PDFReader, DocxReader
-from llama_index.core.node_parser import SimpleNodeParser
+from llama_index.core.node_parser import CodeSplitter, NodeParser, SentenceSplitter
 
-from src.utils.config import CHUNK_SIZE, CHUNK_OVERLAP
+from src.backend.core.services.pdf_page_extractor import count_pdf_pages, extract_pdf_pages
+from src.backend.core.services.tracing import STAGE_CHUNK, STAGE_READ, span, traced_iter
+from src.utils.config import (
+    CHUNKING,
+    PDF_PAGES_PER_TASK,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_PARSE_WORKERS,
+    SUPPORTED_FILE_TYPES,
+    TEXT_BLOCK_CHARS,
+    ChunkingConfig
+)
+
+PAGE_METADATA_KEYS = ("page_label", "page_number")
+
+def _exclude_page_metadata(document: Document) -> Document:
+    document.excluded_embed_metadata_keys.extend(
+        key for key in PAGE_METADATA_KEYS if key not in document.excluded_embed_metadata_keys
+    )
+    return document
 
 class BaseFileReader:
     def can_handle(self, file_extension: str) -> bool:
@@ -13,15 +36,76 @@ class BaseFileReader:
     def read(self, file_path: Path) -> List[Document]:
         raise NotImplementedError
 
+    def iter_documents(self, file_path: Path) -> Iterator[Document]:
+        yield from self.read(file_path)
+
+    def close(self) -> None:
+        pass
+
 class PDFFileReader(BaseFileReader):
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = PDF_PARSE_WORKERS,
+        pages_per_task: int = PDF_PAGES_PER_TASK,
+        parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES
+    ):
         self.reader = PDFReader()
+        self.max_workers = min(max_workers, os.cpu_count() or 1)
+        self.pages_per_task = pages_per_task
+        self.parallel_min_pages = parallel_min_pages
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
         
     def can_handle(self, file_extension: str) -> bool:
         return file_extension == '.pdf'
         
     def read(self, file_path: Path) -> List[Document]:
-        return self.reader.load_data(file_path)
+        documents = self.reader.load_data(file_path)
+        for page, document in enumerate(documents):
+            document.metadata["page_number"] = page + 1
+            _exclude_page_metadata(document)
+        return documents
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def iter_documents(self, file_path: Path) -> Iterator[Document]:
+        page_count = count_pdf_pages(str(file_path))
+        if self.max_workers < 2 or page_count < self.parallel_min_pages:
+            yield from self.read(file_path)
+            return
+
+        pool = self._get_pool()
+        futures = [
+            pool.submit(extract_pdf_pages, str(file_path), start, start + self.pages_per_task)
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        try:
+            for future in futures:
+                for page, page_label, text in future.result():
+                    yield _exclude_page_metadata(Document(
+                        text=text,
+                        metadata={
+                            "page_label": page_label,
+                            "page_number": page + 1,
+                            "file_name": file_path.name
+                        }
+                    ))
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
 
 class DocxFileReader(BaseFileReader):
     def __init__(self):
@@ -34,21 +118,100 @@ class DocxFileReader(BaseFileReader):
         return self.reader.load_data(file_path)
 
 class TextFileReader(BaseFileReader):
+    def __init__(self, block_chars: int = TEXT_BLOCK_CHARS):
+        self.block_chars = block_chars
+
     def can_handle(self, file_extension: str) -> bool:
         return True
         
     def read(self, file_path: Path) -> List[Document]:
         return [Document(text=file_path.read_text())]
 
+    def iter_documents(self, file_path: Path) -> Iterator[Document]:
+        with file_path.open() as file:
+            lines: List[str] = []
+            size = 0
+            for line in file:
+                lines.append(line)
+                size += len(line)
+                at_paragraph_break = not line.strip()
+                if size >= self.block_chars and (at_paragraph_break or size >= 2 * self.block_chars):
+                    yield Document(text="".join(lines))
+                    lines = []
+                    size = 0
+            if lines:
+                yield Document(text="".join(lines))
+
+class BaseChunker:
+    def can_handle(self, file_extension: str) -> bool:
+        raise NotImplementedError
+
+    def split(self, documents: List[Document], file_extension: str) -> List[BaseNode]:
+        raise NotImplementedError
+
+class CodeChunker(BaseChunker):
+    def __init__(self, chunking: ChunkingConfig = CHUNKING):
+        self.chunking = chunking
+        self._parsers: Dict[str, NodeParser] = {}
+
+    def can_handle(self, file_extension: str) -> bool:
+        return file_extension in self.chunking.code_languages
+
+    def _get_parser(self, file_extension: str) -> NodeParser:
+        if file_extension not in self._parsers:
+            settings = self.chunking.code_overrides.get(file_extension, self.chunking.code)
+            try:
+                parser = CodeSplitter(
+                    language=self.chunking.code_languages[file_extension],
+                    chunk_lines=settings.chunk_lines,
+                    chunk_lines_overlap=settings.chunk_lines_overlap,
+                    max_chars=settings.max_chars
+                )
+            except Exception:
+                parser = SentenceSplitter(
+                    chunk_size=max(settings.max_chars // 4, 64),
+                    chunk_overlap=settings.chunk_lines_overlap,
+                    separator="\n",
+                    paragraph_separator="\n\n"
+                )
+            self._parsers[file_extension] = parser
+        return self._parsers[file_extension]
+
+    def split(self, documents: List[Document], file_extension: str) -> List[BaseNode]:
+        return self._get_parser(file_extension).get_nodes_from_documents(documents)
+
+class ProseChunker(BaseChunker):
+    def __init__(self, chunking: ChunkingConfig = CHUNKING):
+        self.chunking = chunking
+        self._parsers: Dict[str, NodeParser] = {}
+
+    def can_handle(self, file_extension: str) -> bool:
+        return True
+
+    def _get_parser(self, file_extension: str) -> NodeParser:
+        if file_extension not in self._parsers:
+            settings = self.chunking.prose_overrides.get(file_extension, self.chunking.prose)
+            self._parsers[file_extension] = SentenceSplitter(
+                chunk_size=settings.chunk_size,
+                chunk_overlap=settings.chunk_overlap
+            )
+        return self._parsers[file_extension]
+
+    def split(self, documents: List[Document], file_extension: str) -> List[BaseNode]:
+        return self._get_parser(file_extension).get_nodes_from_documents(documents)
+
 class DocumentProcessor:
-    def __init__(self):
-        self.node_parser = SimpleNodeParser.from_defaults(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP
-        )
+    def __init__(self, chunkers: Optional[List[BaseChunker]] = None):
+        self.chunkers = chunkers or [
+            CodeChunker(),
+            ProseChunker()
+        ]
     
-    def process(self, documents: List[Document]) -> List[Document]:
-        return documents
+    def process(self, documents: List[Document], file_extension: str = "") -> List[BaseNode]:
+        for chunker in self.chunkers:
+            if chunker.can_handle(file_extension):
+                return chunker.split(documents, file_extension)
+        raise ValueError(f"No chunker available for file type: {file_extension}")
 
 class FileProcessor:
     def __init__(self):
@@ -62,7 +225,7 @@ class FileProcessor:
     def validate_file(self, file_path: Path) -> bool:
         return file_path.suffix.lower().replace('.', '') in SUPPORTED_FILE_TYPES
     
-    def read_file(self, file_path: str | Path) -> List[Document]:
+    def _get_reader(self, file_path: str | Path) -> Tuple[Path, BaseFileReader]:
         if isinstance(file_path, str):
             file_path = Path(file_path)
             
@@ -73,10 +236,30 @@ class FileProcessor:
 
         for reader in self.readers:
             if reader.can_handle(extension):
-                documents = reader.read(file_path)
-                return self.document_processor.process(documents)
+                return file_path, reader
                 
         raise ValueError(f"Unsupported file type: {extension}")
+
+    def read_file(self, file_path: str | Path) -> List[BaseNode]:
+        file_path, reader = self._get_reader(file_path)
+        documents = reader.read(file_path)
+        for document in documents:
+            document.metadata.setdefault("file_name", file_path.name)
+        return self.document_processor.process(documents, file_path.suffix.lower())
+
+    def iter_nodes(self, file_path: str | Path) -> Iterator[BaseNode]:
+        file_path, reader = self._get_reader(file_path)
+        extension = file_path.suffix.lower()
+        for document in traced_iter(reader.iter_documents(file_path), STAGE_READ):
+            document.metadata.setdefault("file_name", file_path.name)
+            document.excluded_embed_metadata_keys.append("file_name")
+            with span(STAGE_CHUNK):
+                nodes = self.document_processor.process([document], extension)
+            yield from nodes
+
+    def close(self) -> None:
+        for reader in self.readers:
+            reader.close()
     
     def process_documents(self, documents: List[Document]) -> List[Document]:
         return documents
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Dict, List
+
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from src.backend.core.services.bm25_index import BM25Index
+from src.utils.config import HYBRID_CANDIDATE_K, HYBRID_TOP_K, RRF_K
+
+class BM25Retriever(BaseRetriever):
+    def __init__(self, index: BM25Index, top_k: int = HYBRID_CANDIDATE_K):
+        super().__init__()
+        self.index = index
+        self.top_k = top_k
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        self.index.refresh()
+        return [
+            NodeWithScore(node=self.index.get_node(chunk_id), score=score)
+            for chunk_id, score in self.index.search(query_bundle.query_str, self.top_k)
+        ]
+
+class HybridRetriever(BaseRetriever):
+    def __init__(
+        self,
+        retrievers: List[BaseRetriever],
+        top_k: int = HYBRID_TOP_K,
+        rrf_k: int = RRF_K
+    ):
+        super().__init__()
+        self.retrievers = retrievers
+        self.top_k = top_k
+        self.rrf_k = rrf_k
+
+    def _fuse(self, results: List[List[NodeWithScore]]) -> List[NodeWithScore]:
+        fused_scores: Dict[str, float] = {}
+        nodes: Dict[str, NodeWithScore] = {}
+        for retriever_results in results:
+            for rank, result in enumerate(retriever_results):
+                node_id = result.node.node_id
+                fused_scores[node_id] = fused_scores.get(node_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                nodes.setdefault(node_id, result)
+
+        ranked = sorted(fused_scores, key=fused_scores.get, reverse=True)[:self.top_k]
+        return [NodeWithScore(node=nodes[node_id].node, score=fused_scores[node_id]) for node_id in ranked]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self._fuse([retriever.retrieve(query_bundle) for retriever in self.retrievers])
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self._fuse(await asyncio.gather(*(retriever.aretrieve(query_bundle) for retriever in self.retrievers)))
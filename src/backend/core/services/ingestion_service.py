@@ -0,0 +1,117 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
+
+from src.backend.core.services.embedding_cache import EmbeddingCache
+from src.backend.core.services.tracing import STAGE_EMBED, STAGE_EMBEDDING_CACHE, STAGE_VECTOR_WRITE, span
+from src.utils.config import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_CONCURRENCY,
+    EMBED_MAX_PENDING_BATCHES
+)
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+@dataclass
+class IngestionStats:
+    nodes: int = 0
+    batches: int = 0
+    cache_hits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+class IngestionService:
+    def __init__(
+        self,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_concurrency: int = EMBED_MAX_CONCURRENCY,
+        max_pending_batches: int = EMBED_MAX_PENDING_BATCHES,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
+        self.embedding_cache = embedding_cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_pending_batches = max(max_pending_batches, max_concurrency)
+
+    def _batches(self, nodes: Iterable[BaseNode]) -> Iterable[List[BaseNode]]:
+        batch: List[BaseNode] = []
+        for node in nodes:
+            batch.append(node)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _embed_batch(self, embed_model: BaseEmbedding, batch: List[BaseNode]) -> Tuple[List[BaseNode], int]:
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+        cached = {}
+        if self.embedding_cache is not None:
+            with span(STAGE_EMBEDDING_CACHE):
+                cached = self.embedding_cache.get_many(embed_model.model_name, texts)
+
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            with span(STAGE_EMBED):
+                embeddings = embed_model.get_text_embedding_batch(missing_texts)
+            if self.embedding_cache is not None:
+                with span(STAGE_EMBEDDING_CACHE):
+                    self.embedding_cache.put_many(embed_model.model_name, missing_texts, embeddings)
+            cached.update(zip(missing, embeddings))
+
+        for i, node in enumerate(batch):
+            node.embedding = cached[i]
+        return batch, len(batch) - len(missing)
+
+    def ingest(
+        self,
+        nodes: Iterable[BaseNode],
+        embed_model: BaseEmbedding,
+        vector_store: BasePydanticVectorStore,
+        total: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> IngestionStats:
+        stats = IngestionStats()
+        start = time.perf_counter()
+        pending: Set[Future] = set()
+
+        def drain(return_when: str) -> None:
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                pending.discard(future)
+                batch, cache_hits = future.result()
+                with span(STAGE_VECTOR_WRITE):
+                    vector_store.add(batch)
+                stats.nodes += len(batch)
+                stats.cache_hits += cache_hits
+                stats.batches += 1
+                if on_progress:
+                    on_progress(stats.nodes, total)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embed") as executor:
+            try:
+                for batch in self._batches(nodes):
+                    if len(pending) >= self.max_pending_batches:
+                        drain(FIRST_COMPLETED)
+                    pending.add(executor.submit(
+                        contextvars.copy_context().run, self._embed_batch, embed_model, batch
+                    ))
+                while pending:
+                    drain(FIRST_COMPLETED)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        stats.seconds = time.perf_counter() - start
+        return stats
@@ -0,0 +1,142 @@
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Set, Tuple
+
+from src.backend.core.repositories.session_repository import (
+    SessionRepository,
+    STATUS_FAILED,
+    STATUS_PROCESSING,
+    STATUS_READY,
+    build_ingest_stats,
+    build_processing_update,
+    is_stale_processing
+)
+from src.backend.core.services.rag_service import RAGService
+from src.backend.core.services.tracing import PIPELINE_INGEST, Trace
+from src.utils.config import INGESTION_HEARTBEAT, INGESTION_STALE_AFTER, INGESTION_WORKERS
+
+logger = logging.getLogger(__name__)
+
+def process_owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def owner_is_gone(owner: str) -> bool:
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit() or os.name != "posix":
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass
+    return False
+
+class IngestionWorker:
+    def __init__(
+        self,
+        session_repo: SessionRepository,
+        rag_service: RAGService,
+        max_workers: int = INGESTION_WORKERS,
+        progress_interval: float = 0.5,
+        stale_after: float = INGESTION_STALE_AFTER,
+        heartbeat_interval: float = INGESTION_HEARTBEAT
+    ):
+        self.session_repo = session_repo
+        self.rag_service = rag_service
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self.owner_id = process_owner_id()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._queues: Dict[str, Deque[Tuple[str, Optional[str], Future]]] = {}
+        self._failed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, name="ingest-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, session_id: str, file_path: str, filename: Optional[str] = None) -> Future:
+        future: Future = Future()
+        with self._lock:
+            queue = self._queues.get(session_id)
+            if queue is None:
+                queue = self._queues[session_id] = deque()
+                self._executor.submit(self._drain, session_id)
+            if session_id not in self._failed:
+                self.session_repo.update(session_id, build_processing_update(self.owner_id))
+            queue.append((file_path, filename, future))
+        return future
+
+    def is_running(self, session_id: str) -> bool:
+        return session_id in self._queues
+
+    def is_interrupted(self, session: Dict) -> bool:
+        if session.get("status") != STATUS_PROCESSING or self.is_running(session["session_id"]):
+            return False
+        owner = session.get("ingest_owner")
+        if owner == self.owner_id or (owner and owner_is_gone(owner)):
+            return True
+        return is_stale_processing(session, self.stale_after)
+
+    def _beat(self) -> None:
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._lock:
+                session_ids = list(self._queues)
+            if not session_ids:
+                continue
+            try:
+                self.session_repo.heartbeat(session_ids)
+            except Exception:
+                logger.exception("Failed to refresh the ingestion heartbeat for %d sessions", len(session_ids))
+
+    def _drain(self, session_id: str) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues[session_id]
+                if not queue:
+                    del self._queues[session_id]
+                    if session_id in self._failed:
+                        self._failed.discard(session_id)
+                    else:
+                        self.session_repo.update_status(session_id, status=STATUS_READY, progress=1.0)
+                    return
+                file_path, filename, future = queue.popleft()
+            try:
+                self.session_repo.heartbeat([session_id])
+                self._run(session_id, file_path, filename)
+            except Exception as e:
+                with self._lock:
+                    self._failed.add(session_id)
+                    self.session_repo.update_status(session_id, status=STATUS_FAILED, error=str(e))
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+    def _run(self, session_id: str, file_path: str, filename: Optional[str]) -> None:
+        last_update = 0.0
+
+        def on_progress(done: int, total: Optional[int]) -> None:
+            nonlocal last_update
+            now = time.monotonic()
+            if now - last_update < self.progress_interval and (not total or done < total):
+                return
+            last_update = now
+            self.session_repo.update_status(
+                session_id,
+                progress=done / total if total else None,
+                processed_chunks=done
+            )
+
+        trace = Trace(PIPELINE_INGEST)
+        self.rag_service.process_file(file_path, session_id, filename=filename, on_progress=on_progress, trace=trace)
+        self.session_repo.update(session_id, {"ingest_stats": build_ingest_stats(trace.to_dict())})
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._stopped.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,31 +1,151 @@
+import threading
+from typing import Any, List, Optional, Sequence, Union
+from pydantic import PrivateAttr
+from llama_index.core.llms import ChatMessage, ChatResponse, ChatResponseAsyncGen, ChatResponseGen
 from llama_index.llms.ollama import Ollama
 from llama_index.embeddings.ollama import OllamaEmbedding
+from src.backend.core.services.ollama_scheduler import OllamaScheduler
 from src.utils.config import (
     OLLAMA_HOST,
+    OLLAMA_REQUEST_TIMEOUT,
     MISTRAL_MODEL,
-    CODE_MODEL
+    CODE_MODEL,
+    EMBEDDING_MODEL,
+    LLM_CONTEXT_WINDOW
 )
 
+class ScheduledOllama(Ollama):
+    _scheduler: OllamaScheduler = PrivateAttr()
+
+    def __init__(self, scheduler: OllamaScheduler, **kwargs: Any):
+        super().__init__(
+            client=scheduler.client,
+            async_client=scheduler.async_client,
+            keep_alive=scheduler.keep_alive,
+            **kwargs
+        )
+        self._scheduler = scheduler
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        with self._scheduler.slot(self.model):
+            return super().chat(messages, **kwargs)
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        responses = super().stream_chat(messages, **kwargs)
+
+        def gen() -> ChatResponseGen:
+            with self._scheduler.slot(self.model):
+                yield from responses
+
+        return gen()
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        async with self._scheduler.aslot(self.model):
+            return await super().achat(messages, **kwargs)
+
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        responses = await super().astream_chat(messages, **kwargs)
+
+        async def gen() -> ChatResponseAsyncGen:
+            async with self._scheduler.aslot(self.model):
+                async for response in responses:
+                    yield response
+
+        return gen()
+
+class ScheduledOllamaEmbedding(OllamaEmbedding):
+    _scheduler: OllamaScheduler = PrivateAttr()
+
+    def __init__(self, scheduler: OllamaScheduler, **kwargs: Any):
+        super().__init__(keep_alive=scheduler.keep_alive, **kwargs)
+        self._scheduler = scheduler
+
+    def _embed(self, texts: Union[str, List[str]]) -> List[List[float]]:
+        return self._scheduler.client.embed(
+            model=self.model_name,
+            input=texts,
+            options=self.ollama_additional_kwargs,
+            keep_alive=self.keep_alive
+        ).embeddings
+
+    async def _aembed(self, texts: Union[str, List[str]]) -> List[List[float]]:
+        result = await self._scheduler.async_client.embed(
+            model=self.model_name,
+            input=texts,
+            options=self.ollama_additional_kwargs,
+            keep_alive=self.keep_alive
+        )
+        return result.embeddings
+
+    def get_general_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+    async def aget_general_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self._aembed(texts)
+
+    def get_general_text_embedding(self, texts: str) -> List[float]:
+        return self._embed(texts)[0]
+
+    async def aget_general_text_embedding(self, prompt: str) -> List[float]:
+        return (await self._aembed(prompt))[0]
+
 class LLMService:
-    def __init__(self, host: str = OLLAMA_HOST, timeout: float = 300.0):
-        self.chat_llm = Ollama(
+    def __init__(
+        self,
+        host: str = OLLAMA_HOST,
+        timeout: float = OLLAMA_REQUEST_TIMEOUT,
+        embedding_model: str = EMBEDDING_MODEL,
+        context_window: int = LLM_CONTEXT_WINDOW,
+        scheduler: Optional[OllamaScheduler] = None
+    ):
+        self.scheduler = scheduler or OllamaScheduler(host=host, request_timeout=timeout)
+        self.chat_llm = ScheduledOllama(
+            self.scheduler,
             model=MISTRAL_MODEL,
             temperature=0.7,
             base_url=host,
             request_timeout=timeout,
+            context_window=context_window,
         )
-        self.code_llm = Ollama(
+        self.code_llm = ScheduledOllama(
+            self.scheduler,
             model=CODE_MODEL,
             temperature=0.2,
             base_url=host,
             request_timeout=timeout,
+            context_window=context_window,
         )
-        self.embedding_model = OllamaEmbedding(
-            model_name=MISTRAL_MODEL,
+        self.embedding_model = ScheduledOllamaEmbedding(
+            self.scheduler,
+            model_name=embedding_model,
             base_url=host,
-            request_timeout=timeout,
         )
+        self._embedding_dimension: Optional[int] = None
+
+    def get_embedding_dimension(self) -> int:
+        if self._embedding_dimension is None:
+            probe = self.embedding_model.get_text_embedding("dimension probe")
+            self._embedding_dimension = len(probe)
+        return self._embedding_dimension
 
     def get_llm_for_query(self, query: str):
         code_terms = ["code", "function", "class", "programming", "syntax"]
         return self.code_llm if any(term in query.lower() for term in code_terms) else self.chat_llm
+
+    def warm_up(self) -> None:
+        try:
+            self.get_embedding_dimension()
+            self.scheduler.warm_up([self.chat_llm.model])
+        except Exception:
+            pass
+
+    def start_warm_up(self) -> threading.Thread:
+        thread = threading.Thread(target=self.warm_up, name="ollama-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    async def aclose(self) -> None:
+        await self.scheduler.aclose()
+
+    def close(self) -> None:
+        self.scheduler.close()
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional
+
+import httpx
+import numpy as np
+from ollama import AsyncClient, Client
+
+from src.utils.config import (
+    OLLAMA_HOST,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_MAX_AFFINITY_WAIT,
+    OLLAMA_MAX_CONCURRENCY,
+    OLLAMA_MAX_LOADED_MODELS,
+    OLLAMA_MIN_READ_TIMEOUT,
+    OLLAMA_MODEL_CONCURRENCY,
+    OLLAMA_POOL_CONNECTIONS,
+    OLLAMA_REQUEST_TIMEOUT,
+    OLLAMA_TIMEOUT_FACTOR
+)
+
+GENERATION_PATHS = ("/api/chat", "/api/generate")
+CONNECT_TIMEOUT = 10.0
+LATENCY_SMOOTHING = 0.2
+RECENT_WAITS = 512
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+@dataclass
+class ModelQueueStats:
+    requests: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    first_byte_seconds: Optional[float] = None
+    recent_waits: Deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_WAITS), repr=False)
+
+    def record_wait(self, seconds: float) -> None:
+        self.requests += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self.recent_waits.append(seconds)
+
+    def to_dict(self) -> Dict:
+        stats = asdict(self)
+        recent_waits = stats.pop("recent_waits")
+        p50, p95 = np.percentile(np.array(recent_waits), [50, 95]) if recent_waits else (0.0, 0.0)
+        stats.update({"wait_seconds_p50": float(p50), "wait_seconds_p95": float(p95)})
+        return stats
+
+@dataclass
+class _Waiter:
+    model: str
+    enqueued_at: float
+    wake: Callable[[], None]
+    granted: bool = False
+
+class _TimedTransport(httpx.BaseTransport):
+    def __init__(self, scheduler: "OllamaScheduler", transport: httpx.BaseTransport):
+        self.scheduler = scheduler
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model = self.scheduler.prepare_request(request)
+        start = time.perf_counter()
+        response = self.transport.handle_request(request)
+        if model:
+            self.scheduler.record_first_byte(model, time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+class _AsyncTimedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, scheduler: "OllamaScheduler", transport: httpx.AsyncBaseTransport):
+        self.scheduler = scheduler
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model = self.scheduler.prepare_request(request)
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        if model:
+            self.scheduler.record_first_byte(model, time.perf_counter() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+class OllamaScheduler:
+    def __init__(
+        self,
+        host: str = OLLAMA_HOST,
+        default_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        max_loaded_models: int = OLLAMA_MAX_LOADED_MODELS,
+        max_affinity_wait: float = OLLAMA_MAX_AFFINITY_WAIT,
+        keep_alive: float = OLLAMA_KEEP_ALIVE,
+        request_timeout: float = OLLAMA_REQUEST_TIMEOUT,
+        min_read_timeout: float = OLLAMA_MIN_READ_TIMEOUT,
+        timeout_factor: float = OLLAMA_TIMEOUT_FACTOR,
+        pool_connections: int = OLLAMA_POOL_CONNECTIONS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.default_concurrency = default_concurrency
+        self.model_concurrency = dict(OLLAMA_MODEL_CONCURRENCY if model_concurrency is None else model_concurrency)
+        self.max_loaded_models = max_loaded_models
+        self.max_affinity_wait = max_affinity_wait
+        self.keep_alive = keep_alive
+        self.request_timeout = request_timeout
+        self.min_read_timeout = min_read_timeout
+        self.timeout_factor = timeout_factor
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._in_flight: Counter = Counter()
+        self._loaded: "OrderedDict[str, float]" = OrderedDict()
+        self._stats: Dict[str, ModelQueueStats] = {}
+        self.model_loads = 0
+
+        limits = httpx.Limits(max_connections=pool_connections, max_keepalive_connections=pool_connections)
+        timeout = httpx.Timeout(request_timeout, connect=CONNECT_TIMEOUT)
+        self._transport = _TimedTransport(self, httpx.HTTPTransport(limits=limits))
+        self._async_transport = _AsyncTimedTransport(self, httpx.AsyncHTTPTransport(limits=limits))
+        self.client = Client(host=host, timeout=timeout, transport=self._transport)
+        self.async_client = AsyncClient(host=host, timeout=timeout, transport=self._async_transport)
+
+    def _limit(self, model: str) -> int:
+        return self.model_concurrency.get(model, self.default_concurrency)
+
+    def _model_stats(self, model: str) -> ModelQueueStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelQueueStats()
+        return stats
+
+    def _is_warm(self, model: str, now: float) -> bool:
+        last_used = self._loaded.get(model)
+        return last_used is not None and (self._in_flight[model] > 0 or now - last_used < self.keep_alive)
+
+    def _mark_loaded(self, model: str, now: float) -> None:
+        if not self._is_warm(model, now):
+            self.model_loads += 1
+        self._loaded[model] = now
+        self._loaded.move_to_end(model)
+        idle = [loaded for loaded in self._loaded if loaded != model and self._in_flight[loaded] == 0]
+        while len(self._loaded) > self.max_loaded_models and idle:
+            del self._loaded[idle.pop(0)]
+
+    def _pick(self, now: float) -> Optional[str]:
+        running = {model for model, count in self._in_flight.items() if count > 0}
+
+        def can_run(model: str) -> bool:
+            return model in running or len(running) < self.max_loaded_models
+
+        def oldest(model: str) -> float:
+            return self._queues[model][0].enqueued_at
+
+        ready = [model for model, queue in self._queues.items() if queue and self._in_flight[model] < self._limit(model)]
+        if not ready:
+            return None
+        starving = [
+            model for model, queue in self._queues.items()
+            if queue and now - queue[0].enqueued_at >= self.max_affinity_wait
+        ]
+        if starving:
+            model = min(starving, key=oldest)
+            if model in ready:
+                return model if can_run(model) else None
+        runnable = [model for model in ready if can_run(model)]
+        loaded = [model for model in runnable if self._is_warm(model, now)]
+        candidates = loaded or runnable
+        return min(candidates, key=oldest) if candidates else None
+
+    def _dispatch(self) -> None:
+        now = self._clock()
+        while True:
+            model = self._pick(now)
+            if model is None:
+                return
+            waiter = self._queues[model].popleft()
+            waiter.granted = True
+            self._in_flight[model] += 1
+            self._mark_loaded(model, now)
+            self._model_stats(model).record_wait(now - waiter.enqueued_at)
+            waiter.wake()
+
+    def _enqueue(self, model: str, wake: Callable[[], None]) -> _Waiter:
+        with self._lock:
+            waiter = _Waiter(model, self._clock(), wake)
+            self._queues.setdefault(model, deque()).append(waiter)
+            self._dispatch()
+            return waiter
+
+    def _cancel(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self._release_locked(waiter.model)
+            else:
+                self._queues[waiter.model].remove(waiter)
+                self._dispatch()
+
+    def _release_locked(self, model: str) -> None:
+        self._in_flight[model] -= 1
+        if model in self._loaded:
+            self._loaded[model] = self._clock()
+        self._dispatch()
+
+    def release(self, model: str) -> None:
+        with self._lock:
+            self._release_locked(model)
+
+    @contextmanager
+    def slot(self, model: str) -> Iterator[None]:
+        event = threading.Event()
+        waiter = self._enqueue(model, event.set)
+        try:
+            event.wait()
+        except BaseException:
+            self._cancel(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    @asynccontextmanager
+    async def aslot(self, model: str) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enqueue(model, wake)
+        try:
+            await granted
+        except BaseException:
+            self._cancel(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def prepare_request(self, request: httpx.Request) -> Optional[str]:
+        if request.method != "POST" or not request.url.path.endswith(GENERATION_PATHS):
+            return None
+        try:
+            body = json.loads(request.content)
+        except ValueError:
+            return None
+        if not body.get("stream", True):
+            return None
+        model = body.get("model")
+        if model:
+            timeout = dict(request.extensions.get("timeout") or {})
+            timeout["read"] = self.read_timeout(model)
+            request.extensions["timeout"] = timeout
+        return model
+
+    def _read_timeout(self, model: str, now: float) -> float:
+        stats = self._stats.get(model)
+        if stats is None or stats.first_byte_seconds is None or not self._is_warm(model, now):
+            return self.request_timeout
+        return min(self.request_timeout, max(self.min_read_timeout, self.timeout_factor * stats.first_byte_seconds))
+
+    def read_timeout(self, model: str) -> float:
+        with self._lock:
+            return self._read_timeout(model, self._clock())
+
+    def record_first_byte(self, model: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._model_stats(model)
+            if stats.first_byte_seconds is None:
+                stats.first_byte_seconds = seconds
+            else:
+                stats.first_byte_seconds += LATENCY_SMOOTHING * (seconds - stats.first_byte_seconds)
+
+    def warm_up(self, models: List[str]) -> None:
+        for model in models:
+            with self.slot(model):
+                self.client.generate(model=model, keep_alive=self.keep_alive)
+
+    def stats(self) -> Dict[str, Dict]:
+        now = self._clock()
+        with self._lock:
+            result = {}
+            for model in set(self._stats) | set(self._queues):
+                stats = self._model_stats(model).to_dict()
+                stats.update({
+                    "queue_depth": len(self._queues.get(model, ())),
+                    "in_flight": self._in_flight[model],
+                    "loaded": self._is_warm(model, now),
+                    "read_timeout": self._read_timeout(model, now)
+                })
+                result[model] = stats
+            return result
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
+
+    def close(self) -> None:
+        self._transport.close()
+        if _in_event_loop():
+            return
+        try:
+            asyncio.run(self.aclose())
+        except RuntimeError:
+            pass
@@ -0,0 +1,16 @@
+from typing import List, Tuple
+
+import pypdf
+
+PageText = Tuple[int, str, str]
+
+def count_pdf_pages(file_path: str) -> int:
+    return len(pypdf.PdfReader(file_path).pages)
+
+def extract_pdf_pages(file_path: str, start: int, end: int) -> List[PageText]:
+    pdf = pypdf.PdfReader(file_path)
+    labels = pdf.page_labels
+    return [
+        (page, labels[page], pdf.pages[page].extract_text())
+        for page in range(start, min(end, len(pdf.pages)))
+    ]
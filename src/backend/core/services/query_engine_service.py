@@ -1,9 +1,103 @@
+from typing import Optional
 from llama_index.core import VectorStoreIndex
 from llama_index.core.base.base_query_engine import BaseQueryEngine
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.callbacks import CallbackManager
+from llama_index.core.llms import LLM
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.response_synthesizers import BaseSynthesizer, get_response_synthesizer
+from llama_index.core.vector_stores import MetadataFilters
+
+from src.backend.core.services.adaptive_synthesizer import AdaptiveSynthesizer
+from src.backend.core.services.bm25_index import BM25Index
+from src.backend.core.services.context_compressor import ContextCompressor
+from src.backend.core.services.hybrid_retriever import BM25Retriever, HybridRetriever
+from src.backend.core.services.llm_usage import LLMUsageHandler
+from src.backend.core.services.tracing import TracingHandler
+from src.utils.config import (
+    CONTEXT_COMPRESSION_ENABLED,
+    HYBRID_CANDIDATE_K,
+    HYBRID_TOP_K,
+    SYNTHESIS_CONTEXT_BUDGET,
+    SYNTHESIS_MODE,
+    VECTOR_TOP_K
+)
+
+RETRIEVAL_VECTOR = "vector"
+RETRIEVAL_HYBRID = "hybrid"
+RETRIEVAL_MODES = (RETRIEVAL_VECTOR, RETRIEVAL_HYBRID)
+
+SYNTHESIS_COMPACT = "compact"
+SYNTHESIS_REFINE = "refine"
+SYNTHESIS_TREE_SUMMARIZE = "tree_summarize"
+SYNTHESIS_ADAPTIVE = "adaptive"
+SYNTHESIS_MODES = (SYNTHESIS_COMPACT, SYNTHESIS_REFINE, SYNTHESIS_TREE_SUMMARIZE, SYNTHESIS_ADAPTIVE)
 
 class QueryEngineService:
-    def create(self, index: VectorStoreIndex) -> BaseQueryEngine:
-        return index.as_query_engine(
-            similarity_top_k=5,
-            response_mode="tree_summarize",
+    def __init__(
+        self,
+        context_budget: Optional[int] = SYNTHESIS_CONTEXT_BUDGET,
+        compress_context: bool = CONTEXT_COMPRESSION_ENABLED
+    ):
+        self.context_budget = context_budget
+        self.compressor = ContextCompressor() if compress_context else None
+        self.callback_manager = CallbackManager([LLMUsageHandler(), TracingHandler()])
+
+    def create_retriever(
+        self,
+        index: VectorStoreIndex,
+        filters: Optional[MetadataFilters] = None,
+        retrieval_mode: str = RETRIEVAL_VECTOR,
+        lexical_index: Optional[BM25Index] = None
+    ) -> BaseRetriever:
+        if retrieval_mode == RETRIEVAL_HYBRID and lexical_index is not None:
+            retriever = HybridRetriever(
+                [
+                    index.as_retriever(similarity_top_k=HYBRID_CANDIDATE_K, filters=filters),
+                    BM25Retriever(lexical_index, top_k=HYBRID_CANDIDATE_K)
+                ],
+                top_k=HYBRID_TOP_K
+            )
+        else:
+            retriever = index.as_retriever(similarity_top_k=VECTOR_TOP_K, filters=filters)
+        retriever.callback_manager = self.callback_manager
+        return retriever
+
+    def create_synthesizer(
+        self,
+        llm: LLM,
+        streaming: bool = False,
+        synthesis_mode: str = SYNTHESIS_MODE
+    ) -> BaseSynthesizer:
+        if synthesis_mode not in SYNTHESIS_MODES:
+            raise ValueError(f"Unknown synthesis mode: {synthesis_mode}")
+        if synthesis_mode == SYNTHESIS_ADAPTIVE:
+            return AdaptiveSynthesizer(
+                llm,
+                callback_manager=self.callback_manager,
+                streaming=streaming,
+                context_budget=self.context_budget
+            )
+        return get_response_synthesizer(
+            llm=llm,
+            response_mode=synthesis_mode,
+            callback_manager=self.callback_manager,
+            streaming=streaming
+        )
+
+    def create(
+        self,
+        index: VectorStoreIndex,
+        llm: LLM,
+        streaming: bool = False,
+        filters: Optional[MetadataFilters] = None,
+        retrieval_mode: str = RETRIEVAL_VECTOR,
+        lexical_index: Optional[BM25Index] = None,
+        synthesis_mode: str = SYNTHESIS_MODE
+    ) -> BaseQueryEngine:
+        return RetrieverQueryEngine(
+            self.create_retriever(index, filters, retrieval_mode, lexical_index),
+            response_synthesizer=self.create_synthesizer(llm, streaming, synthesis_mode),
+            node_postprocessors=[self.compressor] if self.compressor else [],
+            callback_manager=self.callback_manager
         )
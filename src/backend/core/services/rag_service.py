@@ -1,74 +1,548 @@
-from typing import Optional
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import hashlib
+from typing import AsyncIterator, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 import httpx
 
 from llama_index.core import (
     VectorStoreIndex,
-    Settings,
-    Document,
     StorageContext,
 )
 from llama_index.core.base.base_query_engine import BaseQueryEngine
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore, QueryBundle
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
 
 from src.backend.core.services.llm_service import LLMService
 from src.backend.core.services.vector_store_service import VectorStoreService
-from src.backend.core.services.file_processor import FileProcessor
-from src.backend.core.services.query_engine_service import QueryEngineService
+from src.backend.core.services.file_processor import PAGE_METADATA_KEYS, FileProcessor
+from src.backend.core.services.query_engine_service import QueryEngineService, RETRIEVAL_HYBRID
+from src.backend.core.services.bm25_index import BM25IndexService
+from src.backend.core.services.ingestion_service import IngestionService, ProgressCallback
+from src.backend.core.services.embedding_cache import EmbeddingCache
+from src.backend.core.services.answer_cache import AnswerCache
+from src.backend.core.services.llm_usage import LLMUsage, track_llm_usage
+from src.backend.core.services.tracing import (
+    PIPELINE_INGEST,
+    PIPELINE_QUERY,
+    STAGE_ANSWER_CACHE,
+    STAGE_EMBED_QUERY,
+    STAGE_FINALIZE,
+    STAGE_LOAD_ENGINE,
+    Trace,
+    use_trace
+)
+from src.utils.cache import LRUCache
+from src.utils.config import (
+    ANSWER_CACHE_ENABLED,
+    DEFAULT_RETRIEVAL_MODE,
+    EMBEDDING_CACHE_ENABLED,
+    INDEX_CACHE_SIZE,
+    INDEX_CACHE_TTL,
+    SYNTHESIS_MODE
+)
+
+@dataclass
+class SessionIndex:
+    index: VectorStoreIndex
+    query_engines: Dict[Tuple[str, bool, str, str], BaseQueryEngine] = field(default_factory=dict)
+
+NO_ANSWER_MESSAGE = "I couldn't find relevant information to answer your question. Could you please rephrase or ask something else?"
+TIMEOUT_MESSAGE = "I apologize, but the response took too long to generate. This might happen with very complex questions. Could you try asking a simpler question or breaking it down into parts?"
 
 class RAGService:
-    def __init__(self):
+    def __init__(
+        self,
+        index_cache_size: int = INDEX_CACHE_SIZE,
+        index_cache_ttl: Optional[float] = INDEX_CACHE_TTL,
+        synthesis_mode: str = SYNTHESIS_MODE,
+        llm_service: Optional[LLMService] = None,
+        vector_store_service: Optional[VectorStoreService] = None,
+        lexical_index_service: Optional[BM25IndexService] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
         self.file_processor = FileProcessor()
-        self.llm_service = LLMService()
-        self.vector_store_service = VectorStoreService()
+        self.llm_service = llm_service or LLMService()
+        self.vector_store_service = vector_store_service or VectorStoreService()
         self.query_engine_service = QueryEngineService()
-        self.current_file_id: Optional[str] = None
-        
-        Settings.embed_model = self.llm_service.embedding_model
+        self.lexical_index_service = lexical_index_service or BM25IndexService()
+        self.embedding_cache = embedding_cache or (EmbeddingCache() if EMBEDDING_CACHE_ENABLED else None)
+        self.ingestion_service = IngestionService(embedding_cache=self.embedding_cache)
+        self.index_cache: LRUCache[SessionIndex] = LRUCache(index_cache_size, index_cache_ttl)
+        self.answer_cache = AnswerCache() if ANSWER_CACHE_ENABLED else None
+        self.synthesis_mode = synthesis_mode
 
-    def process_file(self, file_path: str | Path, file_id: str) -> VectorStoreIndex:
+    @staticmethod
+    def document_key(filename: str) -> str:
+        return hashlib.sha256(filename.encode("utf-8")).hexdigest()[:16]
+
+    def process_file(
+        self,
+        file_path: str | Path,
+        session_id: str,
+        filename: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        incremental: bool = True,
+        trace: Optional[Trace] = None
+    ) -> VectorStoreIndex:
         if isinstance(file_path, str):
             file_path = Path(file_path)
-            
-        documents = self.file_processor.read_file(file_path)
-        if not documents:
-            raise ValueError("No documents were processed")
+        filename = filename or file_path.name
+        document_key = self.document_key(filename)
+        trace = trace or Trace(PIPELINE_INGEST)
+        trace.set(model=self.llm_service.embedding_model.model_name, file_type=file_path.suffix.lower())
+        with use_trace(trace):
+            session_index = self._index_file(file_path, session_id, filename, document_key, on_progress, incremental, trace)
+        trace.set(chunks_per_second=round(trace.attributes["chunks"] / trace.elapsed(), 1))
+        trace.finish()
+        return session_index.index
+
+    def _index_file(
+        self,
+        file_path: Path,
+        session_id: str,
+        filename: str,
+        document_key: str,
+        on_progress: Optional[ProgressCallback],
+        incremental: bool,
+        trace: Trace
+    ) -> SessionIndex:
+        nodes = self.file_processor.iter_nodes(file_path)
+        embedding_model = self.llm_service.embedding_model.model_name
+        embedding_dim = self.llm_service.get_embedding_dimension()
         
-        vector_store = self.vector_store_service.get_or_create_collection(file_id, recreate=True)
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
+        self.index_cache.invalidate(session_id)
+        self._invalidate_answers(session_id)
+        vector_store = self.vector_store_service.get_store(embedding_model, embedding_dim)
+        if incremental:
+            existing_ids = self.vector_store_service.get_chunk_ids(session_id, document_key, embedding_model, embedding_dim)
+        else:
+            self.vector_store_service.delete_document(session_id, document_key, embedding_model)
+            self.lexical_index_service.remove_document(session_id, document_key)
+            existing_ids = set()
         
-        index = VectorStoreIndex.from_documents(
-            documents,
-            storage_context=storage_context,
-            show_progress=True
+        current_ids: Set[str] = set()
+        prepared_nodes = self.lexical_index_service.index_nodes(
+            session_id,
+            self._prepare_nodes(session_id, document_key, filename, nodes, current_ids)
+        )
+        changed_nodes = (node for node in prepared_nodes if node.id_ not in existing_ids)
+        stats = self.ingestion_service.ingest(
+            changed_nodes,
+            self.llm_service.embedding_model,
+            vector_store,
+            on_progress=on_progress
         )
+        if not current_ids:
+            raise ValueError("No documents were processed")
+        trace.set(chunks=len(current_ids), embedded=stats.nodes, embedding_cache_hits=stats.cache_hits)
         
-        self.current_file_id = file_id
-        return index
-
-    def query(self, file_id: str, question: str) -> str:
-        if not file_id:
-            raise ValueError("No file ID provided")
+        with trace.span(STAGE_FINALIZE):
+            stale_ids = existing_ids - current_ids
+            if stale_ids:
+                self.vector_store_service.delete_chunks(stale_ids, embedding_model)
+            self.vector_store_service.flush()
+            lexical_index = self.lexical_index_service.get(session_id)
+            self.lexical_index_service.remove_chunks(
+                session_id,
+                set(lexical_index.chunk_ids_for("document_key", document_key)) - current_ids
+            )
             
-        vector_store = self.vector_store_service.get_collection(file_id)
+            session_index = self._load_session_index(session_id)
+        self.index_cache.put(session_id, session_index)
+        return session_index
+
+    async def aprocess_file(
+        self,
+        file_path: str | Path,
+        session_id: str,
+        filename: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        incremental: bool = True,
+        trace: Optional[Trace] = None
+    ) -> VectorStoreIndex:
+        return await asyncio.to_thread(self.process_file, file_path, session_id, filename, on_progress, incremental, trace)
+
+    def remove_document(self, session_id: str, filename: str) -> None:
+        document_key = self.document_key(filename)
+        self.vector_store_service.delete_document(
+            session_id,
+            document_key,
+            self.llm_service.embedding_model.model_name
+        )
+        self.vector_store_service.flush()
+        self.lexical_index_service.remove_document(session_id, document_key)
+        self.index_cache.invalidate(session_id)
+        self._invalidate_answers(session_id)
+
+    def remove_session(self, session_id: str, filenames: Iterable[str]) -> None:
+        for filename in filenames:
+            self.remove_document(session_id, filename)
+
+    @staticmethod
+    def chunk_hash(node: BaseNode) -> str:
+        content = node.get_content(metadata_mode=MetadataMode.NONE)
+        citation = "\x00".join(f"{key}={node.metadata[key]}" for key in PAGE_METADATA_KEYS if key in node.metadata)
+        if citation:
+            content = f"{content}\x00{citation}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _prepare_nodes(
+        self,
+        session_id: str,
+        document_key: str,
+        filename: str,
+        nodes: Iterable[BaseNode],
+        seen_ids: Set[str]
+    ) -> Iterator[BaseNode]:
+        occurrences: Counter = Counter()
+        for node in nodes:
+            chunk_hash = self.chunk_hash(node)
+            occurrences[chunk_hash] += 1
+            node.id_ = f"{session_id}:{document_key}:{chunk_hash[:32]}:{occurrences[chunk_hash]}"
+            node.metadata.update({
+                "session_id": session_id,
+                "document_key": document_key,
+                "file_name": filename,
+                "chunk_hash": chunk_hash
+            })
+            for key in ("session_id", "document_key", "chunk_hash"):
+                node.excluded_embed_metadata_keys.append(key)
+                node.excluded_llm_metadata_keys.append(key)
+            seen_ids.add(node.id_)
+            yield node
+
+    def _load_session_index(self, session_id: str) -> SessionIndex:
+        vector_store = self.vector_store_service.get_store(
+            self.llm_service.embedding_model.model_name,
+            self.llm_service.get_embedding_dimension()
+        )
         storage_context = StorageContext.from_defaults(vector_store=vector_store)
         
         index = VectorStoreIndex.from_vector_store(
             vector_store,
+            embed_model=self.llm_service.embedding_model,
             storage_context=storage_context,
         )
+        return SessionIndex(index)
+
+    def _get_session_index(self, session_id: str) -> SessionIndex:
+        return self.index_cache.get_or_create(
+            session_id,
+            lambda: self._load_session_index(session_id)
+        )
+
+    def ensure_index(self, session_id: str, documents: List[Dict]) -> None:
+        if self.index_cache.get(session_id) is not None:
+            return
+        embedding_model = self.llm_service.embedding_model.model_name
+        embedding_dim = self.llm_service.get_embedding_dimension()
+        has_vectors = self.vector_store_service.has_session_chunks(session_id, embedding_model, embedding_dim)
+        if has_vectors and self.lexical_index_service.exists(session_id):
+            return
         
-        Settings.llm = self.llm_service.get_llm_for_query(question)
+        if not documents or any(
+            not document.get("file_path") or not Path(document["file_path"]).exists()
+            for document in documents
+        ):
+            if has_vectors:
+                return
+            raise ValueError(
+                "This session has no index for the current embedding model and its files are no longer available. "
+                "Please upload them again."
+            )
+        for document in documents:
+            self.process_file(document["file_path"], session_id, filename=document["filename"])
+        self.vector_store_service.drop_legacy_collection(session_id)
+
+    def _get_query_engine(
+        self,
+        session_id: str,
+        llm,
+        streaming: bool = False,
+        retrieval_mode: str = DEFAULT_RETRIEVAL_MODE
+    ) -> BaseQueryEngine:
+        session_index = self._get_session_index(session_id)
+        engine_key = (llm.model, streaming, retrieval_mode, self.synthesis_mode)
+        query_engine = session_index.query_engines.get(engine_key)
+        if query_engine is None:
+            lexical_index = None
+            if retrieval_mode == RETRIEVAL_HYBRID and self.lexical_index_service.exists(session_id):
+                lexical_index = self.lexical_index_service.get(session_id)
+            query_engine = self.query_engine_service.create(
+                session_index.index,
+                llm,
+                streaming=streaming,
+                filters=MetadataFilters(filters=[MetadataFilter(key="session_id", value=session_id)]),
+                retrieval_mode=retrieval_mode,
+                lexical_index=lexical_index,
+                synthesis_mode=self.synthesis_mode
+            )
+            session_index.query_engines[engine_key] = query_engine
+        return query_engine
+
+    def close(self) -> None:
+        self.index_cache.clear()
+        if self.answer_cache is not None:
+            self.answer_cache.clear()
+        self.file_processor.close()
+        self.vector_store_service.close()
+        self.lexical_index_service.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+
+    def _invalidate_answers(self, session_id: str) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.discard_where(lambda key: key[0] == session_id)
+
+    @staticmethod
+    def context_hash(nodes: Iterable[NodeWithScore]) -> str:
+        node_ids = sorted(
+            chunk_id
+            for node in nodes
+            for chunk_id in node.node.metadata.get("merged_chunk_ids", [node.node.node_id])
+        )
+        return hashlib.sha256("\n".join(node_ids).encode("utf-8")).hexdigest()
+
+    def _prepare_query(
+        self,
+        session_id: str,
+        question: str,
+        retrieval_mode: str,
+        streaming: bool,
+        trace: Trace
+    ) -> Tuple[BaseQueryEngine, QueryBundle, Hashable]:
+        if not session_id:
+            raise ValueError("No session ID provided")
+            
+        llm = self.llm_service.get_llm_for_query(question)
+        trace.set(model=llm.model, retrieval_mode=retrieval_mode)
+        with trace.span(STAGE_LOAD_ENGINE):
+            query_engine = self._get_query_engine(session_id, llm, streaming=streaming, retrieval_mode=retrieval_mode)
+        query_bundle = QueryBundle(question)
+        if self.answer_cache is not None:
+            with trace.span(STAGE_EMBED_QUERY):
+                query_bundle.embedding = self.llm_service.embedding_model.get_query_embedding(question)
+        return query_engine, query_bundle, (session_id, llm.model, retrieval_mode)
+
+    async def _aprepare_query(
+        self,
+        session_id: str,
+        question: str,
+        retrieval_mode: str,
+        streaming: bool,
+        trace: Trace
+    ) -> Tuple[BaseQueryEngine, QueryBundle, Hashable]:
+        if not session_id:
+            raise ValueError("No session ID provided")
+            
+        llm = self.llm_service.get_llm_for_query(question)
+        trace.set(model=llm.model, retrieval_mode=retrieval_mode)
+        with trace.span(STAGE_LOAD_ENGINE):
+            query_engine = await asyncio.to_thread(
+                self._get_query_engine, session_id, llm, streaming=streaming, retrieval_mode=retrieval_mode
+            )
+        query_bundle = QueryBundle(question)
+        if self.answer_cache is not None:
+            with trace.span(STAGE_EMBED_QUERY):
+                query_bundle.embedding = await self.llm_service.embedding_model.aget_query_embedding(question)
+        return query_engine, query_bundle, (session_id, llm.model, retrieval_mode)
+
+    def _get_cached_answer(
+        self,
+        cache_key: Hashable,
+        query_engine: BaseQueryEngine,
+        query_bundle: QueryBundle,
+        trace: Trace
+    ) -> Optional[str]:
+        if self.answer_cache is None:
+            return None
+        with trace.span(STAGE_ANSWER_CACHE):
+            entry = self.answer_cache.lookup(cache_key, query_bundle.embedding)
+        trace.set(cache_hit=False)
+        if entry is None:
+            return None
+        with use_trace(trace):
+            context_nodes = query_engine.retrieve(query_bundle)
+        if self.context_hash(context_nodes) != entry.context_hash:
+            return None
+        trace.set(cache_hit=True)
+        return entry.answer
+
+    async def _aget_cached_answer(
+        self,
+        cache_key: Hashable,
+        query_engine: BaseQueryEngine,
+        query_bundle: QueryBundle,
+        trace: Trace
+    ) -> Optional[str]:
+        if self.answer_cache is None:
+            return None
+        with trace.span(STAGE_ANSWER_CACHE):
+            entry = self.answer_cache.lookup(cache_key, query_bundle.embedding)
+        trace.set(cache_hit=False)
+        if entry is None:
+            return None
+        with use_trace(trace):
+            context_nodes = await query_engine.aretrieve(query_bundle)
+        if self.context_hash(context_nodes) != entry.context_hash:
+            return None
+        trace.set(cache_hit=True)
+        return entry.answer
+
+    def _cache_answer(self, cache_key: Hashable, query_bundle: QueryBundle, answer: str, response) -> None:
+        if self.answer_cache is None or not response.source_nodes:
+            return
+        self.answer_cache.put(
+            cache_key,
+            query_bundle.query_str,
+            query_bundle.embedding,
+            answer,
+            self.context_hash(response.source_nodes)
+        )
+
+    def query(
+        self,
+        session_id: str,
+        question: str,
+        retrieval_mode: str = DEFAULT_RETRIEVAL_MODE,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> str:
+        trace = trace or Trace(PIPELINE_QUERY)
+        query_engine, query_bundle, cache_key = self._prepare_query(session_id, question, retrieval_mode, False, trace)
         
         try:
-            query_engine = self.query_engine_service.create(index)
-            response = query_engine.query(question)
+            cached_answer = self._get_cached_answer(cache_key, query_engine, query_bundle, trace)
+            if cached_answer is not None:
+                if usage is not None:
+                    usage.cached_answer = True
+                return cached_answer
+                
+            with track_llm_usage(usage), use_trace(trace):
+                response = query_engine.query(query_bundle)
+            return self._answer_from_response(cache_key, query_bundle, response)
             
-            if not response or not str(response).strip():
-                return "I couldn't find relevant information to answer your question. Could you please rephrase or ask something else?"
+        except httpx.ReadTimeout:
+            return TIMEOUT_MESSAGE
+        except Exception as e:
+            return f"An error occurred while processing your question: {str(e)}"
+
+    async def aquery(
+        self,
+        session_id: str,
+        question: str,
+        retrieval_mode: str = DEFAULT_RETRIEVAL_MODE,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> str:
+        trace = trace or Trace(PIPELINE_QUERY)
+        query_engine, query_bundle, cache_key = await self._aprepare_query(
+            session_id, question, retrieval_mode, False, trace
+        )
+        
+        try:
+            cached_answer = await self._aget_cached_answer(cache_key, query_engine, query_bundle, trace)
+            if cached_answer is not None:
+                if usage is not None:
+                    usage.cached_answer = True
+                return cached_answer
                 
-            return str(response)
+            with track_llm_usage(usage), use_trace(trace):
+                response = await query_engine.aquery(query_bundle)
+            return self._answer_from_response(cache_key, query_bundle, response)
             
         except httpx.ReadTimeout:
-            return "I apologize, but the response took too long to generate. This might happen with very complex questions. Could you try asking a simpler question or breaking it down into parts?"
+            return TIMEOUT_MESSAGE
         except Exception as e:
             return f"An error occurred while processing your question: {str(e)}"
+
+    def _answer_from_response(self, cache_key: Hashable, query_bundle: QueryBundle, response) -> str:
+        if not response or not str(response).strip():
+            return NO_ANSWER_MESSAGE
+        answer = str(response)
+        self._cache_answer(cache_key, query_bundle, answer, response)
+        return answer
+
+    def stream_query(
+        self,
+        session_id: str,
+        question: str,
+        retrieval_mode: str = DEFAULT_RETRIEVAL_MODE,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> Iterator[str]:
+        trace = trace or Trace(PIPELINE_QUERY)
+        query_engine, query_bundle, cache_key = self._prepare_query(session_id, question, retrieval_mode, True, trace)
+        
+        deltas: List[str] = []
+        try:
+            cached_answer = self._get_cached_answer(cache_key, query_engine, query_bundle, trace)
+            if cached_answer is not None:
+                if usage is not None:
+                    usage.cached_answer = True
+                trace.mark_first_token()
+                yield cached_answer
+                return
+                
+            with track_llm_usage(usage), use_trace(trace):
+                response = query_engine.query(query_bundle)
+                for delta in response.response_gen:
+                    if not deltas and not delta.strip():
+                        continue
+                    trace.mark_first_token()
+                    deltas.append(delta)
+                    yield delta
+                
+            if not deltas:
+                yield NO_ANSWER_MESSAGE
+            else:
+                self._cache_answer(cache_key, query_bundle, "".join(deltas), response)
+                
+        except httpx.ReadTimeout:
+            yield TIMEOUT_MESSAGE if not deltas else f"\n\n{TIMEOUT_MESSAGE}"
+        except Exception as e:
+            yield f"An error occurred while processing your question: {str(e)}"
+
+    async def astream_query(
+        self,
+        session_id: str,
+        question: str,
+        retrieval_mode: str = DEFAULT_RETRIEVAL_MODE,
+        usage: Optional[LLMUsage] = None,
+        trace: Optional[Trace] = None
+    ) -> AsyncIterator[str]:
+        trace = trace or Trace(PIPELINE_QUERY)
+        query_engine, query_bundle, cache_key = await self._aprepare_query(
+            session_id, question, retrieval_mode, True, trace
+        )
+        
+        deltas: List[str] = []
+        try:
+            cached_answer = await self._aget_cached_answer(cache_key, query_engine, query_bundle, trace)
+            if cached_answer is not None:
+                if usage is not None:
+                    usage.cached_answer = True
+                trace.mark_first_token()
+                yield cached_answer
+                return
+                
+            with track_llm_usage(usage), use_trace(trace):
+                response = await query_engine.aquery(query_bundle)
+                async for delta in response.async_response_gen():
+                    if not deltas and not delta.strip():
+                        continue
+                    trace.mark_first_token()
+                    deltas.append(delta)
+                    yield delta
+                
+            if not deltas:
+                yield NO_ANSWER_MESSAGE
+            else:
+                self._cache_answer(cache_key, query_bundle, "".join(deltas), response)
+                
+        except httpx.ReadTimeout:
+            yield TIMEOUT_MESSAGE if not deltas else f"\n\n{TIMEOUT_MESSAGE}"
+        except Exception as e:
+            yield f"An error occurred while processing your question: {str(e)}"
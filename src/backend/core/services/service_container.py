@@ -0,0 +1,151 @@
+import asyncio
+import atexit
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import AsyncMongoClient, MongoClient
+
+from src.backend.core.repositories.chat_repository import ChatRepository
+from src.backend.core.repositories.session_repository import SessionRepository
+from src.backend.core.services.chat_history_writer import ChatHistoryWriter
+from src.backend.core.services.ingestion_worker import IngestionWorker
+from src.backend.core.services.llm_service import LLMService
+from src.backend.core.services.rag_service import RAGService
+from src.utils.cache import LRUCache
+from src.utils.config import MONGO_DB_NAME, MONGO_URI, OLLAMA_WARM_UP, SESSION_CACHE_SIZE, SESSION_CACHE_TTL
+
+
+class ServiceContainer:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._finalizers: Dict[str, Optional[Callable[[Any], None]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._creation_order: List[str] = []
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        shutdown: Optional[Callable[[Any], None]] = None
+    ) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._finalizers[name] = shutdown
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise KeyError(f"Service not registered: {name}")
+            instance = self._factories[name]()
+            self._instances[name] = instance
+            self._creation_order.append(name)
+            return instance
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for name in reversed(self._creation_order):
+                instance = self._instances.pop(name)
+                finalizer = self._finalizers.get(name)
+                if finalizer is None:
+                    continue
+                try:
+                    finalizer(instance)
+                except Exception:
+                    pass
+            self._creation_order.clear()
+
+
+def _create_mongo_client() -> MongoClient:
+    client = MongoClient(MONGO_URI)
+    db = client[MONGO_DB_NAME]
+    SessionRepository(db).ensure_indexes()
+    ChatRepository(db).ensure_indexes()
+    return client
+
+
+def _close_async_mongo_client(client: AsyncMongoClient) -> None:
+    asyncio.run(client.close())
+
+
+def _create_llm_service() -> LLMService:
+    llm_service = LLMService()
+    if OLLAMA_WARM_UP:
+        llm_service.start_warm_up()
+    return llm_service
+
+
+def _build_container() -> ServiceContainer:
+    container = ServiceContainer()
+    container.register(
+        "mongo_client",
+        _create_mongo_client,
+        shutdown=lambda client: client.close()
+    )
+    container.register(
+        "async_mongo_client",
+        lambda: AsyncMongoClient(MONGO_URI),
+        shutdown=_close_async_mongo_client
+    )
+    container.register(
+        "session_cache",
+        lambda: LRUCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL, sliding=False)
+    )
+    container.register(
+        "llm_service",
+        _create_llm_service,
+        shutdown=lambda service: service.close()
+    )
+    container.register(
+        "rag_service",
+        lambda: RAGService(llm_service=container.get("llm_service")),
+        shutdown=lambda service: service.close()
+    )
+    container.register(
+        "ingestion_worker",
+        lambda: IngestionWorker(
+            SessionRepository(container.get("mongo_client")[MONGO_DB_NAME], container.get("session_cache")),
+            container.get("rag_service")
+        ),
+        shutdown=lambda worker: worker.shutdown()
+    )
+    container.register(
+        "chat_history_writer",
+        lambda: ChatHistoryWriter(
+            ChatRepository(container.get("mongo_client")[MONGO_DB_NAME]),
+            SessionRepository(container.get("mongo_client")[MONGO_DB_NAME], container.get("session_cache"))
+        ),
+        shutdown=lambda writer: writer.close()
+    )
+    return container
+
+
+_container: Optional[ServiceContainer] = None
+_container_lock = threading.Lock()
+
+
+def get_container() -> ServiceContainer:
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = _build_container()
+                atexit.register(_container.shutdown)
+    return _container
+
+
+def shutdown_container() -> None:
+    global _container
+    with _container_lock:
+        if _container is not None:
+            _container.shutdown()
+            _container = None
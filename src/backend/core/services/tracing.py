@@ -0,0 +1,211 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from llama_index.core.callbacks import CBEventType, EventPayload
+from llama_index.core.callbacks.base_handler import BaseCallbackHandler
+
+from src.backend.core.services.llm_usage import LLMUsage
+from src.backend.core.services.metrics import registry
+
+T = TypeVar("T")
+
+PIPELINE_QUERY = "query"
+PIPELINE_INGEST = "ingest"
+
+STAGE_SESSION_LOOKUP = "session_lookup"
+STAGE_LOAD_ENGINE = "load_engine"
+STAGE_EMBED_QUERY = "embed_query"
+STAGE_ANSWER_CACHE = "answer_cache"
+STAGE_RETRIEVE = "retrieve"
+STAGE_SYNTHESIZE = "synthesize"
+STAGE_LLM = "llm"
+STAGE_COMPRESS = "compress"
+STAGE_READ = "read"
+STAGE_CHUNK = "chunk"
+STAGE_EMBEDDING_CACHE = "embedding_cache"
+STAGE_EMBED = "embed"
+STAGE_VECTOR_WRITE = "vector_write"
+STAGE_FINALIZE = "finalize"
+
+CALLBACK_STAGES = {
+    CBEventType.RETRIEVE: STAGE_RETRIEVE,
+    CBEventType.SYNTHESIZE: STAGE_SYNTHESIZE,
+    CBEventType.LLM: STAGE_LLM
+}
+
+stage_seconds = registry.histogram(
+    "rag_stage_duration_seconds", "Time spent in each pipeline stage per request", ("pipeline", "stage")
+)
+request_seconds = registry.histogram("rag_request_duration_seconds", "End-to-end time per traced request", ("pipeline",))
+first_token_seconds = registry.histogram("rag_first_token_seconds", "Time from request start to the first streamed token")
+requests_total = registry.counter("rag_requests_total", "Traced requests", ("pipeline", "model"))
+llm_calls_total = registry.counter("rag_llm_calls_total", "LLM calls made while answering", ("model",))
+llm_tokens_total = registry.counter("rag_llm_tokens_total", "LLM tokens used while answering", ("model", "kind"))
+retrieved_chunks_total = registry.counter("rag_retrieved_chunks_total", "Chunks returned by retrieval")
+answer_cache_total = registry.counter("rag_answer_cache_lookups_total", "Answer cache lookups", ("result",))
+ingested_chunks_total = registry.counter("rag_ingested_chunks_total", "Chunks produced by ingestion")
+embedded_chunks_total = registry.counter("rag_embedded_chunks_total", "New or changed chunks written to the vector store")
+embedding_cache_hits_total = registry.counter("rag_embedding_cache_hits_total", "Chunk embeddings served from the cache")
+context_tokens_total = registry.counter("rag_context_tokens_total", "Context tokens sent to synthesis after compression")
+context_tokens_saved_total = registry.counter("rag_context_tokens_saved_total", "Context tokens removed by compression")
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+class Trace:
+    def __init__(self, pipeline: str, clock: Callable[[], float] = time.perf_counter):
+        self.pipeline = pipeline
+        self.stages: Dict[str, float] = {}
+        self.attributes: Dict[str, Any] = {}
+        self.first_token: Optional[float] = None
+        self.total: Optional[float] = None
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return self._clock() - self._started
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add(stage, self._clock() - start)
+
+    def set(self, **attributes: Any) -> None:
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def mark_first_token(self) -> None:
+        if self.first_token is None:
+            self.first_token = self.elapsed()
+
+    def finish(self, usage: Optional[LLMUsage] = None) -> Dict[str, Any]:
+        if self.total is None:
+            self.total = self.elapsed()
+            _export(self, usage)
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            timing: Dict[str, Any] = {
+                "total_ms": _ms(self.elapsed() if self.total is None else self.total),
+                "stages_ms": {stage: _ms(seconds) for stage, seconds in self.stages.items()}
+            }
+            if self.first_token is not None:
+                timing["first_token_ms"] = _ms(self.first_token)
+            timing.update(self.attributes)
+            return timing
+
+def _export(trace: Trace, usage: Optional[LLMUsage]) -> None:
+    model = str(trace.attributes.get("model", ""))
+    for stage, seconds in trace.stages.items():
+        stage_seconds.observe(seconds, pipeline=trace.pipeline, stage=stage)
+    request_seconds.observe(trace.total, pipeline=trace.pipeline)
+    requests_total.inc(pipeline=trace.pipeline, model=model)
+    if trace.first_token is not None:
+        first_token_seconds.observe(trace.first_token)
+    if "cache_hit" in trace.attributes:
+        answer_cache_total.inc(result="hit" if trace.attributes["cache_hit"] else "miss")
+    if usage is not None and usage.llm_calls:
+        llm_calls_total.inc(usage.llm_calls, model=model)
+        llm_tokens_total.inc(usage.prompt_tokens, model=model, kind="prompt")
+        llm_tokens_total.inc(usage.completion_tokens, model=model, kind="completion")
+    if trace.pipeline == PIPELINE_QUERY:
+        retrieved_chunks_total.inc(trace.attributes.get("chunks", 0))
+        context_tokens_total.inc(trace.attributes.get("context_tokens", 0))
+        context_tokens_saved_total.inc(trace.attributes.get("context_tokens_saved", 0))
+    else:
+        ingested_chunks_total.inc(trace.attributes.get("chunks", 0))
+        embedded_chunks_total.inc(trace.attributes.get("embedded", 0))
+        embedding_cache_hits_total.inc(trace.attributes.get("embedding_cache_hits", 0))
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+@contextmanager
+def use_trace(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(stage):
+        yield
+
+_DONE = object()
+
+def traced_iter(iterable: Iterable[T], stage: str) -> Iterator[T]:
+    iterator = iter(iterable)
+    while True:
+        with span(stage):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+class TracingHandler(BaseCallbackHandler):
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        super().__init__(event_starts_to_ignore=[], event_ends_to_ignore=[])
+        self._clock = clock
+        self._open: Dict[str, Tuple[Trace, str, float]] = {}
+        self._lock = threading.Lock()
+
+    def on_event_start(
+        self,
+        event_type: CBEventType,
+        payload: Optional[Dict[str, Any]] = None,
+        event_id: str = "",
+        parent_id: str = "",
+        **kwargs: Any
+    ) -> str:
+        trace = _current_trace.get()
+        stage = CALLBACK_STAGES.get(event_type)
+        if trace is not None and stage is not None:
+            with self._lock:
+                self._open[event_id] = (trace, stage, self._clock())
+        return event_id
+
+    def on_event_end(
+        self,
+        event_type: CBEventType,
+        payload: Optional[Dict[str, Any]] = None,
+        event_id: str = "",
+        **kwargs: Any
+    ) -> None:
+        with self._lock:
+            entry = self._open.pop(event_id, None)
+        if entry is None:
+            return
+        trace, stage, start = entry
+        trace.add(stage, self._clock() - start)
+        if event_type == CBEventType.RETRIEVE and payload and EventPayload.NODES in payload:
+            trace.set(chunks=len(payload[EventPayload.NODES]))
+
+    def start_trace(self, trace_id: Optional[str] = None) -> None:
+        pass
+
+    def end_trace(
+        self,
+        trace_id: Optional[str] = None,
+        trace_map: Optional[Dict[str, List[str]]] = None
+    ) -> None:
+        pass
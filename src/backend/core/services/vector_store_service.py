@@ -1,30 +1,54 @@
-import chromadb
-from llama_index.vector_stores.chroma import ChromaVectorStore
+from typing import Iterable, Optional, Set
+
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
+
+from src.backend.core.vector_stores.base_vector_backend import BaseVectorBackend
+from src.utils.config import VECTOR_BACKEND
+
+def create_vector_backend(name: str = VECTOR_BACKEND) -> BaseVectorBackend:
+    if name == "chroma":
+        from src.backend.core.vector_stores.chroma_vector_backend import ChromaVectorBackend
+        return ChromaVectorBackend()
+    if name == "local":
+        from src.backend.core.vector_stores.local_vector_backend import LocalVectorBackend
+        return LocalVectorBackend()
+    raise ValueError(f"Unknown vector backend: {name}")
 
 class VectorStoreService:
-    def __init__(self, db_path: str = "./chroma_db"):
-        self.client = chromadb.PersistentClient(path=db_path)
-
-    def get_or_create_collection(self, file_id: str, recreate: bool = False) -> ChromaVectorStore:
-        collection_name = f"file_{file_id}"
-        
-        if recreate:
-            try:
-                self.client.delete_collection(collection_name)
-            except ValueError:
-                pass
-                
-        collection = self.client.create_collection(
-            name=collection_name,
-            metadata={"file_id": file_id}
-        )
-        
-        return ChromaVectorStore(chroma_collection=collection)
-
-    def get_collection(self, file_id: str) -> ChromaVectorStore:
-        collection_name = f"file_{file_id}"
-        try:
-            collection = self.client.get_collection(collection_name)
-            return ChromaVectorStore(chroma_collection=collection)
-        except ValueError:
-            raise ValueError("No index available for this file. Please process the file first.")
+    def __init__(self, backend: Optional[BaseVectorBackend] = None):
+        self.backend = backend or create_vector_backend()
+
+    def get_store(self, embedding_model: str, embedding_dim: Optional[int] = None) -> BasePydanticVectorStore:
+        return self.backend.get_store(embedding_model, embedding_dim)
+
+    def get_chunk_ids(
+        self,
+        session_id: str,
+        document_key: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> Set[str]:
+        return self.backend.get_chunk_ids(session_id, document_key, embedding_model, embedding_dim)
+
+    def has_session_chunks(
+        self,
+        session_id: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> bool:
+        return self.backend.has_session_chunks(session_id, embedding_model, embedding_dim)
+
+    def delete_chunks(self, chunk_ids: Iterable[str], embedding_model: str) -> None:
+        self.backend.delete_chunks(chunk_ids, embedding_model)
+
+    def delete_document(self, session_id: str, document_key: str, embedding_model: str) -> None:
+        self.backend.delete_document(session_id, document_key, embedding_model)
+
+    def drop_legacy_collection(self, file_id: str) -> None:
+        self.backend.drop_legacy_collection(file_id)
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+    def close(self) -> None:
+        self.backend.close()
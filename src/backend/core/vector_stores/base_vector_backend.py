@@ -0,0 +1,74 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Set
+
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
+
+class EmbeddingModelMismatchError(ValueError):
+    pass
+
+class BaseVectorBackend(ABC):
+    def __init__(self, collection_prefix: str):
+        self.collection_prefix = collection_prefix
+
+    def _collection_name(self, embedding_model: str) -> str:
+        slug = re.sub(r"[^a-zA-Z0-9_-]", "-", embedding_model).strip("-_") or "default"
+        return f"{self.collection_prefix}_{slug}"[:63]
+
+    def _check_compatibility(
+        self,
+        metadata: dict,
+        embedding_model: Optional[str],
+        embedding_dim: Optional[int]
+    ) -> None:
+        stored_model = metadata.get("embedding_model")
+        stored_dim = metadata.get("embedding_dim")
+        if embedding_model and stored_model != embedding_model:
+            raise EmbeddingModelMismatchError(
+                f"Collection was indexed with {stored_model or 'an unknown model'}, not {embedding_model}"
+            )
+        if embedding_dim and stored_dim and stored_dim != embedding_dim:
+            raise EmbeddingModelMismatchError(
+                f"Collection has {stored_dim}-dimensional vectors, expected {embedding_dim}"
+            )
+
+    @abstractmethod
+    def get_store(self, embedding_model: str, embedding_dim: Optional[int] = None) -> BasePydanticVectorStore:
+        pass
+
+    @abstractmethod
+    def get_chunk_ids(
+        self,
+        session_id: str,
+        document_key: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> Set[str]:
+        pass
+
+    @abstractmethod
+    def has_session_chunks(
+        self,
+        session_id: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    def delete_chunks(self, chunk_ids: Iterable[str], embedding_model: str) -> None:
+        pass
+
+    @abstractmethod
+    def delete_document(self, session_id: str, document_key: str, embedding_model: str) -> None:
+        pass
+
+    def drop_legacy_collection(self, file_id: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
@@ -0,0 +1,105 @@
+from typing import Any, Dict, Iterable, Optional, Set
+import chromadb
+from chromadb.api.models.Collection import Collection
+from chromadb.errors import ChromaError
+from llama_index.core.vector_stores.types import VectorStoreQuery, VectorStoreQueryResult
+from llama_index.vector_stores.chroma import ChromaVectorStore
+
+from src.backend.core.vector_stores.base_vector_backend import BaseVectorBackend
+from src.utils.config import CHROMA_DB_PATH, CHROMA_HOST, CHROMA_PORT, SHARED_COLLECTION_PREFIX
+
+def attach_embeddings(collection: Collection, result: VectorStoreQueryResult) -> VectorStoreQueryResult:
+    if not result.ids or not result.nodes:
+        return result
+    stored = collection.get(ids=list(dict.fromkeys(result.ids)), include=["embeddings"])
+    embeddings = dict(zip(stored["ids"], stored["embeddings"]))
+    for node_id, node in zip(result.ids, result.nodes):
+        embedding = embeddings.get(node_id)
+        if embedding is not None:
+            node.embedding = [float(value) for value in embedding]
+    return result
+
+class EmbeddingChromaVectorStore(ChromaVectorStore):
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        return attach_embeddings(self.client, super().query(query, **kwargs))
+
+class ChromaVectorBackend(BaseVectorBackend):
+    def __init__(
+        self,
+        db_path: str = CHROMA_DB_PATH,
+        collection_prefix: str = SHARED_COLLECTION_PREFIX,
+        host: Optional[str] = CHROMA_HOST,
+        port: int = CHROMA_PORT
+    ):
+        super().__init__(collection_prefix)
+        if host:
+            self.client = chromadb.HttpClient(host=host, port=port)
+        else:
+            self.client = chromadb.PersistentClient(path=db_path)
+        self._collections: Dict[str, Collection] = {}
+
+    def _get_shared_collection(self, embedding_model: str, embedding_dim: Optional[int] = None) -> Collection:
+        name = self._collection_name(embedding_model)
+        collection = self._collections.get(name)
+        if collection is None:
+            metadata = {"embedding_model": embedding_model}
+            if embedding_dim:
+                metadata["embedding_dim"] = embedding_dim
+            collection = self.client.get_or_create_collection(name=name, metadata=metadata)
+            self._collections[name] = collection
+        self._check_compatibility(collection.metadata or {}, embedding_model, embedding_dim)
+        return collection
+
+    def get_store(self, embedding_model: str, embedding_dim: Optional[int] = None) -> ChromaVectorStore:
+        return EmbeddingChromaVectorStore(chroma_collection=self._get_shared_collection(embedding_model, embedding_dim))
+
+    def get_chunk_ids(
+        self,
+        session_id: str,
+        document_key: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> Set[str]:
+        collection = self._get_shared_collection(embedding_model, embedding_dim)
+        result = collection.get(
+            where={"$and": [{"session_id": session_id}, {"document_key": document_key}]},
+            include=[]
+        )
+        return set(result["ids"])
+
+    def has_session_chunks(
+        self,
+        session_id: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> bool:
+        collection = self._get_shared_collection(embedding_model, embedding_dim)
+        return bool(collection.get(where={"session_id": session_id}, limit=1, include=[])["ids"])
+
+    def delete_chunks(
+        self,
+        chunk_ids: Iterable[str],
+        embedding_model: str,
+        batch_size: int = 1000
+    ) -> None:
+        collection = self._get_shared_collection(embedding_model)
+        chunk_ids = list(chunk_ids)
+        for start in range(0, len(chunk_ids), batch_size):
+            collection.delete(ids=chunk_ids[start:start + batch_size])
+
+    def delete_document(self, session_id: str, document_key: str, embedding_model: str) -> None:
+        collection = self._get_shared_collection(embedding_model)
+        collection.delete(where={"$and": [{"session_id": session_id}, {"document_key": document_key}]})
+
+    def drop_legacy_collection(self, file_id: str) -> None:
+        try:
+            self.client.delete_collection(f"file_{file_id}")
+        except (ValueError, ChromaError):
+            pass
+
+    def close(self) -> None:
+        self._collections.clear()
+        if hasattr(self.client, "close"):
+            self.client.close()
+        else:
+            self.client.clear_system_cache()
@@ -0,0 +1,86 @@
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters
+
+from src.backend.core.vector_stores.base_vector_backend import BaseVectorBackend
+from src.backend.core.vector_stores.local_vector_store import LocalVectorStore
+from src.utils.config import HNSW_THRESHOLD, LOCAL_VECTOR_PATH, SHARED_COLLECTION_PREFIX
+
+class LocalVectorBackend(BaseVectorBackend):
+    def __init__(
+        self,
+        root_path: str = LOCAL_VECTOR_PATH,
+        collection_prefix: str = SHARED_COLLECTION_PREFIX,
+        hnsw_threshold: int = HNSW_THRESHOLD
+    ):
+        super().__init__(collection_prefix)
+        self.root_path = Path(root_path)
+        self.hnsw_threshold = hnsw_threshold
+        self._stores: Dict[str, LocalVectorStore] = {}
+        self._lock = threading.Lock()
+
+    def _get_shared_store(self, embedding_model: str, embedding_dim: Optional[int] = None) -> LocalVectorStore:
+        name = self._collection_name(embedding_model)
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = LocalVectorStore(
+                    persist_dir=self.root_path / name,
+                    hnsw_threshold=self.hnsw_threshold
+                )
+                store.manifest.setdefault("embedding_model", embedding_model)
+                if embedding_dim:
+                    store.manifest.setdefault("embedding_dim", embedding_dim)
+                self._stores[name] = store
+        self._check_compatibility(store.manifest, embedding_model, embedding_dim)
+        return store
+
+    @staticmethod
+    def _document_filters(session_id: str, document_key: Optional[str] = None) -> MetadataFilters:
+        filters = [MetadataFilter(key="session_id", value=session_id, operator=FilterOperator.EQ)]
+        if document_key is not None:
+            filters.append(MetadataFilter(key="document_key", value=document_key))
+        return MetadataFilters(filters=filters)
+
+    def get_store(self, embedding_model: str, embedding_dim: Optional[int] = None) -> LocalVectorStore:
+        return self._get_shared_store(embedding_model, embedding_dim)
+
+    def get_chunk_ids(
+        self,
+        session_id: str,
+        document_key: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> Set[str]:
+        store = self._get_shared_store(embedding_model, embedding_dim)
+        return set(store.get_node_ids(self._document_filters(session_id, document_key)))
+
+    def has_session_chunks(
+        self,
+        session_id: str,
+        embedding_model: str,
+        embedding_dim: Optional[int] = None
+    ) -> bool:
+        store = self._get_shared_store(embedding_model, embedding_dim)
+        return bool(store.get_node_ids(self._document_filters(session_id)))
+
+    def delete_chunks(self, chunk_ids: Iterable[str], embedding_model: str) -> None:
+        self._get_shared_store(embedding_model).delete_nodes(node_ids=list(chunk_ids))
+
+    def delete_document(self, session_id: str, document_key: str, embedding_model: str) -> None:
+        self._get_shared_store(embedding_model).delete_nodes(
+            filters=self._document_filters(session_id, document_key)
+        )
+
+    def flush(self) -> None:
+        with self._lock:
+            stores = list(self._stores.values())
+        for store in stores:
+            store.persist()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._stores.clear()
@@ -0,0 +1,472 @@
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import (
+    build_metadata_filter_fn,
+    metadata_dict_to_node,
+    node_to_metadata_dict,
+)
+
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.jsonl"
+MANIFEST_FILE = "manifest.json"
+GRAPHS_DIR = "hnsw"
+SEGMENTS_DIR = "segments"
+COMPACT_DEAD_RATIO = 0.25
+COMPACT_MAX_SEGMENTS = 32
+
+class LocalVectorStore(BasePydanticVectorStore):
+    stores_text: bool = True
+    flat_metadata: bool = False
+    persist_dir: str
+    partition_key: str = "session_id"
+    hnsw_threshold: int = 5000
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef: int = 64
+
+    _lock: threading.RLock = PrivateAttr()
+    _manifest: Dict[str, Any] = PrivateAttr()
+    _ids: List[str] = PrivateAttr()
+    _texts: List[str] = PrivateAttr()
+    _metadata: List[Dict[str, Any]] = PrivateAttr()
+    _alive: List[bool] = PrivateAttr()
+    _row_of: Dict[str, int] = PrivateAttr()
+    _partitions: Dict[Any, List[int]] = PrivateAttr()
+    _segments: List[np.ndarray] = PrivateAttr()
+    _segment_starts: List[int] = PrivateAttr()
+    _segment_files: List[str] = PrivateAttr()
+    _pending: List[np.ndarray] = PrivateAttr()
+    _persisted_rows: int = PrivateAttr()
+    _records_file: str = PrivateAttr()
+    _records_bytes: int = PrivateAttr()
+    _dead_rows: List[int] = PrivateAttr()
+    _obsolete_files: List[str] = PrivateAttr()
+    _graphs: Dict[Any, Tuple[Tuple[int, int], Any]] = PrivateAttr()
+    _dirty: bool = PrivateAttr()
+
+    def __init__(self, persist_dir: str | Path, **kwargs: Any):
+        super().__init__(persist_dir=str(persist_dir), **kwargs)
+        self._lock = threading.RLock()
+        self._graphs = {}
+        self._load()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalVectorStore"
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        return self._manifest
+
+    def _path(self, name: str) -> Path:
+        return Path(self.persist_dir) / name
+
+    def _reset(self) -> None:
+        self._ids = []
+        self._texts = []
+        self._metadata = []
+        self._alive = []
+        self._row_of = {}
+        self._partitions = defaultdict(list)
+        self._segments = []
+        self._segment_starts = []
+        self._segment_files = []
+        self._pending = []
+        self._persisted_rows = 0
+        self._records_file = self._records_name(self._manifest["epoch"])
+        self._records_bytes = 0
+        self._dead_rows = []
+        self._obsolete_files = []
+        self._dirty = False
+
+    @staticmethod
+    def _records_name(epoch: int) -> str:
+        return f"records-{epoch:06d}.jsonl"
+
+    def _load(self) -> None:
+        self._manifest = {"epoch": 0, "partition_versions": {}}
+        self._reset()
+        manifest_path = self._path(MANIFEST_FILE)
+        if not manifest_path.exists():
+            return
+
+        self._manifest = json.loads(manifest_path.read_text())
+        self._records_file = self._manifest.get("records", RECORDS_FILE)
+        segment_files = self._manifest.get("segments")
+        if segment_files is None:
+            segment_files = [VECTORS_FILE] if self._path(VECTORS_FILE).exists() else []
+        for name in segment_files:
+            self._add_segment(np.load(self._path(name), mmap_mode="r"))
+        self._segment_files = list(segment_files)
+
+        with self._path(self._records_file).open("rb") as records:
+            data = records.read(self._manifest.get("records_bytes", -1))
+        for line in data.splitlines():
+            record = json.loads(line)
+            if "dead" in record:
+                self._forget_row(record["dead"])
+            else:
+                self._append_record(record["id"], record["text"], record["metadata"], record["alive"])
+        self._persisted_rows = len(self._ids)
+        self._records_bytes = len(data)
+
+    def _append_record(self, node_id: str, text: str, metadata: Dict[str, Any], alive: bool = True) -> int:
+        row = len(self._ids)
+        self._ids.append(node_id)
+        self._texts.append(text)
+        self._metadata.append(metadata)
+        self._alive.append(alive)
+        if alive:
+            self._row_of[node_id] = row
+        self._partitions[metadata.get(self.partition_key)].append(row)
+        return row
+
+    def _forget_row(self, row: int) -> None:
+        self._alive[row] = False
+        if self._row_of.get(self._ids[row]) == row:
+            del self._row_of[self._ids[row]]
+        if row < self._persisted_rows:
+            self._dead_rows.append(row)
+
+    def _bump(self, partition_values) -> None:
+        versions = self._manifest["partition_versions"]
+        for value in partition_values:
+            key = str(value)
+            versions[key] = versions.get(key, 0) + 1
+        self._dirty = True
+
+    def _add_segment(self, vectors: np.ndarray) -> None:
+        start = self._segment_starts[-1] + len(self._segments[-1]) if self._segments else 0
+        self._segments.append(vectors)
+        self._segment_starts.append(start)
+
+    def _seal_pending(self) -> None:
+        if self._pending:
+            self._add_segment(np.vstack(self._pending).astype(np.float32, copy=False))
+            self._pending = []
+
+    def _dim(self) -> int:
+        if self._segments:
+            return int(self._segments[0].shape[1])
+        return self._manifest.get("embedding_dim") or 1
+
+    def _snapshot(self) -> Tuple[List[np.ndarray], List[int], int]:
+        self._seal_pending()
+        return list(self._segments), list(self._segment_starts), self._dim()
+
+    @staticmethod
+    def _gather(segments: List[np.ndarray], starts: List[int], dim: int, rows) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.empty((len(rows), dim), dtype=np.float32)
+        if not len(rows):
+            return vectors
+        segment_of = np.searchsorted(starts, rows, side="right") - 1
+        for segment in np.unique(segment_of):
+            mask = segment_of == segment
+            vectors[mask] = segments[segment][rows[mask] - starts[segment]]
+        return vectors
+
+    def _take(self, rows) -> np.ndarray:
+        return self._gather(*self._snapshot(), rows)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        with self._lock:
+            touched = set()
+            for node in nodes:
+                previous = self._row_of.get(node.node_id)
+                if previous is not None:
+                    self._forget_row(previous)
+                metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=False)
+                self._append_record(
+                    node.node_id,
+                    node.get_content(metadata_mode=MetadataMode.NONE),
+                    metadata
+                )
+                self._pending.append(self._normalize(node.get_embedding())[None, :])
+                touched.add(metadata.get(self.partition_key))
+            self._bump(touched)
+            return [node.node_id for node in nodes]
+
+    def _kill_rows(self, rows: List[int]) -> None:
+        touched = set()
+        for row in rows:
+            if self._alive[row]:
+                self._forget_row(row)
+                touched.add(self._metadata[row].get(self.partition_key))
+        if touched:
+            self._bump(touched)
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        with self._lock:
+            self._kill_rows([
+                row for row, metadata in enumerate(self._metadata)
+                if metadata.get("ref_doc_id") == ref_doc_id
+            ])
+
+    def delete_nodes(
+        self,
+        node_ids: Optional[List[str]] = None,
+        filters: Optional[MetadataFilters] = None,
+        **delete_kwargs: Any
+    ) -> None:
+        if node_ids is None and (filters is None or not filters.filters):
+            raise ValueError("delete_nodes needs node_ids or filters; use clear() to delete everything")
+        with self._lock:
+            if node_ids is not None:
+                rows = [self._row_of[node_id] for node_id in node_ids if node_id in self._row_of]
+                if filters is not None:
+                    rows = self._filter_rows(rows, filters)
+            else:
+                rows, residual = self._candidate_rows(filters)
+                rows = self._filter_rows(rows, residual)
+            self._kill_rows(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._kill_rows(list(range(len(self._ids))))
+
+    def get_node_ids(self, filters: Optional[MetadataFilters] = None) -> List[str]:
+        with self._lock:
+            rows, residual = self._candidate_rows(filters)
+            return [self._ids[row] for row in self._filter_rows(rows, residual)]
+
+    def _split_filters(self, filters: Optional[MetadataFilters]) -> Tuple[Any, Optional[MetadataFilters]]:
+        if filters is None or not filters.filters:
+            return None, None
+        if filters.condition not in (None, FilterCondition.AND):
+            return None, filters
+        partition_value = None
+        residual = []
+        for item in filters.filters:
+            if (
+                partition_value is None
+                and isinstance(item, MetadataFilter)
+                and item.key == self.partition_key
+                and item.operator == FilterOperator.EQ
+            ):
+                partition_value = item.value
+            else:
+                residual.append(item)
+        if partition_value is None:
+            return None, filters
+        return partition_value, MetadataFilters(filters=residual) if residual else None
+
+    def _candidate_rows(self, filters: Optional[MetadataFilters]) -> Tuple[List[int], Optional[MetadataFilters]]:
+        partition_value, residual = self._split_filters(filters)
+        if partition_value is None:
+            rows = range(len(self._ids))
+        else:
+            rows = self._partitions.get(partition_value, [])
+        alive = self._alive
+        return [row for row in rows if alive[row]], residual
+
+    def _filter_rows(self, rows: List[int], filters: Optional[MetadataFilters]) -> List[int]:
+        if filters is None or not filters.filters:
+            return rows
+        metadata = self._metadata
+        matches = build_metadata_filter_fn(lambda row: metadata[row], filters)
+        return [row for row in rows if matches(row)]
+
+    def _graph_path(self, partition_value: Any) -> Path:
+        digest = hashlib.sha1(str(partition_value).encode("utf-8")).hexdigest()
+        return self._path(GRAPHS_DIR) / f"{digest}.bin"
+
+    def _graph_stamp(self, partition_value: Any) -> Tuple[int, int]:
+        return (
+            self._manifest["epoch"],
+            self._manifest["partition_versions"].get(str(partition_value), 0)
+        )
+
+    def _get_graph(self, partition_value: Any, rows: List[int]):
+        try:
+            import hnswlib
+        except ImportError:
+            return None
+
+        stamp = self._graph_stamp(partition_value)
+        cached = self._graphs.get(partition_value)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        graph_path = self._graph_path(partition_value)
+        stamp_path = graph_path.with_suffix(".json")
+        graph = hnswlib.Index(space="ip", dim=self._dim())
+        if not self._dirty and stamp_path.exists() and json.loads(stamp_path.read_text()) == list(stamp):
+            graph.load_index(str(graph_path), max_elements=len(rows))
+        else:
+            graph.init_index(max_elements=len(rows), ef_construction=self.hnsw_ef_construction, M=self.hnsw_m)
+            graph.add_items(self._take(rows), np.asarray(rows))
+            if not self._dirty:
+                graph_path.parent.mkdir(parents=True, exist_ok=True)
+                graph.save_index(str(graph_path))
+                stamp_path.write_text(json.dumps(list(stamp)))
+        self._graphs[partition_value] = (stamp, graph)
+        return graph
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.query_embedding is None:
+            raise ValueError("LocalVectorStore requires a query embedding")
+        query_vector = self._normalize(query.query_embedding)
+
+        with self._lock:
+            partition_value, residual = self._split_filters(query.filters)
+            rows, residual = self._candidate_rows(query.filters)
+            rows = self._filter_rows(rows, residual)
+            if query.node_ids:
+                wanted = set(query.node_ids)
+                rows = [row for row in rows if self._ids[row] in wanted]
+            top_k = min(query.similarity_top_k, len(rows))
+            if top_k == 0:
+                return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+            graph = None
+            if len(rows) > self.hnsw_threshold and partition_value is not None and residual is None and not query.node_ids:
+                graph = self._get_graph(partition_value, rows)
+            segments, starts, dim = self._snapshot()
+            ids, texts, metadata, alive = self._ids, self._texts, self._metadata, self._alive
+
+        if graph is not None:
+            graph.set_ef(max(self.hnsw_ef, top_k * 2))
+            labels, distances = graph.knn_query(query_vector, k=min(top_k * 2, len(rows)))
+            ranked = [
+                (int(label), 1.0 - float(distance))
+                for label, distance in zip(labels[0], distances[0])
+                if alive[int(label)]
+            ][:top_k]
+        else:
+            row_array = np.asarray(rows)
+            scores = self._gather(segments, starts, dim, row_array) @ query_vector
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            best = best[np.argsort(-scores[best])]
+            ranked = [(int(row_array[i]), float(scores[i])) for i in best]
+
+        nodes = []
+        vectors = self._gather(segments, starts, dim, [row for row, _ in ranked])
+        for (row, _), vector in zip(ranked, vectors):
+            node = metadata_dict_to_node(metadata[row], text=texts[row])
+            node.embedding = vector.tolist()
+            nodes.append(node)
+        return VectorStoreQueryResult(
+            nodes=nodes,
+            similarities=[score for _, score in ranked],
+            ids=[ids[row] for row, _ in ranked]
+        )
+
+    def _compact(self) -> None:
+        keep = [row for row, alive in enumerate(self._alive) if alive]
+        vectors = self._take(keep)
+        ids, texts, metadata = self._ids, self._texts, self._metadata
+        obsolete = self._obsolete_files + self._segment_files
+        if self._persisted_rows:
+            obsolete.append(self._records_file)
+        self._manifest["epoch"] += 1
+        self._reset()
+        self._obsolete_files = obsolete
+        for row in keep:
+            self._append_record(ids[row], texts[row], metadata[row])
+        if keep:
+            self._pending.append(vectors)
+        self._graphs.clear()
+        graphs_dir = self._path(GRAPHS_DIR)
+        if graphs_dir.exists():
+            for graph_file in graphs_dir.iterdir():
+                graph_file.unlink()
+
+    def _write_segment(self) -> None:
+        self._seal_pending()
+        unsaved = self._segments[len(self._segment_files):]
+        if not unsaved:
+            return
+        vectors = np.vstack(unsaved) if len(unsaved) > 1 else unsaved[0]
+        name = f"{SEGMENTS_DIR}/{self._manifest['epoch']:06d}-{len(self._segment_files):06d}.npy"
+        self._path(SEGMENTS_DIR).mkdir(parents=True, exist_ok=True)
+        with self._path(name).open("wb") as segment_file:
+            np.save(segment_file, vectors)
+        del self._segments[len(self._segment_files):]
+        del self._segment_starts[len(self._segment_files):]
+        self._add_segment(np.load(self._path(name), mmap_mode="r"))
+        self._segment_files.append(name)
+
+    def _write_records(self) -> None:
+        lines = [
+            json.dumps({"id": node_id, "text": text, "metadata": metadata, "alive": alive}) + "\n"
+            for node_id, text, metadata, alive in zip(
+                self._ids[self._persisted_rows:],
+                self._texts[self._persisted_rows:],
+                self._metadata[self._persisted_rows:],
+                self._alive[self._persisted_rows:]
+            )
+        ]
+        lines.extend(json.dumps({"dead": row}) + "\n" for row in self._dead_rows)
+        data = "".join(lines).encode("utf-8")
+        if self._persisted_rows == 0:
+            tmp_records = self._path(self._records_file + ".tmp")
+            tmp_records.write_bytes(data)
+            os.replace(tmp_records, self._path(self._records_file))
+            self._records_bytes = len(data)
+        else:
+            with self._path(self._records_file).open("r+b") as records:
+                records.truncate(self._records_bytes)
+                records.seek(self._records_bytes)
+                records.write(data)
+            self._records_bytes += len(data)
+        self._persisted_rows = len(self._ids)
+        self._dead_rows = []
+
+    def persist(self, persist_path: Optional[str] = None, fs: Any = None) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            dead = self._alive.count(False)
+            if self._ids and (
+                dead / len(self._ids) > COMPACT_DEAD_RATIO
+                or len(self._segment_files) >= COMPACT_MAX_SEGMENTS
+            ):
+                self._compact()
+
+            Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
+            self._write_segment()
+            self._write_records()
+
+            self._manifest["count"] = len(self._ids)
+            self._manifest["segments"] = self._segment_files
+            self._manifest["records"] = self._records_file
+            self._manifest["records_bytes"] = self._records_bytes
+            if self._segments:
+                self._manifest["embedding_dim"] = self._dim()
+            tmp_manifest = self._path(MANIFEST_FILE + ".tmp")
+            tmp_manifest.write_text(json.dumps(self._manifest))
+            os.replace(tmp_manifest, self._path(MANIFEST_FILE))
+
+            for name in self._obsolete_files:
+                self._path(name).unlink(missing_ok=True)
+            self._obsolete_files = []
+            self._dirty = False
@@ -1,21 +1,43 @@
 import streamlit as st
 from pathlib import Path
+import shutil
 import tempfile
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
+from src.backend.core.repositories.session_repository import (
+    STATUS_FAILED,
+    STATUS_PROCESSING,
+    STATUS_READY
+)
 from src.backend.core.services.chat_manager import ChatManager
-
-ALLOWED_FILE_TYPES = ["txt", "pdf", "py", "js", "java", "cpp", "h", "c", "cs"]
+from src.backend.core.services.llm_usage import LLMUsage
+from src.backend.core.services.query_engine_service import RETRIEVAL_HYBRID, RETRIEVAL_VECTOR
+from src.backend.core.services.service_container import get_container
+from src.backend.core.services.tracing import PIPELINE_QUERY, Trace
+from src.utils.config import COPY_BUFFER_BYTES, MAX_UPLOAD_BYTES, TRACE_DEBUG_PANEL, UPLOAD_FILE_TYPES
 
 class StreamlitUI:
     def __init__(self):
-        self.chat_manager = ChatManager()
+        container = get_container()
+        self.chat_manager = ChatManager(
+            mongo_client=container.get("mongo_client"),
+            rag_service=container.get("rag_service"),
+            ingestion_worker=container.get("ingestion_worker"),
+            async_mongo_client=container.get("async_mongo_client"),
+            history_writer=container.get("chat_history_writer"),
+            session_cache=container.get("session_cache")
+        )
         self._initialize_session_state()
         
     def _initialize_session_state(self):
         if "messages" not in st.session_state:
             st.session_state.messages = []
+        if "history_before" not in st.session_state:
+            st.session_state.history_before = None
+        if "session_cursors" not in st.session_state:
+            st.session_state.session_cursors = [None]
+            st.session_state.session_list_search = ""
         if "current_session_id" not in st.session_state:
             st.session_state.current_session_id = None
         if "show_file_uploader" not in st.session_state:
@@ -32,22 +54,41 @@ class StreamlitUI:
         self._render_session_list()
         st.sidebar.divider()
         self._render_current_session_info()
+        st.sidebar.toggle(
+            "Show timing details",
+            value=TRACE_DEBUG_PANEL,
+            key="show_timing",
+            help="Shows where the time went for each answer: session lookup, retrieval, LLM calls and more."
+        )
         
     def _reset_session(self):
         st.session_state.show_file_uploader = True
         st.session_state.current_session_id = None
         st.session_state.messages = []
+        st.session_state.history_before = None
         st.rerun()
         
     def _render_session_list(self):
-        sessions = self.chat_manager.get_all_sessions()
+        search = st.sidebar.text_input("Search files", key="session_search", placeholder="Filename")
+        if search != st.session_state.session_list_search:
+            st.session_state.session_list_search = search
+            st.session_state.session_cursors = [None]
+            
+        page = self.chat_manager.list_sessions(search=search, after=st.session_state.session_cursors[-1])
+        sessions = page["sessions"]
         if not sessions:
-            st.sidebar.info("No previous sessions found")
+            st.sidebar.info("No matching sessions found" if search else "No previous sessions found")
             return
             
+        st.sidebar.caption(f"{page['total']} session(s)")
         for session in sessions:
             session_time = session["last_accessed"].strftime("%Y-%m-%d %H:%M")
             session_title = f"{session['filename']} ({session_time})"
+            status = session.get("status", STATUS_READY)
+            if status == STATUS_PROCESSING:
+                session_title = f"⏳ {session_title} ({session.get('processed_chunks', 0)} chunks)"
+            elif status == STATUS_FAILED:
+                session_title = f"⚠️ {session_title}"
             
             if st.sidebar.button(
                 session_title,
@@ -55,11 +96,24 @@ class StreamlitUI:
                 help=f"Messages: {session['message_count']}"
             ):
                 self._load_session(session["session_id"])
+        self._render_session_pager(page)
+                
+    def _render_session_pager(self, page: Dict[str, Any]):
+        cursors = st.session_state.session_cursors
+        newer_column, older_column = st.sidebar.columns(2)
+        if len(cursors) > 1 and newer_column.button("← Newer", key="sessions_newer"):
+            cursors.pop()
+            st.rerun()
+        if page["after"] and older_column.button("Older →", key="sessions_older"):
+            cursors.append(page["after"])
+            st.rerun()
                 
     def _load_session(self, session_id: str):
         if self.chat_manager.load_session(session_id):
             st.session_state.current_session_id = session_id
-            st.session_state.messages = self.chat_manager.get_chat_history_for_session(session_id)
+            history = self.chat_manager.get_chat_history_for_session(session_id)
+            st.session_state.messages = history["messages"]
+            st.session_state.history_before = history["before"]
             st.session_state.show_file_uploader = False
             st.rerun()
         
@@ -69,15 +123,57 @@ class StreamlitUI:
             session = self.chat_manager.get_session(current_session_id)
             if session:
                 st.sidebar.markdown("### Current Session")
-                st.sidebar.markdown(f"**File:** {session['filename']}")
+                self._render_session_documents(session)
                 st.sidebar.markdown(f"**Created:** {session['created_at'].strftime('%Y-%m-%d %H:%M')}")
                 st.sidebar.markdown(f"**Messages:** {session['message_count']}")
+                self._render_retrieval_mode(session)
+                self._render_document_uploader(current_session_id)
+                
+    def _render_session_documents(self, session: Dict[str, Any]):
+        documents = ChatManager.get_session_documents(session)
+        st.sidebar.markdown("**Files:**")
+        for document in documents:
+            name_column, remove_column = st.sidebar.columns([5, 1])
+            name_column.markdown(f"📄 {document['filename']}")
+            if len(documents) > 1 and remove_column.button(
+                "✖",
+                key=f"remove_{session['session_id']}_{document['filename']}",
+                help="Remove this file from the session"
+            ):
+                self.chat_manager.remove_session_file(session["session_id"], document["filename"])
+                st.rerun()
+                
+    def _render_retrieval_mode(self, session: Dict[str, Any]):
+        current_mode = ChatManager.get_retrieval_mode(session)
+        hybrid = st.sidebar.toggle(
+            "Hybrid search (keywords + embeddings)",
+            value=current_mode == RETRIEVAL_HYBRID,
+            key=f"hybrid_{session['session_id']}",
+            help="Combines exact keyword matches with semantic search. Useful for code identifiers."
+        )
+        selected_mode = RETRIEVAL_HYBRID if hybrid else RETRIEVAL_VECTOR
+        if selected_mode != current_mode:
+            self.chat_manager.set_retrieval_mode(session["session_id"], selected_mode)
+                
+    def _render_document_uploader(self, session_id: str):
+        new_file = st.sidebar.file_uploader(
+            "Add a file or upload a revised version",
+            type=UPLOAD_FILE_TYPES,
+            key=f"add_file_{session_id}",
+            help="Files with the same name are updated in place; only changed parts are re-embedded"
+        )
+        if new_file and new_file.file_id != st.session_state.get("last_added_file_id"):
+            st.session_state.last_added_file_id = new_file.file_id
+            tmp_path = self._save_upload(new_file)
+            if tmp_path:
+                self.chat_manager.add_session_file(session_id, new_file.name, tmp_path)
+                st.rerun()
                 
     def render_file_uploader(self):
         if st.session_state.show_file_uploader:
             uploaded_file = st.file_uploader(
                 "Upload a file to start chatting",
-                type=ALLOWED_FILE_TYPES,
+                type=UPLOAD_FILE_TYPES,
                 key="file_uploader"
             )
             
@@ -88,26 +184,32 @@ class StreamlitUI:
                 if not current_session_id or uploaded_file.name != last_file_name:
                     self._process_uploaded_file(uploaded_file)
                     
+    def _save_upload(self, uploaded_file) -> Optional[str]:
+        if uploaded_file.size > MAX_UPLOAD_BYTES:
+            st.error(f"File size exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit")
+            return None
+            
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded_file.name).suffix) as tmp_file:
+            shutil.copyfileobj(uploaded_file, tmp_file, COPY_BUFFER_BYTES)
+            return tmp_file.name
+            
     def _process_uploaded_file(self, uploaded_file):
-        with st.spinner("Processing file..."):
+        with st.spinner("Uploading file..."):
             try:
-                if len(uploaded_file.getvalue()) > 10 * 1024 * 1024:
-                    st.error("File size exceeds 10MB limit")
+                tmp_path = self._save_upload(uploaded_file)
+                if not tmp_path:
                     return
-                    
-                with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded_file.name).suffix) as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_path = tmp_file.name
             
-                session_id = self.chat_manager.create_session(uploaded_file.name, tmp_path)
+                session_id = self.chat_manager.start_session(uploaded_file.name, tmp_path)
                 if not session_id:
                     raise ValueError("Failed to create session")
                     
                 st.session_state.current_session_id = session_id
                 st.session_state.show_file_uploader = False
                 st.session_state.messages = []
+                st.session_state.history_before = None
                 st.session_state.last_file_name = uploaded_file.name
-                st.success(f"File processed: {uploaded_file.name}")
                 st.rerun()
                 
             except Exception as e:
@@ -123,9 +225,28 @@ class StreamlitUI:
                 st.info("Please click '➕ New Session' to start a new chat or select an existing session.")
             return
             
+        session = self.chat_manager.get_session(current_session_id)
+        status = session.get("status", STATUS_READY) if session else STATUS_READY
+        if status == STATUS_PROCESSING:
+            self._render_processing_status(current_session_id)
+            return
+        if status == STATUS_FAILED:
+            st.error(f"Processing failed: {session.get('error')}")
+            return
+            
         self._render_chat_messages()
         self._handle_chat_input()
         
+    @st.fragment(run_every=2)
+    def _render_processing_status(self, session_id: str):
+        session = self.chat_manager.get_session(session_id)
+        if not session or session.get("status", STATUS_READY) != STATUS_PROCESSING:
+            st.rerun()
+        st.info(
+            f"⏳ Processing {session['filename']}: {session.get('processed_chunks', 0)} chunks embedded so far. "
+            "You can keep using other sessions meanwhile."
+        )
+        
     def _render_chat_messages(self):
         chat_container = st.container()
         with chat_container:
@@ -135,10 +256,23 @@ class StreamlitUI:
                 st.info("No messages yet. Start the conversation!")
                 return
                 
+            if st.session_state.history_before and st.button("Load earlier messages"):
+                self._load_earlier_messages()
+                
             for message in messages:
                 with st.chat_message(message["role"]):
                     st.markdown(message["content"])
-                    st.caption(f"_{message.get('timestamp', datetime.utcnow()).strftime('%H:%M:%S')}_")
+                    st.caption(self._format_caption(message))
+                    self._render_timing(message)
+                    
+    def _load_earlier_messages(self):
+        history = self.chat_manager.get_chat_history_for_session(
+            st.session_state.current_session_id,
+            before=st.session_state.history_before
+        )
+        st.session_state.messages = history["messages"] + st.session_state.messages
+        st.session_state.history_before = history["before"]
+        st.rerun()
                     
     def _handle_chat_input(self):
         if prompt := st.chat_input("Ask a question about the code"):
@@ -158,25 +292,51 @@ class StreamlitUI:
             
     def _get_ai_response(self, prompt: str):
         with st.chat_message("assistant"):
-            with st.spinner("🤔 Thinking..."):
-                try:
-                    current_session_id = st.session_state.current_session_id
-                    response = self.chat_manager.query(current_session_id, prompt)
-                    st.markdown(response)
-                    self._add_assistant_message(response)
-                except Exception as e:
-                    error_message = f"Error: {str(e)}"
-                    st.error(error_message)
-                    self._add_assistant_message(error_message)
+            try:
+                current_session_id = st.session_state.current_session_id
+                usage = LLMUsage()
+                trace = Trace(PIPELINE_QUERY)
+                response = st.write_stream(self.chat_manager.stream_query(current_session_id, prompt, usage, trace))
+                self._add_assistant_message(response, {"usage": usage.to_dict(), "timing": trace.to_dict()})
+            except Exception as e:
+                error_message = f"Error: {str(e)}"
+                st.error(error_message)
+                self._add_assistant_message(error_message)
                     
-    def _add_assistant_message(self, content: str):
+    def _add_assistant_message(self, content: str, metadata: Optional[Dict[str, Any]] = None):
         message = {
             "role": "assistant",
             "content": content,
-            "timestamp": datetime.utcnow()
+            "timestamp": datetime.utcnow(),
+            "metadata": metadata or {}
         }
         st.session_state.messages.append(message)
-        st.caption(f"_{message['timestamp'].strftime('%H:%M:%S')}_")
+        st.caption(self._format_caption(message))
+        self._render_timing(message)
+        
+    @staticmethod
+    def _format_caption(message: Dict[str, Any]) -> str:
+        caption = f"_{message.get('timestamp', datetime.utcnow()).strftime('%H:%M:%S')}_"
+        usage = (message.get("metadata") or {}).get("usage")
+        if usage and usage.get("cached_answer"):
+            caption += " · cached answer"
+        elif usage and usage["llm_calls"]:
+            caption += f" · {usage['llm_calls']} LLM call(s), {usage['prompt_tokens']:,} prompt tokens"
+        timing = (message.get("metadata") or {}).get("timing") or {}
+        if timing.get("context_tokens_saved"):
+            caption += f" · {timing['context_tokens_saved']:,} context tokens saved"
+        return caption
+        
+    @staticmethod
+    def _render_timing(message: Dict[str, Any]):
+        timing = (message.get("metadata") or {}).get("timing")
+        if not timing or not st.session_state.get("show_timing"):
+            return
+        with st.expander(f"⏱️ {timing['total_ms']:,.0f} ms"):
+            st.table([{"stage": stage, "ms": ms} for stage, ms in timing["stages_ms"].items()])
+            details = {key: value for key, value in timing.items() if key not in ("total_ms", "stages_ms")}
+            if details:
+                st.caption(" · ".join(f"{key}: {value}" for key, value in details.items()))
         
     def run(self):
         self.render_header()
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sliding: bool = True
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self.sliding = sliding
+        self._entries: "OrderedDict[Hashable, Tuple[V, float]]" = OrderedDict()
+        self._building: Dict[Hashable, Future] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def _is_expired(self, last_access: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - last_access > self.ttl_seconds
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, last_access = entry
+            now = self._clock()
+            if self._is_expired(last_access, now):
+                del self._entries[key]
+                return None
+            if self.sliding:
+                self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (value, self._clock())
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], V]) -> V:
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            building = self._building.get(key)
+            if building is None:
+                future: Future = Future()
+                self._building[key] = future
+        if building is not None:
+            return building.result()
+        try:
+            value = factory()
+        except BaseException as e:
+            with self._lock:
+                if self._building.get(key) is future:
+                    del self._building[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self._building.get(key) is future:
+                del self._building[key]
+                self.put(key, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._building.pop(key, None)
+
+    def invalidate_where(self, match: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if match(key)]:
+                del self._entries[key]
+            for key in [key for key in self._building if match(key)]:
+                del self._building[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._building.clear()
+
+    def _evict(self) -> None:
+        now = self._clock()
+        expired = [key for key, (_, last_access) in self._entries.items() if self._is_expired(last_access, now)]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -1,7 +1,7 @@
 from pathlib import Path
 import os
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -24,23 +24,248 @@ class OllamaConfig:
     host: str = "http://localhost:11434"
     mistral_model: str = "mistral"
     code_model: str = "codellama"
+    embedding_model: str = "nomic-embed-text"
+    context_window: int = 8192
+    max_concurrency_per_model: int = 2
+    model_concurrency: Dict[str, int] = field(default_factory=dict)
+    max_loaded_models: int = 1
+    max_affinity_wait: float = 2.0
+    keep_alive_seconds: float = 1800.0
+    warm_up: bool = True
+    pool_connections: int = 16
+    request_timeout: float = 300.0
+    min_read_timeout: float = 30.0
+    timeout_factor: float = 4.0
+
+@dataclass
+class MongoConfig:
+    uri: str = "mongodb://localhost:27017/"
+    db_name: str = "rag_chat_db"
+
+@dataclass
+class SessionListConfig:
+    page_size: int = 20
+    cache_size: int = 256
+    cache_ttl_seconds: float = 2.0
+
+@dataclass
+class ChatHistoryConfig:
+    bucket_size: int = 100
+    history_window: int = 50
+    flush_interval: float = 0.5
+    max_pending: int = 256
+    max_buffered: int = 10000
+    max_retry_interval: float = 30.0
 
 @dataclass
 class FileConfig:
     supported_types: List[str] = field(default_factory=lambda: ["txt", "pdf", "doc", "docx"])
+    upload_types: List[str] = field(default_factory=lambda: ["txt", "pdf", "py", "js", "java", "cpp", "h", "c", "cs"])
+    max_upload_bytes: int = 500 * 1024 * 1024
+    copy_buffer_bytes: int = 1024 * 1024
+    text_block_chars: int = 256 * 1024
+
+@dataclass
+class ChunkConfig:
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+
+@dataclass
+class CodeChunkConfig:
+    chunk_lines: int = 40
+    chunk_lines_overlap: int = 15
+    max_chars: int = 1500
+
+@dataclass
+class ChunkingConfig:
+    prose: ChunkConfig = field(default_factory=ChunkConfig)
+    code: CodeChunkConfig = field(default_factory=CodeChunkConfig)
+    prose_overrides: Dict[str, ChunkConfig] = field(default_factory=lambda: {
+        ".pdf": ChunkConfig(chunk_size=1024, chunk_overlap=128),
+    })
+    code_overrides: Dict[str, CodeChunkConfig] = field(default_factory=dict)
+    code_languages: Dict[str, str] = field(default_factory=lambda: {
+        ".py": "python",
+        ".js": "javascript",
+        ".java": "java",
+        ".cpp": "cpp",
+        ".h": "cpp",
+        ".c": "c",
+        ".cs": "csharp",
+    })
+
+@dataclass
+class VectorStoreConfig:
+    collection_prefix: str = "documents"
+    backend: str = "chroma"
+    chroma_path: str = "./chroma_db"
+    chroma_host: Optional[str] = None
+    chroma_port: int = 8000
+    local_path: str = "./vector_index"
+    hnsw_threshold: int = 5000
+    bm25_path: str = "./bm25_index"
+
+@dataclass
+class RetrievalConfig:
+    default_mode: str = "hybrid"
+    vector_top_k: int = 5
+    hybrid_top_k: int = 3
+    candidate_k: int = 10
+    rrf_k: int = 60
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
 
+@dataclass
+class SynthesisConfig:
+    mode: str = "adaptive"
+    context_budget: Optional[int] = None
+
+@dataclass
+class ContextCompressionConfig:
+    enabled: bool = True
+    token_budget: int = 1536
+    min_overlap_chars: int = 32
+    duplicate_threshold: float = 0.95
+
+@dataclass
+class IngestionConfig:
+    embed_batch_size: int = 32
+    max_concurrency: int = 4
+    max_pending_batches: int = 8
+    background_workers: int = 2
+    stale_after_seconds: float = 120.0
+    heartbeat_seconds: float = 30.0
+    pdf_parse_workers: int = 4
+    pdf_pages_per_task: int = 8
+    pdf_parallel_min_pages: int = 24
+
+@dataclass
+class EmbeddingCacheConfig:
+    enabled: bool = True
+    filename: str = "embedding_cache.sqlite3"
+    max_bytes: int = 512 * 1024 * 1024
+
+@dataclass
+class IndexCacheConfig:
+    max_size: int = 32
+    ttl_seconds: float = 1800.0
+
+@dataclass
+class AnswerCacheConfig:
+    enabled: bool = True
+    max_entries: int = 2048
+    similarity_threshold: float = 0.95
+    ttl_seconds: float = 24 * 3600.0
+
+@dataclass
+class TracingConfig:
+    debug_panel: bool = False
+    histogram_buckets: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+@dataclass
+class ApiConfig:
+    host: str = "0.0.0.0"
+    port: int = 8080
+    workers: int = 4
 
 @dataclass
 class AppConfig:
     paths: PathConfig = field(default_factory=PathConfig)
     ollama: OllamaConfig = field(default_factory=OllamaConfig)
+    mongo: MongoConfig = field(default_factory=MongoConfig)
+    chat_history: ChatHistoryConfig = field(default_factory=ChatHistoryConfig)
+    session_list: SessionListConfig = field(default_factory=SessionListConfig)
     files: FileConfig = field(default_factory=FileConfig)
+    chunking: ChunkingConfig = field(default_factory=ChunkingConfig)
+    vector_store: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    retrieval: RetrievalConfig = field(default_factory=RetrievalConfig)
+    synthesis: SynthesisConfig = field(default_factory=SynthesisConfig)
+    context_compression: ContextCompressionConfig = field(default_factory=ContextCompressionConfig)
+    ingestion: IngestionConfig = field(default_factory=IngestionConfig)
+    embedding_cache: EmbeddingCacheConfig = field(default_factory=EmbeddingCacheConfig)
+    index_cache: IndexCacheConfig = field(default_factory=IndexCacheConfig)
+    answer_cache: AnswerCacheConfig = field(default_factory=AnswerCacheConfig)
+    api: ApiConfig = field(default_factory=ApiConfig)
+    tracing: TracingConfig = field(default_factory=TracingConfig)
 
 config = AppConfig()
 
 OLLAMA_HOST = config.ollama.host
 MISTRAL_MODEL = config.ollama.mistral_model
 CODE_MODEL = config.ollama.code_model
+EMBEDDING_MODEL = config.ollama.embedding_model
+LLM_CONTEXT_WINDOW = config.ollama.context_window
+OLLAMA_MAX_CONCURRENCY = config.ollama.max_concurrency_per_model
+OLLAMA_MODEL_CONCURRENCY = config.ollama.model_concurrency
+OLLAMA_MAX_LOADED_MODELS = config.ollama.max_loaded_models
+OLLAMA_MAX_AFFINITY_WAIT = config.ollama.max_affinity_wait
+OLLAMA_KEEP_ALIVE = config.ollama.keep_alive_seconds
+OLLAMA_WARM_UP = config.ollama.warm_up
+OLLAMA_POOL_CONNECTIONS = config.ollama.pool_connections
+OLLAMA_REQUEST_TIMEOUT = config.ollama.request_timeout
+OLLAMA_MIN_READ_TIMEOUT = config.ollama.min_read_timeout
+OLLAMA_TIMEOUT_FACTOR = config.ollama.timeout_factor
+MONGO_URI = config.mongo.uri
+MONGO_DB_NAME = config.mongo.db_name
+CHAT_BUCKET_SIZE = config.chat_history.bucket_size
+CHAT_HISTORY_WINDOW = config.chat_history.history_window
+CHAT_FLUSH_INTERVAL = config.chat_history.flush_interval
+CHAT_MAX_PENDING = config.chat_history.max_pending
+CHAT_MAX_BUFFERED = config.chat_history.max_buffered
+CHAT_MAX_RETRY_INTERVAL = config.chat_history.max_retry_interval
+SESSION_PAGE_SIZE = config.session_list.page_size
+SESSION_CACHE_SIZE = config.session_list.cache_size
+SESSION_CACHE_TTL = config.session_list.cache_ttl_seconds
 SUPPORTED_FILE_TYPES = config.files.supported_types
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 200
+UPLOAD_FILE_TYPES = config.files.upload_types
+UPLOADS_DIR = config.paths.uploads_dir
+MAX_UPLOAD_BYTES = config.files.max_upload_bytes
+COPY_BUFFER_BYTES = config.files.copy_buffer_bytes
+TEXT_BLOCK_CHARS = config.files.text_block_chars
+SHARED_COLLECTION_PREFIX = config.vector_store.collection_prefix
+VECTOR_BACKEND = config.vector_store.backend
+CHROMA_DB_PATH = config.vector_store.chroma_path
+CHROMA_HOST = config.vector_store.chroma_host
+CHROMA_PORT = config.vector_store.chroma_port
+LOCAL_VECTOR_PATH = config.vector_store.local_path
+HNSW_THRESHOLD = config.vector_store.hnsw_threshold
+BM25_INDEX_PATH = config.vector_store.bm25_path
+BM25_K1 = config.retrieval.bm25_k1
+BM25_B = config.retrieval.bm25_b
+DEFAULT_RETRIEVAL_MODE = config.retrieval.default_mode
+VECTOR_TOP_K = config.retrieval.vector_top_k
+HYBRID_TOP_K = config.retrieval.hybrid_top_k
+HYBRID_CANDIDATE_K = config.retrieval.candidate_k
+RRF_K = config.retrieval.rrf_k
+SYNTHESIS_MODE = config.synthesis.mode
+SYNTHESIS_CONTEXT_BUDGET = config.synthesis.context_budget
+CONTEXT_COMPRESSION_ENABLED = config.context_compression.enabled
+CONTEXT_TOKEN_BUDGET = config.context_compression.token_budget
+CONTEXT_MIN_OVERLAP = config.context_compression.min_overlap_chars
+CONTEXT_DUPLICATE_THRESHOLD = config.context_compression.duplicate_threshold
+EMBED_BATCH_SIZE = config.ingestion.embed_batch_size
+EMBED_MAX_CONCURRENCY = config.ingestion.max_concurrency
+EMBED_MAX_PENDING_BATCHES = config.ingestion.max_pending_batches
+INGESTION_WORKERS = config.ingestion.background_workers
+INGESTION_STALE_AFTER = config.ingestion.stale_after_seconds
+INGESTION_HEARTBEAT = config.ingestion.heartbeat_seconds
+PDF_PARSE_WORKERS = config.ingestion.pdf_parse_workers
+PDF_PAGES_PER_TASK = config.ingestion.pdf_pages_per_task
+PDF_PARALLEL_MIN_PAGES = config.ingestion.pdf_parallel_min_pages
+EMBEDDING_CACHE_ENABLED = config.embedding_cache.enabled
+EMBEDDING_CACHE_PATH = config.paths.data_dir / config.embedding_cache.filename
+EMBEDDING_CACHE_MAX_BYTES = config.embedding_cache.max_bytes
+INDEX_CACHE_SIZE = config.index_cache.max_size
+INDEX_CACHE_TTL = config.index_cache.ttl_seconds
+ANSWER_CACHE_ENABLED = config.answer_cache.enabled
+ANSWER_CACHE_SIZE = config.answer_cache.max_entries
+ANSWER_CACHE_THRESHOLD = config.answer_cache.similarity_threshold
+ANSWER_CACHE_TTL = config.answer_cache.ttl_seconds
+CHUNKING = config.chunking
+CHUNK_SIZE = config.chunking.prose.chunk_size
+CHUNK_OVERLAP = config.chunking.prose.chunk_overlap
+API_HOST = config.api.host
+API_PORT = config.api.port
+API_WORKERS = config.api.workers
+TRACE_DEBUG_PANEL = config.tracing.debug_panel
+TRACE_HISTOGRAM_BUCKETS = config.tracing.histogram_buckets
@@ -0,0 +1,29 @@
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from src.backend.core.services.context_compressor import merge_adjacent
+from src.backend.core.services.rag_service import RAGService
+
+
+def chunk(node_id, text, start):
+    return NodeWithScore(
+        node=TextNode(
+            id_=node_id,
+            text=text,
+            metadata={"document_key": "doc"},
+            start_char_idx=start,
+            end_char_idx=start + len(text)
+        ),
+        score=1.0
+    )
+
+
+def test_merged_chunks_hash_differently_from_their_base_chunk():
+    first = chunk("a", "The parser reads tokens.", 0)
+    second = chunk("b", "The indexer stores them.", 25)
+
+    merged = merge_adjacent([first, second])
+
+    assert len(merged) == 1
+    assert merged[0].node.node_id == "a"
+    assert RAGService.context_hash(merged) != RAGService.context_hash([first])
+    assert RAGService.context_hash(merged) == RAGService.context_hash([second, first])
@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.cache import LRUCache
+
+
+def test_a_slow_build_does_not_block_other_keys():
+    cache: LRUCache[str] = LRUCache()
+    cache.put("warm", "cached")
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow_factory():
+        building.set()
+        assert release.wait(timeout=5)
+        return "built"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        cold = pool.submit(cache.get_or_create, "cold", slow_factory)
+        assert building.wait(timeout=5)
+        assert cache.get_or_create("warm", lambda: "rebuilt") == "cached"
+        release.set()
+        assert cold.result(timeout=5) == "built"
+
+
+def test_concurrent_callers_share_one_build():
+    cache: LRUCache[object] = LRUCache()
+    calls = []
+    release = threading.Event()
+
+    def factory():
+        calls.append(1)
+        assert release.wait(timeout=5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_create, "key", factory) for _ in range(4)]
+        release.set()
+        values = [future.result(timeout=5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_a_failed_build_reaches_waiters_and_is_not_cached():
+    cache: LRUCache[str] = LRUCache()
+    building = threading.Event()
+    release = threading.Event()
+
+    def failing_factory():
+        building.set()
+        assert release.wait(timeout=5)
+        raise RuntimeError("load failed")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        builder = pool.submit(cache.get_or_create, "key", failing_factory)
+        assert building.wait(timeout=5)
+        waiter = pool.submit(cache.get_or_create, "key", lambda: "unused")
+        release.set()
+        for future in (builder, waiter):
+            with pytest.raises(RuntimeError, match="load failed"):
+                future.result(timeout=5)
+
+    assert cache.get_or_create("key", lambda: "retried") == "retried"
+
+
+def test_invalidating_during_a_build_drops_the_stale_value():
+    cache: LRUCache[str] = LRUCache()
+
+    def factory():
+        cache.invalidate("key")
+        return "stale"
+
+    assert cache.get_or_create("key", factory) == "stale"
+    assert cache.get("key") is None
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+from src.backend.core.vector_stores.chroma_vector_backend import ChromaVectorBackend
+
+MODEL = "stub-embed"
+EMBEDDINGS = {
+    "a": [1.0, 0.0, 0.0],
+    "b": [0.0, 1.0, 0.0],
+    "c": [0.6, 0.8, 0.0]
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    backend = ChromaVectorBackend(db_path=str(tmp_path), host=None)
+    store = backend.get_store(MODEL, embedding_dim=3)
+    store.add([
+        TextNode(id_=node_id, text=f"chunk {node_id}", embedding=embedding, metadata={"session_id": "s"})
+        for node_id, embedding in EMBEDDINGS.items()
+    ])
+    yield store
+    backend.close()
+
+
+def assert_embeddings_attached(result):
+    assert result.ids
+    for node_id, node in zip(result.ids, result.nodes):
+        assert node.embedding == pytest.approx(EMBEDDINGS[node_id])
+
+
+def test_query_returns_node_embeddings(store):
+    result = store.query(VectorStoreQuery(query_embedding=[1.0, 0.1, 0.0], similarity_top_k=2))
+
+    assert result.ids == ["a", "c"]
+    assert_embeddings_attached(result)
+
+
+def test_async_query_returns_node_embeddings(store):
+    result = asyncio.run(store.aquery(VectorStoreQuery(query_embedding=[0.0, 1.0, 0.0], similarity_top_k=3)))
+
+    assert result.ids[0] == "b"
+    assert_embeddings_attached(result)
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.services.bm25_index import BM25IndexService
+from src.backend.core.services.llm_service import LLMService
+from src.backend.core.services.rag_service import RAGService
+from src.backend.core.services.vector_store_service import VectorStoreService
+from src.backend.core.vector_stores.local_vector_backend import LocalVectorBackend
+
+SESSIONS = 2
+REQUESTS = 16
+WORKERS = 4
+
+
+@pytest.fixture
+def rag_service(tmp_path):
+    with StubOllamaServer(first_token_latency=0.02, tokens_per_second=400) as server:
+        rag_service = RAGService(
+            llm_service=LLMService(host=server.url, embedding_model="stub-embed"),
+            vector_store_service=VectorStoreService(LocalVectorBackend(root_path=str(tmp_path / "vectors"))),
+            lexical_index_service=BM25IndexService(root_path=str(tmp_path / "bm25"))
+        )
+        rag_service.answer_cache = None
+        for i in range(SESSIONS):
+            path = tmp_path / f"session_{i}.txt"
+            path.write_text("\n\n".join(
+                f"Session {i} paragraph {j}: component{i} handles step {j} of the pipeline." for j in range(10)
+            ))
+            rag_service.process_file(path, f"session-{i}")
+        yield rag_service
+        rag_service.close()
+
+
+def test_concurrent_queries_keep_their_own_model_and_question(rag_service):
+    def run(index):
+        topic = "code" if index % 2 else "document"
+        question = f"request {index}: what does this {topic} say about step {index % 10}?"
+        session_id = f"session-{index % SESSIONS}"
+        expected_model = rag_service.llm_service.get_llm_for_query(question).model
+        if index % 4 < 2:
+            answer = "".join(rag_service.stream_query(session_id, question))
+        else:
+            answer = rag_service.query(session_id, question)
+        return question, expected_model, answer
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(run, range(REQUESTS)))
+
+    assert len({model for _, model, _ in results}) > 1
+    for question, expected_model, answer in results:
+        assert answer.startswith(f"[{expected_model}] {question}")
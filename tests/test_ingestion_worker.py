@@ -0,0 +1,140 @@
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.backend.core.repositories.session_repository import STATUS_FAILED, STATUS_PROCESSING
+from src.backend.core.services.ingestion_worker import IngestionWorker
+
+SESSION_ID = "session"
+
+
+class MemorySessionRepository:
+    def __init__(self):
+        self.sessions = {SESSION_ID: {"session_id": SESSION_ID, "status": STATUS_PROCESSING}}
+        self.heartbeats = []
+
+    def get_by_id(self, session_id):
+        return dict(self.sessions[session_id])
+
+    def update(self, session_id, data):
+        self.sessions[session_id].update(data)
+
+    def heartbeat(self, session_ids):
+        self.heartbeats.append(list(session_ids))
+
+    def update_status(self, session_id, status=None, progress=None, error=None, processed_chunks=None):
+        update = {"status": status, "progress": progress, "error": error, "processed_chunks": processed_chunks}
+        self.sessions[session_id].update({key: value for key, value in update.items() if value is not None})
+
+
+class RecordingRAGService:
+    def __init__(self, failing_files=(), duration=0.05):
+        self.failing_files = set(failing_files)
+        self.duration = duration
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def process_file(self, file_path, session_id, filename=None, on_progress=None, trace=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.duration)
+            if file_path in self.failing_files:
+                raise RuntimeError(f"could not index {file_path}")
+            trace.set(chunks=12, embedded=8, chunks_per_second=240.0)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def repo():
+    return MemorySessionRepository()
+
+
+def run_jobs(worker, file_paths):
+    futures = [worker.submit(SESSION_ID, file_path) for file_path in file_paths]
+    for future in futures:
+        future.exception(timeout=5)
+    worker.shutdown(wait=True)
+
+
+def test_jobs_for_one_session_run_one_at_a_time(repo):
+    rag_service = RecordingRAGService()
+    worker = IngestionWorker(repo, rag_service, max_workers=2)
+
+    run_jobs(worker, ["a.txt", "b.txt", "c.txt"])
+
+    assert rag_service.max_active == 1
+    assert repo.get_by_id(SESSION_ID)["status"] == "ready"
+    assert not worker.is_running(SESSION_ID)
+
+
+def test_a_later_job_does_not_hide_a_failed_one(repo):
+    worker = IngestionWorker(repo, RecordingRAGService(failing_files={"a.txt"}), max_workers=2)
+
+    run_jobs(worker, ["a.txt", "b.txt"])
+
+    session = repo.get_by_id(SESSION_ID)
+    assert session["status"] == STATUS_FAILED
+    assert session["error"] == "could not index a.txt"
+
+
+def processing_session(owner=None, age=0.0):
+    return {
+        "session_id": SESSION_ID,
+        "status": STATUS_PROCESSING,
+        "ingest_owner": owner,
+        "status_updated_at": datetime.utcnow() - timedelta(seconds=age)
+    }
+
+
+def dead_process_owner():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}"
+
+
+def test_heartbeat_covers_queued_and_running_jobs(repo):
+    worker = IngestionWorker(repo, RecordingRAGService(duration=0.3), max_workers=1, heartbeat_interval=0.05)
+
+    run_jobs(worker, ["a.txt"])
+
+    assert len(repo.heartbeats) > 2
+    assert all(session_ids == [SESSION_ID] for session_ids in repo.heartbeats)
+
+
+def test_sessions_owned_by_live_processes_are_not_interrupted(repo):
+    worker = IngestionWorker(repo, RecordingRAGService(), stale_after=60)
+    worker.shutdown()
+
+    assert not worker.is_interrupted(processing_session(owner="other-host:1", age=30))
+    assert not worker.is_interrupted(processing_session(owner=f"{socket.gethostname()}:1", age=30))
+    assert not worker.is_interrupted({**processing_session(owner=worker.owner_id, age=600), "status": "ready"})
+
+
+def test_sessions_whose_owner_is_gone_are_interrupted(repo):
+    worker = IngestionWorker(repo, RecordingRAGService(), stale_after=60)
+    worker.shutdown()
+
+    assert worker.is_interrupted(processing_session(owner=worker.owner_id))
+    assert worker.is_interrupted(processing_session(owner=dead_process_owner()))
+    assert worker.is_interrupted(processing_session(owner="other-host:1", age=120))
+    assert worker.is_interrupted(processing_session(age=120))
+
+
+def test_finished_jobs_record_ingest_throughput(repo):
+    run_jobs(IngestionWorker(repo, RecordingRAGService(), max_workers=1), ["a.txt"])
+
+    stats = repo.get_by_id(SESSION_ID)["ingest_stats"]
+    assert stats["chunks"] == 12
+    assert stats["embedded"] == 8
+    assert stats["chunks_per_second"] == 240.0
+    assert stats["total_ms"] >= 50
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.services.llm_service import LLMService
+
+
+@pytest.fixture
+def llm_service():
+    with StubOllamaServer() as server:
+        llm_service = LLMService(host=server.url, embedding_model="stub-embed")
+        yield llm_service
+        llm_service.close()
+
+
+def count_embed_calls(client, monkeypatch):
+    calls = []
+    embed = client.embed
+
+    def recording_embed(*args, **kwargs):
+        calls.append(kwargs["input"])
+        return embed(*args, **kwargs)
+
+    monkeypatch.setattr(client, "embed", recording_embed)
+    return calls
+
+
+def test_embeddings_use_the_scheduler_client(llm_service, monkeypatch):
+    calls = count_embed_calls(llm_service.scheduler.client, monkeypatch)
+
+    embeddings = llm_service.embedding_model.get_text_embedding_batch(["first chunk", "second chunk"])
+    query = llm_service.embedding_model.get_query_embedding("which chunk?")
+
+    assert len(embeddings) == 2
+    assert len(query) == len(embeddings[0])
+    assert len(calls) == 2
+
+
+def test_async_embeddings_use_the_scheduler_client(llm_service, monkeypatch):
+    calls = count_embed_calls(llm_service.scheduler.async_client, monkeypatch)
+
+    async def run():
+        embeddings = await llm_service.embedding_model.aget_text_embedding_batch(["first chunk", "second chunk"])
+        query = await llm_service.embedding_model.aget_query_embedding("which chunk?")
+        await llm_service.aclose()
+        return embeddings, query
+
+    embeddings, query = asyncio.run(run())
+
+    assert len(embeddings) == 2
+    assert len(query) == len(embeddings[0])
+    assert len(calls) == 2
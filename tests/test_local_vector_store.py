@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters, VectorStoreQuery
+
+from src.backend.core.vector_stores.local_vector_store import LocalVectorStore
+
+DIM = 8
+
+
+def make_nodes(session_id, count, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        TextNode(
+            id_=f"{session_id}-{seed}-{i}",
+            text=f"{session_id} chunk {i}",
+            metadata={"session_id": session_id},
+            embedding=rng.normal(size=DIM).tolist()
+        )
+        for i in range(count)
+    ]
+
+
+def session_query(session_id, embedding, top_k=3):
+    return VectorStoreQuery(
+        query_embedding=embedding,
+        similarity_top_k=top_k,
+        filters=MetadataFilters(filters=[MetadataFilter(key="session_id", value=session_id)])
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalVectorStore(tmp_path)
+    store.add(make_nodes("a", 50, seed=0))
+    store.persist()
+    return store
+
+
+def test_search_runs_outside_the_store_lock(store, monkeypatch):
+    searching = threading.Event()
+    lock_taken = threading.Event()
+    gather = LocalVectorStore._gather
+
+    def slow_gather(*args):
+        searching.set()
+        assert lock_taken.wait(timeout=5)
+        return gather(*args)
+
+    def take_lock():
+        searching.wait(timeout=5)
+        with store._lock:
+            lock_taken.set()
+
+    monkeypatch.setattr(LocalVectorStore, "_gather", staticmethod(slow_gather))
+    thread = threading.Thread(target=take_lock)
+    thread.start()
+    result = store.query(session_query("a", [1.0] * DIM))
+    thread.join()
+
+    assert lock_taken.is_set()
+    assert len(result.ids) == 3
+
+
+def test_queries_stay_consistent_while_writes_and_compaction_run(store):
+    expected = {node.node_id: node for node in make_nodes("a", 50, seed=0)}
+
+    def write(round_number):
+        nodes = make_nodes("b", 20, seed=round_number + 1)
+        store.add(nodes)
+        store.persist()
+        store.delete_nodes(node_ids=[node.node_id for node in nodes])
+        store.persist()
+
+    def read(_):
+        node = expected[f"a-0-{np.random.randint(50)}"]
+        result = store.query(session_query("a", node.embedding, top_k=1))
+        return node.node_id, result
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        writes = [pool.submit(write, round_number) for round_number in range(10)]
+        reads = list(pool.map(read, range(200)))
+        for future in writes:
+            future.result()
+
+    for node_id, result in reads:
+        assert result.ids == [node_id]
+        embedding = np.asarray(expected[node_id].embedding)
+        assert result.nodes[0].embedding == pytest.approx((embedding / np.linalg.norm(embedding)).tolist(), abs=1e-5)
+        assert result.nodes[0].text == expected[node_id].text
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from src.backend.core.services.ollama_scheduler import OllamaScheduler
+
+MODEL = "mistral"
+
+
+@pytest.fixture
+def server():
+    with StubOllamaServer(first_token_latency=0.01, tokens_per_second=20, answer_tokens=10) as server:
+        yield server
+
+
+@pytest.fixture
+def scheduler(server):
+    scheduler = OllamaScheduler(host=server.url, min_read_timeout=0.1, timeout_factor=2.0, request_timeout=30.0)
+    yield scheduler
+    scheduler.close()
+
+
+def test_streaming_requests_learn_an_adaptive_read_timeout(scheduler):
+    with scheduler.slot(MODEL):
+        chunks = list(scheduler.client.generate(model=MODEL, prompt="hello", stream=True))
+
+    assert chunks[-1]["done"]
+    assert scheduler.stats()[MODEL]["first_byte_seconds"] < 0.1
+    assert scheduler.read_timeout(MODEL) == pytest.approx(0.1)
+
+
+def test_non_streaming_request_outlasting_streaming_ttfb_keeps_full_timeout(scheduler):
+    with scheduler.slot(MODEL):
+        list(scheduler.client.generate(model=MODEL, prompt="hello", stream=True))
+    learned_ttfb = scheduler.stats()[MODEL]["first_byte_seconds"]
+    assert scheduler.read_timeout(MODEL) < 0.5
+
+    start = time.perf_counter()
+    with scheduler.slot(MODEL):
+        response = scheduler.client.generate(model=MODEL, prompt="hello", stream=False)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed > scheduler.read_timeout(MODEL)
+    assert response["done"]
+    assert scheduler.stats()[MODEL]["first_byte_seconds"] == learned_ttfb
+
+
+def test_async_non_streaming_request_keeps_full_timeout(scheduler):
+    async def run():
+        async with scheduler.aslot(MODEL):
+            async for _ in await scheduler.async_client.generate(model=MODEL, prompt="hello", stream=True):
+                pass
+        async with scheduler.aslot(MODEL):
+            return await scheduler.async_client.generate(model=MODEL, prompt="hello", stream=False)
+
+    assert asyncio.run(run())["done"]
+
+
+def test_interrupted_slot_wait_gives_up_its_place(server, monkeypatch):
+    scheduler = OllamaScheduler(host=server.url, default_concurrency=1)
+
+    class InterruptedEvent(threading.Event):
+        def wait(self, timeout=None):
+            raise KeyboardInterrupt
+
+    with scheduler.slot(MODEL):
+        monkeypatch.setattr("src.backend.core.services.ollama_scheduler.threading.Event", InterruptedEvent)
+        with pytest.raises(KeyboardInterrupt):
+            with scheduler.slot(MODEL):
+                pass
+        monkeypatch.undo()
+        assert scheduler.stats()[MODEL]["queue_depth"] == 0
+
+    assert scheduler.stats()[MODEL]["in_flight"] == 0
+    with scheduler.slot(MODEL):
+        pass
+    scheduler.close()
+
+
+def test_close_releases_the_async_connection_pool(scheduler, monkeypatch):
+    async def run():
+        async with scheduler.aslot(MODEL):
+            await scheduler.async_client.generate(model=MODEL, prompt="hello", stream=False)
+
+    asyncio.run(run())
+    closed = []
+    pool = scheduler._async_transport.transport
+    aclose = pool.aclose
+
+    async def record_aclose():
+        closed.append(True)
+        await aclose()
+
+    monkeypatch.setattr(pool, "aclose", record_aclose)
+    scheduler.close()
+
+    assert closed == [True]